@@ -0,0 +1,391 @@
+import calendar
+import json
+import os
+import sys
+import time
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from cache_binaria import CacheBinaria
+
+ARCHIVO_DATOS = "datos_usuarios.json"
+
+# Formato único de registro del formulario, una línea JSON compacta por registro
+CAMPOS_REGISTRO = ["nombre", "email", "edad", "genero", "intereses", "fecha_registro"]
+CAMPOS_REQUERIDOS = ["nombre", "email", "genero", "intereses", "fecha_registro"]
+
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+TAMANO_BLOQUE = 64 * 1024
+TAMANO_MAXIMO_REGISTRO = 1024 * 1024
+
+# Caracteres que pueden aparecer entre registros: espacios, o los restos de
+# un array JSON ("[", "," y "]") en archivos antiguos
+_SEPARADORES = " \t\r\n,[]"
+
+
+def validar_registro(dato) -> bool:
+    """Validar que un registro tenga la estructura correcta"""
+    if not isinstance(dato, dict):
+        return False
+
+    for campo in CAMPOS_REQUERIDOS:
+        if campo not in dato:
+            return False
+
+    return isinstance(dato["intereses"], list)
+
+
+def _serializar(dato: Dict) -> str:
+    return json.dumps(dato, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def escribir_registro(dato: Dict, ruta: str = ARCHIVO_DATOS):
+    """Añadir un registro al final del archivo como una línea NDJSON"""
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(_serializar(dato))
+
+
+def escribir_registros(datos: Iterable[Dict], ruta: str = ARCHIVO_DATOS) -> int:
+    """Añadir varios registros con una sola apertura del archivo"""
+    total = 0
+    with open(ruta, "a", encoding="utf-8") as f:
+        for dato in datos:
+            f.write(_serializar(dato))
+            total += 1
+    return total
+
+
+def _fragmento(texto: str) -> str:
+    texto = texto.strip()
+    return texto if len(texto) <= 80 else texto[:77] + "..."
+
+
+def iterar_valores(f, descartados: Optional[List[str]] = None) -> Iterator:
+    """Decodificar valores JSON consecutivos de un archivo abierto, bloque a bloque.
+
+    Acepta NDJSON, objetos con sangría concatenados (formato antiguo de
+    `guardar_datos`) y arrays JSON. La memoria usada está acotada por el
+    tamaño del bloque más el del registro más grande. Un registro corrupto
+    se salta hasta el siguiente salto de línea (y se anota en `descartados`)
+    sin perder los que le siguen.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    agotado = False
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _SEPARADORES:
+            pos += 1
+
+        if pos >= len(buffer):
+            if agotado:
+                return
+            buffer = f.read(TAMANO_BLOQUE)
+            pos = 0
+            if not buffer:
+                return
+            continue
+
+        try:
+            valor, fin = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            pendiente = len(buffer) - pos
+            if not agotado and pendiente < TAMANO_MAXIMO_REGISTRO:
+                # Probablemente el registro sigue en el siguiente bloque
+                bloque = f.read(TAMANO_BLOQUE)
+                agotado = not bloque
+                buffer = buffer[pos:] + bloque
+                pos = 0
+                continue
+            # Registro corrupto: saltar a la siguiente línea
+            siguiente = buffer.find("\n", pos)
+            if descartados is not None:
+                descartados.append(_fragmento(buffer[pos:siguiente] if siguiente != -1 else buffer[pos:]))
+            if siguiente == -1:
+                if agotado:
+                    return
+                buffer = f.read(TAMANO_BLOQUE)
+                pos = 0
+                agotado = not buffer
+                continue
+            pos = siguiente + 1
+            continue
+
+        yield valor
+        pos = fin
+
+
+def leer_registros(ruta: str = ARCHIVO_DATOS, validar: bool = True, desde: int = 0,
+                   omitidos: Optional[List[str]] = None) -> Iterator[Dict]:
+    """Leer los registros del archivo de forma perezosa (desde el byte `desde`)
+
+    Los registros dañados o que no pasan la validación se saltan de uno en
+    uno; si se pasa `omitidos`, se anota en él un fragmento de cada uno para
+    poder avisar al usuario. Los bytes que no son UTF-8 se sustituyen en
+    lugar de cortar la lectura.
+    """
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, "r", encoding="utf-8", errors="replace") as f:
+        if desde:
+            f.seek(desde)
+        for valor in iterar_valores(f, omitidos):
+            if validar:
+                if validar_registro(valor):
+                    yield valor
+                elif omitidos is not None:
+                    omitidos.append(_fragmento(json.dumps(valor, ensure_ascii=False)))
+            elif isinstance(valor, dict):
+                yield valor
+            elif omitidos is not None:
+                omitidos.append(_fragmento(json.dumps(valor, ensure_ascii=False)))
+
+
+def es_ndjson(ruta: str = ARCHIVO_DATOS) -> bool:
+    """Comprobar si todas las líneas del archivo son registros JSON completos"""
+    if not os.path.exists(ruta):
+        return True
+    with open(ruta, "r", encoding="utf-8") as f:
+        for linea in f:
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                if not isinstance(json.loads(linea), dict):
+                    return False
+            except json.JSONDecodeError:
+                return False
+    return True
+
+
+def migrar_a_ndjson(ruta: str = ARCHIVO_DATOS) -> int:
+    """Reescribir un archivo antiguo (JSON con sangría o array) como NDJSON.
+
+    Devuelve el número de registros migrados. El archivo original se
+    reemplaza de forma atómica al terminar.
+    """
+    if not os.path.exists(ruta):
+        return 0
+
+    temporal = f"{ruta}.tmp"
+    total = 0
+    with open(ruta, "r", encoding="utf-8") as origen, \
+            open(temporal, "w", encoding="utf-8") as destino:
+        for valor in iterar_valores(origen):
+            if isinstance(valor, dict):
+                destino.write(_serializar(valor))
+                total += 1
+        destino.flush()
+        os.fsync(destino.fileno())
+    os.replace(temporal, ruta)
+    return total
+
+
+class RegistrosColumnares:
+    """Registros del formulario guardados por columnas en lugar de un dict por registro.
+
+    El género y la lista de intereses se codifican contra un vocabulario (un
+    byte y un código de combinación por registro; la combinación guarda los
+    intereses en su orden original), la edad escrita como texto de dígitos
+    como entero y la fecha como segundos desde 1970 sin zona horaria
+    (`calendar.timegm`, así que no la mueve ningún cambio de hora). Lo que no
+    vuelve idéntico de esa codificación (edad como número u otro texto,
+    género que no es texto, fecha con otro formato) se guarda tal cual en
+    `_excepciones`. Se comporta como una lista de dicts de solo lectura con
+    `append`.
+    """
+
+    # Edad vacía ("") y registro sin la clave "edad" (no es obligatoria)
+    SIN_EDAD = -1
+    SIN_CAMPO_EDAD = -2
+    # Versión de `a_columnas`: una caché de otra versión se descarta
+    FORMATO = 3
+
+    def __init__(self, datos: Iterable[Dict] = ()):
+        self.nombres: List[str] = []
+        self.emails: List[str] = []
+        self.edades = array("h")
+        self.generos = array("B")
+        self.intereses = array("I")
+        self.fechas = array("q")
+        self.vocabulario_generos: List[str] = []
+        self.combinaciones_intereses: List[Tuple[str, ...]] = []
+        self._codigos_genero: Dict[str, int] = {}
+        self._codigos_combinacion: Dict[Tuple[str, ...], int] = {}
+        # posición -> {campo: valor original} para lo que no se puede codificar
+        self._excepciones: Dict[int, Dict] = {}
+        self.extend(datos)
+
+    def _codigo_genero(self, genero: str) -> int:
+        if not isinstance(genero, str):
+            return -1
+        codigo = self._codigos_genero.get(genero)
+        if codigo is None:
+            codigo = len(self.vocabulario_generos)
+            if codigo > 255:
+                return -1
+            self.vocabulario_generos.append(sys.intern(genero))
+            self._codigos_genero[genero] = codigo
+        return codigo
+
+    def _codigo_intereses(self, intereses: List[str]) -> int:
+        combinacion = tuple(intereses)
+        codigo = self._codigos_combinacion.get(combinacion)
+        if codigo is None:
+            codigo = len(self.combinaciones_intereses)
+            combinacion = tuple(sys.intern(i) if isinstance(i, str) else i for i in combinacion)
+            self.combinaciones_intereses.append(combinacion)
+            self._codigos_combinacion[combinacion] = codigo
+        return codigo
+
+    def append(self, dato: Dict):
+        posicion = len(self.nombres)
+        excepciones = {}
+
+        # Solo el texto que vuelve idéntico: un int sigue siendo int al leerlo
+        edad = dato.get("edad", "")
+        if "edad" not in dato:
+            self.edades.append(self.SIN_CAMPO_EDAD)
+        elif edad == "":
+            self.edades.append(self.SIN_EDAD)
+        elif (isinstance(edad, str) and edad.isascii() and edad.isdigit()
+              and int(edad) < 32767 and str(int(edad)) == edad):
+            self.edades.append(int(edad))
+        else:
+            self.edades.append(self.SIN_EDAD)
+            excepciones["edad"] = edad
+
+        codigo = self._codigo_genero(dato["genero"])
+        if codigo < 0:
+            # El género se devuelve desde `_excepciones`; el código es de relleno
+            codigo = self._codigo_genero("") if not self.vocabulario_generos else 0
+            excepciones["genero"] = dato["genero"]
+        self.generos.append(codigo)
+
+        try:
+            self.intereses.append(self._codigo_intereses(dato["intereses"]))
+        except TypeError:
+            # Algún interés no hashable (no es texto)
+            self.intereses.append(self._codigo_intereses([]))
+            excepciones["intereses"] = list(dato["intereses"])
+
+        fecha = dato["fecha_registro"]
+        try:
+            segundos = calendar.timegm(time.strptime(fecha, FORMATO_FECHA))
+        except (ValueError, TypeError):
+            segundos = None
+        if segundos is not None and time.strftime(FORMATO_FECHA, time.gmtime(segundos)) == fecha:
+            self.fechas.append(segundos)
+        else:
+            # Otro formato, sin ceros a la izquierda...: se devuelve tal cual
+            self.fechas.append(0)
+            excepciones["fecha_registro"] = fecha
+
+        # Campos que no forman parte del formato de registro
+        extra = {k: v for k, v in dato.items() if k not in CAMPOS_REGISTRO}
+        excepciones.update(extra)
+        if excepciones:
+            self._excepciones[posicion] = excepciones
+
+        self.nombres.append(dato["nombre"])
+        self.emails.append(dato["email"])
+
+    def extend(self, datos: Iterable[Dict]):
+        for dato in datos:
+            self.append(dato)
+
+    def __len__(self) -> int:
+        return len(self.nombres)
+
+    def __getitem__(self, posicion: int) -> Dict:
+        if posicion < 0:
+            posicion += len(self)
+        edad = self.edades[posicion]
+        dato = {
+            "nombre": self.nombres[posicion],
+            "email": self.emails[posicion],
+            "edad": "" if edad == self.SIN_EDAD else str(edad),
+            "genero": self.vocabulario_generos[self.generos[posicion]],
+            "intereses": list(self.combinaciones_intereses[self.intereses[posicion]]),
+            "fecha_registro": time.strftime(FORMATO_FECHA, time.gmtime(self.fechas[posicion])),
+        }
+        if edad == self.SIN_CAMPO_EDAD:
+            del dato["edad"]
+        excepciones = self._excepciones.get(posicion)
+        if excepciones:
+            dato.update(excepciones)
+        return dato
+
+    def __iter__(self) -> Iterator[Dict]:
+        for posicion in range(len(self)):
+            yield self[posicion]
+
+    def a_columnas(self) -> Dict:
+        """Estado completo con tipos básicos (para la caché binaria)"""
+        return {
+            "formato": self.FORMATO,
+            "nombres": self.nombres,
+            "emails": self.emails,
+            "edades": self.edades.tobytes(),
+            "generos": self.generos.tobytes(),
+            "intereses": self.intereses.tobytes(),
+            "fechas": self.fechas.tobytes(),
+            "vocabulario_generos": self.vocabulario_generos,
+            "combinaciones_intereses": self.combinaciones_intereses,
+            "excepciones": self._excepciones,
+        }
+
+    @classmethod
+    def desde_columnas(cls, columnas: Dict) -> "RegistrosColumnares":
+        registros = cls()
+        registros.nombres = columnas["nombres"]
+        registros.emails = columnas["emails"]
+        for campo in ("edades", "generos", "intereses", "fechas"):
+            getattr(registros, campo).frombytes(columnas[campo])
+        registros.vocabulario_generos = [sys.intern(g) for g in columnas["vocabulario_generos"]]
+        registros.combinaciones_intereses = [
+            tuple(sys.intern(i) if isinstance(i, str) else i for i in combinacion)
+            for combinacion in columnas["combinaciones_intereses"]
+        ]
+        registros._codigos_genero = {g: i for i, g in enumerate(registros.vocabulario_generos)}
+        registros._codigos_combinacion = {c: i for i, c in enumerate(registros.combinaciones_intereses)}
+        registros._excepciones = columnas["excepciones"]
+        return registros
+
+
+def cargar_columnares(ruta: str = ARCHIVO_DATOS, validar: Callable[[Dict], bool] = validar_registro,
+                      usar_cache: bool = True) -> RegistrosColumnares:
+    """Cargar los registros válidos del archivo, usando `<ruta>.bin` si está al día
+
+    El archivo solo crece por el final, así que con una caché anterior basta
+    con leer los registros añadidos después; la caché se reescribe si cambió
+    algo. Los registros de la caché ya pasaron `validar` al guardarse.
+    """
+    cache = CacheBinaria(ruta, crecimiento=True) if usar_cache else None
+    columnas, desde = cache.cargar() if cache else (None, 0)
+    if columnas is not None and columnas.get("formato") != RegistrosColumnares.FORMATO:
+        columnas, desde = None, 0
+    registros = (RegistrosColumnares.desde_columnas(columnas) if columnas is not None
+                 else RegistrosColumnares())
+    if cache is None or columnas is None or desde < os.path.getsize(ruta):
+        registros.extend(d for d in leer_registros(ruta, validar=False, desde=desde) if validar(d))
+        if cache is not None:
+            try:
+                cache.guardar(registros.a_columnas())
+            except OSError as e:
+                print(f"Error guardando la caché de registros: {e}")
+    return registros
+
+
+if __name__ == "__main__":
+    # Uso: python almacen_registros.py migrar [archivo]
+    if len(sys.argv) >= 2 and sys.argv[1] == "migrar":
+        archivo = sys.argv[2] if len(sys.argv) > 2 else ARCHIVO_DATOS
+        if es_ndjson(archivo):
+            print(f"{archivo} ya está en formato NDJSON")
+        else:
+            print(f"Migrados {migrar_a_ndjson(archivo)} registros en {archivo}")
+    else:
+        print("Uso: python almacen_registros.py migrar [archivo]")
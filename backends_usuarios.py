@@ -0,0 +1,159 @@
+"""Contrato común de los backends de usuarios y creación por nombre.
+
+Los backends implementan `BackendUsuarios`:
+
+    json      SistemaUsuarios: snapshot JSON reescrito en cada cambio (por defecto)
+    diario    SistemaUsuarios con diario de cambios (append-log) y escritura diferida
+    indexado  como diario, pero con snapshot indexado: cada usuario se lee al pedirlo
+    sqlite    SistemaUsuariosSQLite: base de datos SQLite en modo WAL
+
+La interfaz, el servicio HTTP y los benchmarks solo usan estos métodos, así
+que el backend se elige al arrancar con `crear_backend`.
+
+Informe de emails repetidos en datos existentes (sin abrir la aplicación):
+    python backends_usuarios.py duplicados usuarios.json
+    python backends_usuarios.py duplicados usuarios.db
+"""
+from typing import Dict, Iterable, List, Optional, Protocol, Sequence, Tuple, Union
+
+from diario_usuarios import EstadoEscritura
+from importacion_usuarios import ResultadoImportacion
+from modelo_usuarios import Usuario, agrupar_emails_duplicados
+from sesiones import GestorSesiones, Sesion
+
+BACKENDS = ("json", "diario", "indexado", "sqlite")
+BACKEND_POR_DEFECTO = "json"
+RUTAS_POR_DEFECTO = {"json": "usuarios.json", "diario": "usuarios.json",
+                     "indexado": "usuarios.json", "sqlite": "usuarios.db"}
+
+SesionOToken = Union[Sesion, str, None]
+
+
+class BackendUsuarios(Protocol):
+    sesiones: GestorSesiones
+
+    def registrar_usuario(self, username: str, password: str, email: str) -> Tuple[bool, str]: ...
+
+    # Alta y cambio de contraseña en dos pasos, como el login: `preparar_*`
+    # calcula el KDF sin modificar el estado (desde un hilo) y `completar_*`
+    # guarda el resultado
+    def preparar_alta(self, username: str, password: str,
+                      email: str) -> Tuple[bool, str, Optional[str]]: ...
+
+    def completar_alta(self, username: str, email: str, password_hash: str,
+                       role: str = "user") -> Tuple[bool, str]: ...
+
+    def verificar_credenciales(self, username: str, password: str,
+                               origen: str = "local") -> Tuple[bool, str, Optional[str]]: ...
+
+    def completar_login(self, username: str, nuevo_hash: Optional[str] = None) -> Sesion: ...
+
+    def login(self, username: str, password: str,
+              origen: str = "local") -> Tuple[bool, str, Optional[Sesion]]: ...
+
+    def usuario_de(self, sesion: SesionOToken) -> Optional[Usuario]: ...
+
+    def logout(self, sesion: SesionOToken) -> bool: ...
+
+    def cambiar_password(self, sesion: SesionOToken, password_actual: str,
+                         password_nuevo: str) -> Tuple[bool, str]: ...
+
+    def preparar_cambio_password(self, sesion: SesionOToken, password_actual: str,
+                                 password_nuevo: str) -> Tuple[bool, str, Optional[str]]: ...
+
+    def completar_cambio_password(self, sesion: SesionOToken, nuevo_hash: str) -> Tuple[bool, str]: ...
+
+    def validar_email(self, email: str) -> bool: ...
+
+    def email_registrado(self, email: str) -> bool: ...
+
+    def emails_duplicados(self) -> Dict[str, List[str]]: ...
+
+    def obtener_usuario(self, username: str) -> Optional[Usuario]: ...
+
+    def obtener_usuarios(self, sesion: SesionOToken, after_username: Optional[str] = None,
+                         limit: Optional[int] = None) -> List[Usuario]: ...
+
+    def vista_usuarios(self, sesion: SesionOToken) -> Sequence[Usuario]: ...
+
+    def guardar_usuario(self, user: Usuario): ...
+
+    def obtener_estadisticas(self) -> Dict: ...
+
+    def serie_diaria(self, dias: int = 30) -> List[Tuple[str, int, int]]: ...
+
+    def importar_usuarios(self, filas: Iterable[Dict]) -> ResultadoImportacion: ...
+
+    def exportar_usuarios(self, stream, formato: str = "csv") -> int: ...
+
+    def estado_escritura(self) -> Optional[EstadoEscritura]: ...
+
+    def cerrar(self): ...
+
+
+def crear_backend(tipo: str = BACKEND_POR_DEFECTO, ruta: Optional[str] = None,
+                  **opciones) -> BackendUsuarios:
+    """Crear un backend por nombre; `opciones` se pasan a su constructor
+
+    Cada backend tiene su configuración recomendada (escritura diferida para
+    el diario, commit en grupo de 50 ms para SQLite) que `opciones` puede
+    sustituir.
+    """
+    if tipo not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {tipo} (disponibles: {', '.join(BACKENDS)})")
+    ruta = ruta or RUTAS_POR_DEFECTO[tipo]
+    if tipo == "sqlite":
+        # Import perezoso: los backends JSON no necesitan cargar sqlite3
+        from sistema_usuarios_sqlite import SistemaUsuariosSQLite
+        return SistemaUsuariosSQLite(ruta, **{"intervalo_grupo_ms": 50, **opciones})
+    from sistema_usuarios import SistemaUsuarios
+    if tipo in ("diario", "indexado"):
+        opciones = {"usar_diario": True, "escritura_diferida_ms": 500,
+                    "carga_perezosa": tipo == "indexado", **opciones}
+    return SistemaUsuarios(ruta, **opciones)
+
+
+def informe_emails_duplicados(ruta: str) -> Dict[str, List[str]]:
+    """Emails repetidos en un snapshot JSON (más su diario) o una base de datos SQLite.
+
+    Solo lee los datos: el JSON se recorre en streaming guardando el último
+    email de cada usuario y la base de datos se abre en solo lectura (sin
+    pasarla a WAL como `conectar`) y se consulta con un GROUP BY.
+    """
+    if ruta.endswith(".db"):
+        import sqlite3
+        from pathlib import Path
+        from sistema_usuarios_sqlite import consultar_emails_duplicados
+        conn = sqlite3.connect(f"{Path(ruta).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            return consultar_emails_duplicados(conn)
+        finally:
+            conn.close()
+    from migracion_usuarios import leer_origen
+    ultimo_email: Dict[str, str] = {}
+    for dato in leer_origen(ruta):
+        if isinstance(dato, dict) and isinstance(dato.get("username"), str) \
+                and isinstance(dato.get("email"), str):
+            ultimo_email[dato["username"]] = dato["email"]
+    return agrupar_emails_duplicados(ultimo_email.items())
+
+
+def main():
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(description="Herramientas sobre los datos de usuarios")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    duplicados_parser = subparsers.add_parser("duplicados", help="Informe de emails repetidos")
+    duplicados_parser.add_argument("ruta", help="usuarios.json (con su diario) o usuarios.db")
+    args = parser.parse_args()
+
+    duplicados = informe_emails_duplicados(args.ruta)
+    for email, usernames in sorted(duplicados.items()):
+        print(f"{email}: {', '.join(usernames)}")
+    print(f"{len(duplicados)} emails repetidos en {sum(map(len, duplicados.values()))} usuarios")
+    # Código de salida 1 si hay duplicados, para usarlo en scripts
+    sys.exit(1 if duplicados else 0)
+
+
+if __name__ == "__main__":
+    main()
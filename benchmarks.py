@@ -0,0 +1,626 @@
+"""Benchmarks de rendimiento del proyecto.
+
+Uso:
+    python benchmarks.py hash
+    python benchmarks.py sqlite-login --usuarios 1000 --logins 20000 --grupo-ms 50
+    python benchmarks.py importar --usuarios 1000000
+    python benchmarks.py memoria --registros 100000
+    python benchmarks.py arranque --registros 1000000 --usuarios 1000000
+    python benchmarks.py estilos --pantallas 20 --campos 20
+    python benchmarks.py api --backend sqlite --clientes 16 --peticiones 500
+    python benchmarks.py backends --tamanos 1000 10000 100000 1000000 --salida resultados.json
+    python benchmarks.py backends --comparar resultados.json
+    python benchmarks.py importacion
+"""
+import argparse
+import csv
+import hashlib
+import http.client
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from backends_usuarios import BACKENDS, crear_backend
+from contrasenas import HasherPBKDF2, HasherScrypt, configurar_hasher, hashear_password
+
+
+def _medir(funcion, duracion_minima: float = 1.0) -> float:
+    """Ejecutar `funcion` repetidamente y devolver operaciones por segundo"""
+    repeticiones = 0
+    inicio = time.perf_counter()
+    while True:
+        funcion()
+        repeticiones += 1
+        transcurrido = time.perf_counter() - inicio
+        if transcurrido >= duracion_minima:
+            return repeticiones / transcurrido
+
+
+def benchmark_hash(args):
+    """Hashes por segundo para cada configuración de coste"""
+    configuraciones = [("sha256 (legado)", None)]
+    if hasattr(hashlib, "scrypt"):
+        configuraciones += [(f"scrypt n=2^{exp}", HasherScrypt(n=2 ** exp)) for exp in (12, 14, 15)]
+    configuraciones += [(f"pbkdf2-sha256 i={i}", HasherPBKDF2(iteraciones=i))
+                        for i in (100_000, 310_000, 600_000)]
+
+    print(f"{'Configuración':<28}{'hashes/s':>12}{'ms/hash':>10}")
+    for nombre, hasher in configuraciones:
+        if hasher is None:
+            funcion = lambda: hashlib.sha256(b"password123").hexdigest()
+        else:
+            funcion = lambda h=hasher: hashear_password("password123", h)
+        por_segundo = _medir(funcion, args.duracion)
+        print(f"{nombre:<28}{por_segundo:>12.1f}{1000 / por_segundo:>10.2f}")
+
+
+def benchmark_sqlite_login(args):
+    """Logins por segundo en SistemaUsuariosSQLite con y sin commit en grupo"""
+    from sistema_usuarios_sqlite import SistemaUsuariosSQLite
+
+    # Coste de hash mínimo para medir solo la capa de almacenamiento
+    configurar_hasher(HasherPBKDF2(iteraciones=1))
+    with tempfile.TemporaryDirectory() as directorio:
+        for grupo_ms in (0, args.grupo_ms):
+            db_path = os.path.join(directorio, f"bench_{grupo_ms}.db")
+            sistema = SistemaUsuariosSQLite(db_path, intervalo_grupo_ms=grupo_ms)
+            # Todos los logins llegan desde el mismo origen: sin límite por origen
+            sistema.limitador.capacidad_origen = float("inf")
+            with sistema.transaccion():
+                for i in range(args.usuarios):
+                    sistema.registrar_usuario(f"user{i}", "password123", f"user{i}@demo.com")
+
+            inicio = time.perf_counter()
+            correctos = 0
+            for i in range(args.logins):
+                ok, _, _ = sistema.login(f"user{i % args.usuarios}", "password123")
+                correctos += ok
+            sistema.volcar_logins()
+            transcurrido = time.perf_counter() - inicio
+            sistema.cerrar()
+            # Si no, se estaría midiendo el ritmo de rechazos y no el de logins
+            assert correctos == args.logins, f"solo {correctos} de {args.logins} logins correctos"
+            print(f"commit en grupo {grupo_ms:>4} ms: {args.logins / transcurrido:>10.0f} logins/s")
+
+
+def benchmark_importar(args):
+    """Importación y exportación en bloque de usuarios desde CSV en cada backend"""
+    from importacion_usuarios import CAMPOS_EXPORTACION, leer_usuarios_csv
+
+    # Un único hash precalculado: se mide la importación, no el KDF
+    password_hash = hashear_password("password123")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_csv = os.path.join(directorio, "usuarios.csv")
+        with open(ruta_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CAMPOS_EXPORTACION)
+            writer.writeheader()
+            for i in range(args.usuarios):
+                writer.writerow({"username": f"user{i}", "password_hash": password_hash,
+                                 "email": f"user{i}@demo.com", "role": "user",
+                                 "created_at": "2025-01-01 00:00:00", "last_login": ""})
+
+        for nombre in BACKENDS:
+            sistema = _crear_backend(nombre, _ruta_backend(directorio, nombre, args.usuarios))
+            inicio = time.perf_counter()
+            resultado = sistema.importar_usuarios(leer_usuarios_csv(ruta_csv))
+            importacion = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            with open(os.devnull, "w", newline="", encoding="utf-8") as destino:
+                sistema.exportar_usuarios(destino, "csv")
+            exportacion = time.perf_counter() - inicio
+            sistema.cerrar()
+
+            print(f"{nombre:<8} importados={resultado.importados} errores={resultado.total_errores} "
+                  f"importación={resultado.importados / importacion:,.0f} filas/s "
+                  f"exportación={args.usuarios / exportacion:,.0f} filas/s")
+
+
+def _memoria_por_elemento(crear) -> float:
+    """Bytes asignados por `crear()` según tracemalloc (el resultado se mantiene vivo)"""
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    resultado = crear()
+    usados = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    return usados / max(len(resultado), 1)
+
+
+def benchmark_memoria(args):
+    """Bytes por usuario y por registro del formulario antes y después del formato compacto"""
+    from almacen_registros import RegistrosColumnares
+    from sistema_usuarios import Usuario
+
+    n = args.registros
+    usuarios = [{"username": f"user{i}", "password_hash": f"$pbkdf2-sha256$v=1$i=1$sal{i}$hash{i}",
+                 "email": f"user{i}@demo.com", "role": "user",
+                 "created_at": "2025-01-01 00:00:00",
+                 "last_login": "2025-02-01 12:00:00" if i % 2 else None,
+                 "profile_data": {}} for i in range(n)]
+    registros = [{"nombre": f"Nombre {i}", "email": f"nombre{i}@demo.com", "edad": str(18 + i % 60),
+                  "genero": ("Masculino", "Femenino", "Otro")[i % 3],
+                  "intereses": ["Tecnología", "Deportes", "Música", "Arte"][:i % 4],
+                  "fecha_registro": "2025-01-01 00:00:00"} for i in range(n)]
+
+    # "Antes": objeto con __dict__ y los mismos campos que el Usuario original
+    # (fechas como texto, dict de perfil propio) y registros como dicts
+    mediciones = [
+        ("usuarios (__dict__)", lambda: [SimpleNamespace(**{**d, "profile_data": dict(d["profile_data"]),
+                                                            "role": "".join(d["role"])})
+                                         for d in usuarios]),
+        ("usuarios (__slots__)", lambda: [Usuario.from_dict(d) for d in usuarios]),
+        ("registros (dicts)", lambda: [{**d, "intereses": list(d["intereses"])} for d in registros]),
+        ("registros (columnas)", lambda: RegistrosColumnares(registros)),
+    ]
+    print(f"{'Estructura':<24}{'bytes/elemento':>16}")
+    for nombre, crear in mediciones:
+        print(f"{nombre:<24}{_memoria_por_elemento(crear):>16.1f}")
+
+
+def _tiempo(funcion) -> float:
+    inicio = time.perf_counter()
+    resultado = funcion()
+    transcurrido = time.perf_counter() - inicio
+    del resultado
+    return transcurrido
+
+
+def benchmark_arranque(args):
+    """Carga al arrancar desde el texto JSON frente a la caché binaria (`<archivo>.bin`)"""
+    from almacen_registros import cargar_columnares, escribir_registros
+    from sistema_usuarios import SistemaUsuarios
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "datos_usuarios.json")
+        escribir_registros(
+            ({"nombre": f"Nombre {i}", "email": f"nombre{i}@demo.com", "edad": str(18 + i % 60),
+              "genero": ("Masculino", "Femenino", "Otro")[i % 3],
+              "intereses": ["Tecnología", "Deportes", "Música", "Arte"][:i % 4],
+              "fecha_registro": "2025-01-01 00:00:00"} for i in range(args.registros)), ruta)
+        texto = _tiempo(lambda: cargar_columnares(ruta, usar_cache=False))
+        construccion = _tiempo(lambda: cargar_columnares(ruta))
+        cache = _tiempo(lambda: cargar_columnares(ruta))
+        escribir_registros(({"nombre": "Nuevo", "email": "nuevo@demo.com", "edad": "30",
+                             "genero": "Otro", "intereses": [],
+                             "fecha_registro": "2025-01-02 00:00:00"} for _ in range(1000)), ruta)
+        cola = _tiempo(lambda: cargar_columnares(ruta))
+        print(f"registros n={args.registros}: texto={texto:.2f}s texto+caché={construccion:.2f}s "
+              f"caché={cache:.2f}s caché+1000 nuevos={cola:.2f}s")
+
+        # Un único hash precalculado: se mide la carga, no el KDF
+        password_hash = hashear_password("password123")
+        ruta = os.path.join(directorio, "usuarios.json")
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump([{"username": "admin" if i == 0 else f"user{i}", "password_hash": password_hash,
+                        "email": f"user{i}@demo.com", "role": "admin" if i == 0 else "user",
+                        "created_at": "2025-01-01 00:00:00",
+                        "last_login": "2025-02-01 12:00:00" if i % 2 else None,
+                        "profile_data": {}} for i in range(args.usuarios)], f, indent=2)
+        # Crea el archivo de estadísticas para que ninguna medida las reconstruya
+        SistemaUsuarios(ruta, cache_binaria=False).cerrar()
+        medidas = []
+        for cache_binaria in (False, True, True):
+            inicio = time.perf_counter()
+            sistema = SistemaUsuarios(ruta, cache_binaria=cache_binaria)
+            medidas.append(time.perf_counter() - inicio)
+            sistema.cerrar()
+            del sistema
+        texto, construccion, cache = medidas
+        print(f"usuarios  n={args.usuarios}: texto={texto:.2f}s texto+caché={construccion:.2f}s "
+              f"caché={cache:.2f}s")
+
+
+def _formulario_estilos(ctk, master, fuente, boton, campos: int):
+    """Pantalla tipo formulario; `fuente(rol)` y `boton(color)` dan el estilo de cada widget"""
+    frame = ctk.CTkFrame(master)
+    ctk.CTkLabel(frame, text="Formulario de Registro", font=fuente("titulo")).pack(pady=20)
+    for i in range(campos):
+        ctk.CTkLabel(frame, text=f"Campo {i}:", font=fuente("texto")).pack(anchor="w", padx=20)
+        ctk.CTkEntry(frame, width=300).pack(padx=20)
+        ctk.CTkCheckBox(frame, text=f"Opción {i}", font=fuente("texto_pequeno")).pack(anchor="w", padx=20)
+    for texto, color in (("Guardar", "exito"), ("Limpiar", "aviso"), ("Cancelar", "peligro")):
+        ctk.CTkButton(frame, text=texto, **boton(color)).pack(side="left", padx=10, pady=20)
+    frame.pack(fill="both", expand=True)
+    return frame
+
+
+def benchmark_estilos(args):
+    """Construcción y reescalado de pantallas con una CTkFont por widget frente a RegistroEstilos"""
+    import tkinter
+    import tkinter.font
+
+    import customtkinter as ctk
+    from dialogos import contar_widgets
+    from estilos import COLORES, FUENTES, RegistroEstilos
+
+    try:
+        root = ctk.CTk()
+    except tkinter.TclError as e:
+        print(f"No se puede abrir una ventana Tk (¿sin pantalla?): {e}")
+        return
+    root.withdraw()
+
+    # Lo que hacían las interfaces antes: una fuente nueva en cada widget
+    def fuente_por_widget(rol):
+        return ctk.CTkFont(**FUENTES[rol])
+
+    def boton_por_widget(color):
+        fg_color, hover_color = COLORES[color]
+        return {"font": ctk.CTkFont(**FUENTES["boton"]), "fg_color": fg_color, "hover_color": hover_color}
+
+    estilos = RegistroEstilos()
+    variantes = (("por widget", fuente_por_widget, boton_por_widget),
+                 ("compartidas", estilos.fuente, estilos.boton))
+    try:
+        for nombre, fuente, boton in variantes:
+            # Una pantalla sin medir para cargar las clases y el tema
+            _formulario_estilos(ctk, root, fuente, boton, args.campos).destroy()
+            fuentes_antes = len(tkinter.font.names(root))
+            frames, tiempos = [], []
+            for _ in range(args.pantallas):
+                inicio = time.perf_counter()
+                frames.append(_formulario_estilos(ctk, root, fuente, boton, args.campos))
+                root.update_idletasks()
+                tiempos.append(time.perf_counter() - inicio)
+            fuentes = len(tkinter.font.names(root)) - fuentes_antes
+            widgets = contar_widgets(frames[0])
+
+            inicio = time.perf_counter()
+            ctk.set_widget_scaling(1.25)
+            root.update_idletasks()
+            escalado = time.perf_counter() - inicio
+            ctk.set_widget_scaling(1.0)
+            root.update_idletasks()
+            for frame in frames:
+                frame.destroy()
+
+            print(f"{nombre:<12} pantallas={args.pantallas} widgets/pantalla={widgets} "
+                  f"construcción media={sum(tiempos) / len(tiempos) * 1000:.1f} ms "
+                  f"máx={max(tiempos) * 1000:.1f} ms fuentes Tk nuevas={fuentes} "
+                  f"escalado x1.25={escalado * 1000:.0f} ms")
+    finally:
+        root.destroy()
+
+
+def _percentil(valores, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def benchmark_api(args):
+    """Logins por segundo y latencias del servicio HTTP con clientes keep-alive concurrentes"""
+    from servicio_usuarios import ServidorUsuarios
+
+    configurar_hasher(HasherPBKDF2(iteraciones=1))
+    with tempfile.TemporaryDirectory() as directorio:
+        # Misma configuración que el servicio (escritura diferida, commit en grupo)
+        sistema = crear_backend(args.backend, _ruta_backend(directorio, args.backend, args.usuarios))
+        # Todos los clientes llegan desde 127.0.0.1: sin límite por origen
+        sistema.limitador.capacidad_origen = float("inf")
+        for i in range(args.usuarios):
+            sistema.registrar_usuario(f"user{i}", "password123", f"user{i}@demo.com")
+
+        servidor = ServidorUsuarios(("127.0.0.1", 0), sistema, args.max_concurrentes)
+        hilo_servidor = threading.Thread(target=servidor.serve_forever, daemon=True)
+        hilo_servidor.start()
+
+        latencias = []
+        errores = []
+
+        def cliente(numero):
+            conexion = http.client.HTTPConnection("127.0.0.1", servidor.server_port)
+            propias = []
+            for j in range(args.peticiones):
+                cuerpo = json.dumps({"username": f"user{(numero + j) % args.usuarios}",
+                                     "password": "password123"})
+                inicio = time.perf_counter()
+                conexion.request("POST", "/login", cuerpo, {"Content-Type": "application/json"})
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                propias.append(time.perf_counter() - inicio)
+                if respuesta.status != 200:
+                    errores.append(respuesta.status)
+            conexion.close()
+            latencias.extend(propias)
+
+        hilos = [threading.Thread(target=cliente, args=(n,)) for n in range(args.clientes)]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        transcurrido = time.perf_counter() - inicio
+
+        servidor.shutdown()
+        servidor.server_close()
+        sistema.cerrar()
+
+    print(f"backend={args.backend} clientes={args.clientes} peticiones={len(latencias)} "
+          f"errores={len(errores)}")
+    print(f"{len(latencias) / transcurrido:,.0f} logins/s  "
+          f"p50={_percentil(latencias, 0.5) * 1000:.2f} ms  "
+          f"p99={_percentil(latencias, 0.99) * 1000:.2f} ms")
+
+
+def _crear_backend(nombre: str, ruta: str):
+    """Backend con escrituras síncronas, para que cada latencia incluya su escritura"""
+    opciones = {"intervalo_grupo_ms": 0} if nombre == "sqlite" else {"escritura_diferida_ms": None}
+    sistema = crear_backend(nombre, ruta, **opciones)
+    # Todas las operaciones llegan del mismo origen: sin límite por origen
+    sistema.limitador.capacidad_origen = float("inf")
+    return sistema
+
+
+def _ruta_backend(directorio: str, nombre: str, usuarios: int) -> str:
+    extension = "db" if nombre == "sqlite" else "json"
+    return os.path.join(directorio, f"{nombre}_{usuarios}.{extension}")
+
+
+def _resumen_latencias(latencias) -> dict:
+    total = sum(latencias)
+    return {
+        "operaciones": len(latencias),
+        "ops_s": round(len(latencias) / total, 1) if total else None,
+        "p50_ms": round(_percentil(latencias, 0.50) * 1000, 3),
+        "p99_ms": round(_percentil(latencias, 0.99) * 1000, 3),
+    }
+
+
+def benchmark_carga(args):
+    """(Proceso hijo) Medir una carga en frío del backend e imprimir el resultado en JSON"""
+    configurar_hasher(HasherPBKDF2(iteraciones=1))
+    if args.memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    sistema = _crear_backend(args.backend, args.ruta)
+    transcurrido = time.perf_counter() - inicio
+    resultado = {"carga_s": round(transcurrido, 4)}
+    if args.memoria:
+        resultado["memoria_pico_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        tracemalloc.stop()
+    sistema.cerrar()
+    print(json.dumps(resultado))
+
+
+def _medir_carga(backend: str, ruta: str, memoria: bool) -> dict:
+    # Un proceso nuevo por medida: carga en frío y pico de memoria sin ruido de lo anterior
+    comando = [sys.executable, os.path.abspath(__file__), "carga", backend, ruta]
+    if memoria:
+        comando.append("--memoria")
+    salida = subprocess.run(comando, check=True, capture_output=True, text=True).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def _medir_operaciones(sistema, usuarios: int, operaciones: int) -> dict:
+    latencias = {"registro": [], "login": [], "cambiar_password": []}
+    for i in range(operaciones):
+        inicio = time.perf_counter()
+        sistema.registrar_usuario(f"nuevo{i}", "password123", f"nuevo{i}@demo.com")
+        latencias["registro"].append(time.perf_counter() - inicio)
+
+    sesiones = []
+    for i in range(operaciones):
+        # Usuarios repartidos por todo el conjunto, no solo los primeros
+        username = f"user{(i * 7919) % usuarios}"
+        inicio = time.perf_counter()
+        ok, _, sesion = sistema.login(username, "password123")
+        latencias["login"].append(time.perf_counter() - inicio)
+        if ok:
+            sesiones.append(sesion)
+
+    for sesion in sesiones:
+        inicio = time.perf_counter()
+        sistema.cambiar_password(sesion, "password123", "password456")
+        latencias["cambiar_password"].append(time.perf_counter() - inicio)
+    return {nombre: _resumen_latencias(valores) for nombre, valores in latencias.items()}
+
+
+def _comparar(anteriores: dict, actuales: dict, tolerancia: float) -> list:
+    """Métricas que empeoran más que `tolerancia` (fracción) respecto a la ejecución anterior"""
+    previos = {(r["backend"], r["usuarios"]): r for r in anteriores["resultados"]}
+    regresiones = []
+    for r in actuales["resultados"]:
+        previo = previos.get((r["backend"], r["usuarios"]))
+        if previo is None:
+            continue
+        metricas = [("carga_s", r["carga_s"], previo["carga_s"], True),
+                    ("memoria_pico_mb", r["memoria_pico_mb"], previo["memoria_pico_mb"], True)]
+        for operacion, datos in r["operaciones"].items():
+            antes = previo["operaciones"].get(operacion, {})
+            metricas.append((f"{operacion}.ops_s", datos["ops_s"], antes.get("ops_s"), False))
+            metricas.append((f"{operacion}.p99_ms", datos["p99_ms"], antes.get("p99_ms"), True))
+        for nombre, ahora, antes, menor_es_mejor in metricas:
+            if not ahora or not antes:
+                continue
+            cambio = (ahora - antes) / antes if menor_es_mejor else (antes - ahora) / antes
+            if cambio > tolerancia:
+                regresiones.append(f"{r['backend']} n={r['usuarios']} {nombre}: {antes} -> {ahora}")
+    return regresiones
+
+
+def benchmark_backends(args):
+    """Carga en frío, throughput/latencias y memoria de cada backend con N usuarios sintéticos"""
+    # Coste de hash mínimo: se mide el backend, no el KDF
+    configurar_hasher(HasherPBKDF2(iteraciones=1))
+    password_hash = hashear_password("password123")
+    resultados = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for usuarios in args.tamanos:
+            for backend in args.backend:
+                ruta = _ruta_backend(directorio, backend, usuarios)
+                sistema = _crear_backend(backend, ruta)
+                inicio = time.perf_counter()
+                sistema.importar_usuarios(
+                    {"username": f"user{i}", "password_hash": password_hash,
+                     "email": f"user{i}@demo.com", "role": "user",
+                     "created_at": "2025-01-01 00:00:00"} for i in range(usuarios))
+                sistema.cerrar()
+                generacion = time.perf_counter() - inicio
+
+                resultado = {"backend": backend, "usuarios": usuarios,
+                             "generacion_s": round(generacion, 3)}
+                resultado.update(_medir_carga(backend, ruta, memoria=False))
+                resultado.update(_medir_carga(backend, ruta, memoria=True))
+
+                sistema = _crear_backend(backend, ruta)
+                resultado["operaciones"] = _medir_operaciones(sistema, usuarios, args.operaciones)
+                sistema.cerrar()
+                resultados.append(resultado)
+
+                ops = resultado["operaciones"]
+                print(f"{backend:<8} n={usuarios:<8} carga={resultado['carga_s']:.3f}s "
+                      f"memoria={resultado['memoria_pico_mb']:.1f}MB "
+                      + " ".join(f"{nombre}={datos['ops_s']}/s(p99 {datos['p99_ms']}ms)"
+                                 for nombre, datos in ops.items()), flush=True)
+
+    informe = {
+        "entorno": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "operaciones": args.operaciones,
+        },
+        "resultados": resultados,
+    }
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"Resultados guardados en {args.salida}")
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            regresiones = _comparar(json.load(f), informe, args.tolerancia)
+        for regresion in regresiones:
+            print(f"REGRESIÓN {regresion}")
+        if regresiones:
+            sys.exit(1)
+
+
+MODULOS_BACKEND = ("sistema_usuarios", "sistema_usuarios_sqlite", "backends_usuarios",
+                   "servicio_usuarios")
+MODULOS_GUI = ("tkinter", "customtkinter")
+# Referencias para situar las cifras en la máquina actual
+MODULOS_REFERENCIA = ("json", "tkinter", "customtkinter")
+
+
+def _tiempo_importacion(modulo: str):
+    """Importar `modulo` en un proceso nuevo con -X importtime.
+
+    Devuelve (ms acumulados del módulo, módulos de interfaz importados).
+    """
+    salida = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                            check=True, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stderr
+    acumulado = None
+    cargados = set()
+    for linea in salida.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        partes = linea[len("import time:"):].split("|")
+        nombre = partes[2].strip()
+        if nombre.split(".")[0] in MODULOS_GUI:
+            cargados.add(nombre.split(".")[0])
+        if partes[2] == f" {modulo}" and partes[1].strip().isdigit():
+            acumulado = int(partes[1]) / 1000
+    return acumulado, sorted(cargados)
+
+
+def benchmark_importacion(args):
+    """Coste de importar cada backend (mínimo de N procesos) y comprobación de que no carga Tk"""
+    print(f"{'Módulo':<28}{'ms (mín)':>10}  interfaz cargada")
+    for modulo in MODULOS_BACKEND:
+        tiempos = []
+        cargados = []
+        for _ in range(args.repeticiones):
+            tiempo, cargados = _tiempo_importacion(modulo)
+            tiempos.append(tiempo)
+        print(f"{modulo:<28}{min(tiempos):>10.2f}  {', '.join(cargados) or 'no'}")
+    for modulo in MODULOS_REFERENCIA:
+        try:
+            tiempo = min(_tiempo_importacion(modulo)[0] for _ in range(args.repeticiones))
+        except subprocess.CalledProcessError:
+            continue  # no instalado
+        print(f"{modulo + ' (referencia)':<28}{tiempo:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de Python GUI Demo")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    hash_parser = subparsers.add_parser("hash", help="Coste del hash de contraseñas")
+    hash_parser.add_argument("--duracion", type=float, default=1.0,
+                             help="Segundos mínimos por configuración")
+    hash_parser.set_defaults(funcion=benchmark_hash)
+
+    login_parser = subparsers.add_parser("sqlite-login", help="Logins por segundo en SQLite")
+    login_parser.add_argument("--usuarios", type=int, default=1000)
+    login_parser.add_argument("--logins", type=int, default=20000)
+    login_parser.add_argument("--grupo-ms", type=int, default=50,
+                              help="Intervalo del commit en grupo a comparar con 0")
+    login_parser.set_defaults(funcion=benchmark_sqlite_login)
+
+    importar_parser = subparsers.add_parser("importar", help="Importación/exportación en bloque")
+    importar_parser.add_argument("--usuarios", type=int, default=100000)
+    importar_parser.set_defaults(funcion=benchmark_importar)
+
+    memoria_parser = subparsers.add_parser("memoria", help="Memoria por usuario y por registro")
+    memoria_parser.add_argument("--registros", type=int, default=100000)
+    memoria_parser.set_defaults(funcion=benchmark_memoria)
+
+    arranque_parser = subparsers.add_parser("arranque",
+                                            help="Carga al arrancar: texto JSON frente a caché binaria")
+    arranque_parser.add_argument("--registros", type=int, default=1000000)
+    arranque_parser.add_argument("--usuarios", type=int, default=1000000)
+    arranque_parser.set_defaults(funcion=benchmark_arranque)
+
+    estilos_parser = subparsers.add_parser("estilos",
+                                           help="Construcción de pantallas: fuentes por widget o compartidas")
+    estilos_parser.add_argument("--pantallas", type=int, default=20)
+    estilos_parser.add_argument("--campos", type=int, default=20, help="Campos por formulario")
+    estilos_parser.set_defaults(funcion=benchmark_estilos)
+
+    api_parser = subparsers.add_parser("api", help="Carga sobre el servicio HTTP/JSON")
+    api_parser.add_argument("--backend", choices=BACKENDS, default="diario")
+    api_parser.add_argument("--usuarios", type=int, default=1000)
+    api_parser.add_argument("--clientes", type=int, default=16)
+    api_parser.add_argument("--peticiones", type=int, default=500, help="Peticiones por cliente")
+    api_parser.add_argument("--max-concurrentes", type=int, default=32)
+    api_parser.set_defaults(funcion=benchmark_api)
+
+    backends_parser = subparsers.add_parser("backends", help="Suite de carga de los backends de usuarios")
+    backends_parser.add_argument("--backend", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    backends_parser.add_argument("--tamanos", nargs="+", type=int, default=[1000, 10000, 100000],
+                                 help="Número de usuarios sintéticos (10^3 a 10^6)")
+    backends_parser.add_argument("--operaciones", type=int, default=1000,
+                                 help="Registros, logins y cambios de contraseña medidos")
+    backends_parser.add_argument("--salida", help="Guardar los resultados en este archivo JSON")
+    backends_parser.add_argument("--comparar", help="Resultados anteriores para detectar regresiones")
+    backends_parser.add_argument("--tolerancia", type=float, default=0.2,
+                                 help="Empeoramiento relativo admitido al comparar")
+    backends_parser.set_defaults(funcion=benchmark_backends)
+
+    carga_parser = subparsers.add_parser("carga", help="(interno) carga en frío de un backend")
+    carga_parser.add_argument("backend", choices=BACKENDS)
+    carga_parser.add_argument("ruta")
+    carga_parser.add_argument("--memoria", action="store_true")
+    carga_parser.set_defaults(funcion=benchmark_carga)
+
+    importacion_parser = subparsers.add_parser("importacion",
+                                               help="Tiempo de importación de los backends (-X importtime)")
+    importacion_parser.add_argument("--repeticiones", type=int, default=5)
+    importacion_parser.set_defaults(funcion=benchmark_importacion)
+
+    args = parser.parse_args()
+    args.funcion(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Caché binaria de archivos de texto que tardan en parsearse al arrancar.
+
+Junto al origen se guarda `<origen>.bin` con los datos ya convertidos y
+validados, y la clave del origen del que salieron: tamaño, mtime_ns y hash
+blake2b del contenido. Al cargar:
+
+    - mismo tamaño y mtime: la caché vale sin leer el origen
+    - mismo tamaño y otro mtime (copia, `touch`): vale si coincide el hash
+    - origen más grande, con `crecimiento` y el hash del principio coincide:
+      el origen solo ha crecido por el final (NDJSON) y basta leer la cola
+    - en otro caso se descarta y el llamador la reconstruye
+
+Se usa marshal: carga listas y cadenas mucho más rápido que json y no
+ejecuta código, pero su formato depende de la versión de Python, así que la
+versión forma parte de la cabecera.
+"""
+import hashlib
+import marshal
+import os
+import sys
+from typing import Any, Optional, Tuple
+
+VERSION_FORMATO = 1
+TAMANO_BLOQUE = 1024 * 1024
+
+
+def _version() -> Tuple:
+    return (VERSION_FORMATO, sys.version_info[:2], sys.byteorder)
+
+
+def _hash_parcial(ruta: str, tamano: int) -> "hashlib.blake2b":
+    """Hash de los primeros `tamano` bytes del archivo (se puede seguir actualizando)"""
+    resumen = hashlib.blake2b()
+    with open(ruta, "rb") as f:
+        pendiente = tamano
+        while pendiente > 0:
+            bloque = f.read(min(TAMANO_BLOQUE, pendiente))
+            if not bloque:
+                break
+            resumen.update(bloque)
+            pendiente -= len(bloque)
+    return resumen
+
+
+class CacheBinaria:
+    """Caché `<origen>.bin` de los datos procesados de un archivo de texto"""
+
+    def __init__(self, origen: str, crecimiento: bool = False):
+        self.origen = origen
+        self.ruta = f"{origen}.bin"
+        self.crecimiento = crecimiento
+        # (tamaño, mtime_ns, hash) del origen que se está cargando; la usa `guardar`
+        self.clave: Optional[Tuple[int, int, str]] = None
+
+    def _leer_cabecera(self, f) -> Optional[Tuple[int, int, str]]:
+        try:
+            version, clave = marshal.load(f)
+        except (EOFError, ValueError, TypeError):
+            return None
+        return tuple(clave) if version == _version() else None
+
+    def cargar(self) -> Tuple[Optional[Any], int]:
+        """(datos, bytes del origen que ya incluyen) o (None, 0) si no hay caché válida
+
+        Si los bytes incluidos son menos que el tamaño del origen, el llamador
+        debe procesar la cola a partir de esa posición.
+        """
+        try:
+            estado = os.stat(self.origen)
+        except OSError:
+            return None, 0
+        tamano, mtime_ns = estado.st_size, estado.st_mtime_ns
+        try:
+            f = open(self.ruta, "rb")
+        except OSError:
+            f = None
+        if f is not None:
+            with f:
+                guardada = self._leer_cabecera(f)
+                vigente = self._vigente(guardada, tamano, mtime_ns)
+                if vigente is not None:
+                    try:
+                        return marshal.loads(f.read()), vigente
+                    except (EOFError, ValueError, TypeError):
+                        pass
+        self.clave = (tamano, mtime_ns, _hash_parcial(self.origen, tamano).hexdigest())
+        return None, 0
+
+    def _vigente(self, guardada, tamano: int, mtime_ns: int) -> Optional[int]:
+        """Bytes del origen que cubre la caché guardada, o None si no vale"""
+        if guardada is None:
+            return None
+        tamano_guardado, mtime_guardado, hash_guardado = guardada
+        if tamano_guardado == tamano and mtime_guardado == mtime_ns:
+            self.clave = guardada
+            return tamano
+        if tamano_guardado == tamano:
+            resumen = _hash_parcial(self.origen, tamano).hexdigest()
+            if resumen != hash_guardado:
+                return None
+            self.clave = (tamano, mtime_ns, resumen)
+            return tamano
+        if self.crecimiento and tamano_guardado < tamano:
+            resumen = _hash_parcial(self.origen, tamano_guardado)
+            if resumen.hexdigest() != hash_guardado:
+                return None
+            # Se sigue con la cola para tener ya la clave del archivo completo
+            with open(self.origen, "rb") as f:
+                f.seek(tamano_guardado)
+                for bloque in iter(lambda: f.read(TAMANO_BLOQUE), b""):
+                    resumen.update(bloque)
+            self.clave = (tamano, mtime_ns, resumen.hexdigest())
+            return tamano_guardado
+        return None
+
+    def guardar(self, datos: Any):
+        """Guardar los datos con la clave del origen leída en `cargar`"""
+        if self.clave is None:
+            return
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, "wb") as f:
+            marshal.dump((_version(), self.clave), f)
+            f.write(marshal.dumps(datos))
+        os.replace(temporal, self.ruta)
@@ -0,0 +1,166 @@
+import base64
+import hashlib
+import hmac
+import os
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# Formato de los hashes: $<algoritmo>$v=<versión>$<parámetros>$<sal>$<hash>
+VERSION_FORMATO = 1
+
+
+def _b64(datos: bytes) -> str:
+    return base64.b64encode(datos).decode("ascii").rstrip("=")
+
+
+def _desde_b64(texto: str) -> bytes:
+    return base64.b64decode(texto + "=" * (-len(texto) % 4))
+
+
+def _parsear_parametros(texto: str) -> Dict[str, int]:
+    return {clave: int(valor) for clave, valor in
+            (parte.split("=", 1) for parte in texto.split(","))}
+
+
+class HasherScrypt:
+    """KDF scrypt (memory-hard); coste con n, r y p"""
+    algoritmo = "scrypt"
+
+    def __init__(self, n: int = 2 ** 14, r: int = 8, p: int = 1, largo_sal: int = 16):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.largo_sal = largo_sal
+
+    def parametros(self) -> str:
+        return f"n={self.n},r={self.r},p={self.p}"
+
+    def _derivar(self, password: str, sal: bytes, n: int, r: int, p: int) -> bytes:
+        memoria = 128 * r * (n + p + 2) + 1024 * 1024
+        return hashlib.scrypt(password.encode("utf-8"), salt=sal, n=n, r=r, p=p,
+                              maxmem=memoria, dklen=32)
+
+    def hashear(self, password: str) -> str:
+        sal = os.urandom(self.largo_sal)
+        clave = self._derivar(password, sal, self.n, self.r, self.p)
+        return f"${self.algoritmo}$v={VERSION_FORMATO}${self.parametros()}${_b64(sal)}${_b64(clave)}"
+
+    def verificar(self, password: str, parametros: str, sal: bytes, esperado: bytes) -> bool:
+        valores = _parsear_parametros(parametros)
+        clave = self._derivar(password, sal, valores["n"], valores["r"], valores["p"])
+        return hmac.compare_digest(clave, esperado)
+
+
+class HasherPBKDF2:
+    """PBKDF2-HMAC-SHA256; coste con el número de iteraciones"""
+    algoritmo = "pbkdf2-sha256"
+
+    def __init__(self, iteraciones: int = 600_000, largo_sal: int = 16):
+        self.iteraciones = iteraciones
+        self.largo_sal = largo_sal
+
+    def parametros(self) -> str:
+        return f"i={self.iteraciones}"
+
+    def hashear(self, password: str) -> str:
+        sal = os.urandom(self.largo_sal)
+        clave = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), sal, self.iteraciones)
+        return f"${self.algoritmo}$v={VERSION_FORMATO}${self.parametros()}${_b64(sal)}${_b64(clave)}"
+
+    def verificar(self, password: str, parametros: str, sal: bytes, esperado: bytes) -> bool:
+        iteraciones = _parsear_parametros(parametros)["i"]
+        clave = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), sal, iteraciones)
+        return hmac.compare_digest(clave, esperado)
+
+
+_HASHERS = {
+    HasherScrypt.algoritmo: HasherScrypt,
+    HasherPBKDF2.algoritmo: HasherPBKDF2,
+}
+
+# scrypt depende de que Python esté compilado con OpenSSL 1.1+
+HASHER_POR_DEFECTO = HasherScrypt() if hasattr(hashlib, "scrypt") else HasherPBKDF2()
+
+
+def configurar_hasher(hasher):
+    """Cambiar el hasher usado para los hashes nuevos (p. ej. coste bajo en benchmarks)"""
+    global HASHER_POR_DEFECTO
+    HASHER_POR_DEFECTO = hasher
+
+
+def es_hash_legado(password_hash: str) -> bool:
+    """Hashes antiguos: SHA-256 sin sal en hexadecimal"""
+    return not password_hash.startswith("$")
+
+
+def hashear_password(password: str, hasher=None) -> str:
+    """Hashear contraseña con sal aleatoria y el KDF configurado"""
+    return (hasher or HASHER_POR_DEFECTO).hashear(password)
+
+
+def verificar_password(password: str, password_hash: str) -> bool:
+    """Verificar una contraseña contra un hash en cualquier formato soportado"""
+    if not password_hash:
+        return False
+    if es_hash_legado(password_hash):
+        legado = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legado, password_hash)
+    try:
+        _, algoritmo, _version, parametros, sal, clave = password_hash.split("$")
+        hasher = _HASHERS[algoritmo]()
+        return hasher.verificar(password, parametros, _desde_b64(sal), _desde_b64(clave))
+    except (ValueError, KeyError):
+        return False
+
+
+def necesita_rehash(password_hash: str, hasher=None) -> bool:
+    """Indicar si el hash usa un formato o un coste distinto del configurado"""
+    hasher = hasher or HASHER_POR_DEFECTO
+    if es_hash_legado(password_hash):
+        return True
+    partes = password_hash.split("$")
+    if len(partes) != 6:
+        return True
+    _, algoritmo, version, parametros, _, _ = partes
+    return (algoritmo != hasher.algoritmo
+            or version != f"v={VERSION_FORMATO}"
+            or parametros != hasher.parametros())
+
+
+class EjecutorSegundoPlano:
+    """Ejecutar tareas costosas en un pool de hilos y entregar el resultado en el mainloop.
+
+    Los hilos nunca tocan Tk: el hilo de la interfaz consulta el futuro con
+    `root.after` y llama al callback cuando termina.
+    """
+
+    def __init__(self, root, max_workers: int = 2, intervalo_ms: int = 20):
+        # Import diferido: concurrent.futures arrastra logging y solo lo usa la interfaz
+        from concurrent.futures import ThreadPoolExecutor
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def ejecutar(self, funcion: Callable, *args, al_terminar: Callable = None,
+                 al_fallar: Optional[Callable] = None) -> "Future":
+        futuro = self.pool.submit(funcion, *args)
+        self.root.after(self.intervalo_ms, self._vigilar, futuro, al_terminar, al_fallar)
+        return futuro
+
+    def _vigilar(self, futuro: "Future", al_terminar, al_fallar):
+        if not futuro.done():
+            self.root.after(self.intervalo_ms, self._vigilar, futuro, al_terminar, al_fallar)
+            return
+        error = futuro.exception()
+        if error is not None:
+            if al_fallar:
+                al_fallar(error)
+            else:
+                print(f"Error en tarea en segundo plano: {error}")
+        elif al_terminar:
+            al_terminar(futuro.result())
+
+    def cerrar(self):
+        self.pool.shutdown(wait=False)
@@ -0,0 +1,125 @@
+"""Ventanas secundarias que se construyen una vez y se reutilizan.
+
+Cada diálogo se construye la primera vez que se abre. Al cerrarlo (botón o
+la X de la ventana) solo se oculta con `withdraw`, y al reabrirlo se
+refrescan sus datos en lugar de volver a crear la ventana y sus widgets.
+Abrir un diálogo que ya está abierto lo trae al frente, así que no se
+acumulan ventanas modales.
+
+`estadisticas()` da las aperturas y su latencia por diálogo y el número de
+widgets vivos, para comprobar que el número de widgets no crece tras miles de
+aperturas (`ciclar`).
+"""
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def contar_widgets(widget) -> int:
+    """Widgets vivos de un árbol Tk, incluido `widget`"""
+    return 1 + sum(contar_widgets(hijo) for hijo in widget.winfo_children())
+
+
+class Dialogo:
+    """Cómo construir un diálogo y refrescar sus datos, y su ventana si ya existe"""
+    __slots__ = ("nombre", "titulo", "geometria", "construir", "refrescar", "modal",
+                 "ventana", "construcciones", "aperturas", "apertura_total_ms", "apertura_max_ms")
+
+    def __init__(self, nombre: str, titulo: str, geometria: str, construir: Callable[[Any], None],
+                 refrescar: Optional[Callable[[], None]], modal: bool):
+        self.nombre = nombre
+        self.titulo = titulo
+        self.geometria = geometria
+        self.construir = construir
+        self.refrescar = refrescar
+        self.modal = modal
+        self.ventana = None
+        self.construcciones = 0
+        self.aperturas = 0
+        self.apertura_total_ms = 0.0
+        self.apertura_max_ms = 0.0
+
+
+class PoolDialogos:
+    """Diálogos de una ventana principal; `crear_ventana(root)` crea cada Toplevel"""
+
+    def __init__(self, root, crear_ventana: Callable[[Any], Any]):
+        self.root = root
+        self.crear_ventana = crear_ventana
+        self._dialogos: Dict[str, Dialogo] = {}
+
+    def registrar(self, nombre: str, titulo: str, geometria: str, construir: Callable[[Any], None],
+                  refrescar: Optional[Callable[[], None]] = None, modal: bool = True):
+        """Registrar un diálogo; `construir(ventana)` crea sus widgets y `refrescar()` sus datos"""
+        self._dialogos[nombre] = Dialogo(nombre, titulo, geometria, construir, refrescar, modal)
+
+    def ventana(self, nombre: str):
+        """Ventana del diálogo (None si aún no se ha construido)"""
+        return self._dialogos[nombre].ventana
+
+    def abrir(self, nombre: str):
+        """Mostrar un diálogo, construyéndolo la primera vez y refrescando sus datos"""
+        inicio = time.perf_counter()
+        dialogo = self._dialogos[nombre]
+        ventana = dialogo.ventana
+        if ventana is None or not ventana.winfo_exists():
+            ventana = self.crear_ventana(self.root)
+            ventana.title(dialogo.titulo)
+            ventana.geometry(dialogo.geometria)
+            ventana.protocol("WM_DELETE_WINDOW", lambda: self.cerrar(nombre))
+            dialogo.ventana = ventana
+            dialogo.construir(ventana)
+            dialogo.construcciones += 1
+        if dialogo.refrescar is not None:
+            dialogo.refrescar()
+        ventana.deiconify()
+        ventana.lift()
+        if dialogo.modal:
+            ventana.grab_set()
+        ventana.update_idletasks()
+
+        ms = (time.perf_counter() - inicio) * 1000
+        dialogo.aperturas += 1
+        dialogo.apertura_total_ms += ms
+        dialogo.apertura_max_ms = max(dialogo.apertura_max_ms, ms)
+
+    def cerrar(self, nombre: str):
+        """Ocultar un diálogo (sus widgets se conservan para la próxima vez)"""
+        ventana = self._dialogos[nombre].ventana
+        if ventana is None or not ventana.winfo_exists():
+            return
+        ventana.grab_release()
+        ventana.withdraw()
+
+    def cerrar_todos(self):
+        for nombre in self._dialogos:
+            self.cerrar(nombre)
+
+    def estadisticas(self) -> Dict:
+        """Aperturas, construcciones y latencia de apertura por diálogo, y widgets vivos"""
+        return {
+            "widgets_vivos": contar_widgets(self.root),
+            "dialogos": {
+                d.nombre: {
+                    "construcciones": d.construcciones,
+                    "aperturas": d.aperturas,
+                    "apertura_media_ms": round(d.apertura_total_ms / d.aperturas, 2) if d.aperturas else 0.0,
+                    "apertura_max_ms": round(d.apertura_max_ms, 2),
+                }
+                for d in self._dialogos.values()
+            },
+        }
+
+    def ciclar(self, ciclos: int, nombres: Optional[Iterable[str]] = None) -> Dict:
+        """Abrir y cerrar cada diálogo `ciclos` veces; widgets vivos antes y después"""
+        nombres = list(nombres if nombres is not None else self._dialogos)
+        # Primera apertura fuera de la cuenta: construye los diálogos
+        for nombre in nombres:
+            self.abrir(nombre)
+            self.cerrar(nombre)
+        antes = contar_widgets(self.root)
+        for _ in range(ciclos):
+            for nombre in nombres:
+                self.abrir(nombre)
+                self.cerrar(nombre)
+        return {"ciclos": ciclos, "widgets_antes": antes,
+                "widgets_despues": contar_widgets(self.root), **self.estadisticas()}
@@ -0,0 +1,270 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+UMBRAL_COMPACTACION = 1024 * 1024  # 1 MB de diario antes de compactar
+INTERVALO_ESCRITURA_MS = 500  # espera desde el primer cambio hasta escribir
+
+
+def escribir_json_atomico(ruta: str, datos, indent: Optional[int] = 2, sincronizar: bool = True):
+    """Escribir JSON en un archivo temporal y renombrarlo sobre el destino"""
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=indent)
+        f.flush()
+        if sincronizar:
+            os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+class DiarioUsuarios:
+    """Diario de cambios (append-only) que acompaña al snapshot de usuarios.
+
+    Cada cambio se añade como una línea JSON compacta con el usuario completo,
+    así que reproducir el diario sobre el snapshot es idempotente. Cuando el
+    diario supera el umbral se pliega en un nuevo snapshot.
+
+    `escribir_snapshot(ruta, datos)` escribe el snapshot con lo que devuelva
+    `capturar`; por defecto, JSON con `escribir_json_atomico`.
+    """
+
+    def __init__(self, archivo_snapshot: str, archivo_diario: str = None,
+                 umbral_compactacion: int = UMBRAL_COMPACTACION, sincronizar: bool = False,
+                 escribir_snapshot: Callable[[str, Any], None] = escribir_json_atomico):
+        self.archivo_snapshot = archivo_snapshot
+        self.escribir_snapshot = escribir_snapshot
+        self.archivo_diario = archivo_diario or f"{archivo_snapshot}.diario"
+        self.umbral_compactacion = umbral_compactacion
+        self.sincronizar = sincronizar
+        self._lock = threading.Lock()
+        self._lock_compactacion = threading.Lock()
+        self._hilo_compactacion: Optional[threading.Thread] = None
+        self._archivo = open(self.archivo_diario, "ab")
+        self._cerrar_linea_cortada()
+
+    def _cerrar_linea_cortada(self):
+        """Tras una caída a mitad de una línea, empezar la siguiente en una línea nueva
+
+        Si no, el primer registro nuevo quedaría pegado a la línea cortada y
+        `reproducir` descartaría los dos.
+        """
+        if self._archivo.tell() == 0:
+            return
+        with open(self.archivo_diario, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+        self._archivo.write(b"\n")
+        self._archivo.flush()
+
+    def registrar(self, datos: Dict):
+        """Añadir un registro de usuario al final del diario"""
+        linea = json.dumps(datos, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._archivo.write(linea.encode("utf-8") + b"\n")
+            self._archivo.flush()
+            if self.sincronizar:
+                os.fsync(self._archivo.fileno())
+
+    def registrar_lote(self, registros: Iterable[Dict], sincronizar: bool = True) -> int:
+        """Añadir varios registros con una sola escritura y, opcionalmente, un solo fsync"""
+        datos = b"".join(
+            json.dumps(r, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+            for r in registros
+        )
+        with self._lock:
+            self._archivo.write(datos)
+            self._archivo.flush()
+            if sincronizar or self.sincronizar:
+                os.fsync(self._archivo.fileno())
+        return len(datos)
+
+    def reproducir(self) -> Iterator[Dict]:
+        """Recorrer los registros del diario en orden de escritura"""
+        if not os.path.exists(self.archivo_diario):
+            return
+        with open(self.archivo_diario, "r", encoding="utf-8") as f:
+            for linea in f:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    yield json.loads(linea)
+                except json.JSONDecodeError:
+                    # Última línea a medio escribir tras una caída
+                    continue
+
+    def tamano(self) -> int:
+        """Tamaño actual del diario en bytes"""
+        with self._lock:
+            return self._archivo.tell()
+
+    def necesita_compactar(self) -> bool:
+        return self.tamano() >= self.umbral_compactacion
+
+    def compactando(self) -> bool:
+        return self._hilo_compactacion is not None and self._hilo_compactacion.is_alive()
+
+    def compactar_en_segundo_plano(self, capturar: Callable[[], List[Dict]]):
+        """Lanzar la compactación en un hilo si no hay otra en curso"""
+        if self.compactando():
+            return
+        self._hilo_compactacion = threading.Thread(
+            target=self._compactar_seguro, args=(capturar,), daemon=True
+        )
+        self._hilo_compactacion.start()
+
+    def _compactar_seguro(self, capturar: Callable[[], List[Dict]]):
+        try:
+            self.compactar(capturar)
+        except Exception as e:
+            print(f"Error compactando diario: {e}")
+
+    def compactar(self, capturar: Callable[[], List[Dict]]):
+        """Escribir un snapshot nuevo y descartar la parte del diario ya incluida.
+
+        `capturar` se llama con el diario bloqueado para que el corte coincida
+        con el estado capturado; los registros añadidos mientras se escribe el
+        snapshot se conservan en el diario.
+        """
+        with self._lock_compactacion:
+            with self._lock:
+                self._archivo.flush()
+                corte = self._archivo.tell()
+                datos = capturar()
+
+            self.escribir_snapshot(self.archivo_snapshot, datos)
+
+            with self._lock:
+                self._archivo.close()
+                with open(self.archivo_diario, "rb") as f:
+                    f.seek(corte)
+                    resto = f.read()
+                temporal = f"{self.archivo_diario}.tmp"
+                with open(temporal, "wb") as f:
+                    f.write(resto)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temporal, self.archivo_diario)
+                self._archivo = open(self.archivo_diario, "ab")
+
+    def cerrar(self):
+        """Esperar a la compactación en curso y cerrar el diario"""
+        if self._hilo_compactacion is not None:
+            self._hilo_compactacion.join()
+        with self._lock:
+            self._archivo.close()
+
+
+class EstadoEscritura:
+    """Foto del estado del escritor para mostrarla en la interfaz"""
+
+    def __init__(self, pendiente: bool, escrituras: int, ultima_latencia_ms: Optional[float],
+                 ultimo_guardado: Optional[float], ultimo_error: Optional[str]):
+        self.pendiente = pendiente
+        self.escrituras = escrituras
+        self.ultima_latencia_ms = ultima_latencia_ms
+        self.ultimo_guardado = ultimo_guardado
+        self.ultimo_error = ultimo_error
+
+    @property
+    def en_disco(self) -> bool:
+        """Todos los cambios conocidos están escritos y la última escritura fue bien"""
+        return not self.pendiente and self.ultimo_error is None
+
+
+class EscritorDiferido:
+    """Hilo que agrupa los cambios pendientes y los escribe fuera del hilo de la interfaz.
+
+    `marcar_pendiente` solo levanta una bandera; el hilo espera `intervalo_ms`
+    desde el primer cambio (para agrupar los que lleguen mientras tanto) y
+    llama a `escribir`. Si la escritura falla se reintenta en el siguiente
+    intervalo. `cerrar` hace una última escritura antes de terminar.
+    """
+
+    def __init__(self, escribir: Callable[[], None], intervalo_ms: int = INTERVALO_ESCRITURA_MS):
+        self.escribir = escribir
+        self.intervalo = intervalo_ms / 1000
+        self._condicion = threading.Condition()
+        self._pendiente = False
+        self._escribiendo = False
+        self._cerrando = False
+        self._urgente = False
+        self._escrituras = 0
+        self._ultima_latencia_ms: Optional[float] = None
+        self._ultimo_guardado: Optional[float] = None
+        self._ultimo_error: Optional[str] = None
+        self._hilo = threading.Thread(target=self._bucle, name="escritor-usuarios", daemon=True)
+        self._hilo.start()
+
+    def marcar_pendiente(self):
+        with self._condicion:
+            self._pendiente = True
+            self._condicion.notify_all()
+
+    def _bucle(self):
+        while True:
+            with self._condicion:
+                while not self._pendiente and not self._cerrando:
+                    self._condicion.wait()
+                if not self._pendiente:
+                    return
+                # Agrupar los cambios que lleguen durante el intervalo
+                limite = time.monotonic() + self.intervalo
+                while not self._cerrando and not self._urgente:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._condicion.wait(restante)
+                self._pendiente = False
+                self._escribiendo = True
+
+            inicio = time.perf_counter()
+            error = None
+            try:
+                self.escribir()
+            except Exception as e:
+                error = str(e)
+                print(f"Error en la escritura diferida: {e}")
+            latencia = (time.perf_counter() - inicio) * 1000
+
+            with self._condicion:
+                self._escribiendo = False
+                self._escrituras += 1
+                self._ultima_latencia_ms = latencia
+                self._ultimo_error = error
+                if error is None:
+                    self._ultimo_guardado = time.time()
+                else:
+                    self._pendiente = True
+                    if self._cerrando:
+                        # No reintentar indefinidamente al cerrar
+                        self._condicion.notify_all()
+                        return
+                self._condicion.notify_all()
+
+    def vaciar(self, timeout: Optional[float] = None) -> bool:
+        """Escribir ya lo pendiente y esperar; devuelve False si falla o vence el timeout"""
+        with self._condicion:
+            self._urgente = True
+            self._condicion.notify_all()
+            self._condicion.wait_for(
+                lambda: not self._escribiendo and (not self._pendiente or self._ultimo_error),
+                timeout)
+            self._urgente = False
+            return not self._pendiente and not self._escribiendo
+
+    def estado(self) -> EstadoEscritura:
+        with self._condicion:
+            return EstadoEscritura(self._pendiente or self._escribiendo, self._escrituras,
+                                   self._ultima_latencia_ms, self._ultimo_guardado,
+                                   self._ultimo_error)
+
+    def cerrar(self):
+        """Hacer la última escritura pendiente y parar el hilo"""
+        with self._condicion:
+            self._cerrando = True
+            self._condicion.notify_all()
+        self._hilo.join()
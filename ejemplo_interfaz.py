@@ -1,9 +1,11 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-import json
 from datetime import datetime
 
+from almacen_registros import escribir_registro
+from estilos import RegistroEstilos
+
 # Configurar el tema
 ctk.set_appearance_mode("dark")  # Modos: "System" (default), "Dark", "Light"
 ctk.set_default_color_theme("blue")  # Temas: "blue" (default), "green", "dark-blue"
@@ -13,6 +15,8 @@ class AplicacionInterfaz:
         self.root = ctk.CTk()
         self.root.title("Interfaz Moderna con Python")
         self.root.geometry("800x600")
+        # Fuentes y colores compartidos por todos los widgets
+        self.estilos = RegistroEstilos()
         
         # Variables
         self.nombre_var = tk.StringVar()
@@ -32,7 +36,7 @@ class AplicacionInterfaz:
         titulo = ctk.CTkLabel(
             main_frame, 
             text="Formulario de Registro", 
-            font=ctk.CTkFont(size=24, weight="bold")
+            font=self.estilos.fuente("titulo")
         )
         titulo.pack(pady=20)
         
@@ -41,7 +45,7 @@ class AplicacionInterfaz:
         form_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Nombre
-        ctk.CTkLabel(form_frame, text="Nombre:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(20,5))
+        ctk.CTkLabel(form_frame, text="Nombre:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(20,5))
         nombre_entry = ctk.CTkEntry(
             form_frame, 
             textvariable=self.nombre_var,
@@ -51,7 +55,7 @@ class AplicacionInterfaz:
         nombre_entry.pack(padx=20, pady=(0,10))
         
         # Email
-        ctk.CTkLabel(form_frame, text="Email:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Email:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         email_entry = ctk.CTkEntry(
             form_frame, 
             textvariable=self.email_var,
@@ -61,7 +65,7 @@ class AplicacionInterfaz:
         email_entry.pack(padx=20, pady=(0,10))
         
         # Edad
-        ctk.CTkLabel(form_frame, text="Edad:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Edad:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         edad_entry = ctk.CTkEntry(
             form_frame, 
             textvariable=self.edad_var,
@@ -71,7 +75,7 @@ class AplicacionInterfaz:
         edad_entry.pack(padx=20, pady=(0,10))
         
         # Género
-        ctk.CTkLabel(form_frame, text="Género:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Género:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         genero_menu = ctk.CTkOptionMenu(
             form_frame,
             values=["Masculino", "Femenino", "No binario", "Prefiero no decir"],
@@ -81,7 +85,7 @@ class AplicacionInterfaz:
         genero_menu.pack(padx=20, pady=(0,10))
         
         # Intereses
-        ctk.CTkLabel(form_frame, text="Intereses:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Intereses:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         
         intereses_frame = ctk.CTkFrame(form_frame)
         intereses_frame.pack(padx=20, pady=(0,10))
@@ -96,7 +100,7 @@ class AplicacionInterfaz:
                 intereses_frame, 
                 text=interes, 
                 variable=var,
-                font=ctk.CTkFont(size=12)
+                font=self.estilos.fuente("texto_pequeno")
             )
             checkbox.grid(row=i//3, column=i%3, padx=10, pady=5, sticky="w")
         
@@ -109,9 +113,7 @@ class AplicacionInterfaz:
             botones_frame,
             text="Guardar Datos",
             command=self.guardar_datos,
-            font=ctk.CTkFont(size=14, weight="bold"),
-            fg_color="green",
-            hover_color="darkgreen"
+            **self.estilos.boton("exito", "boton_destacado")
         )
         guardar_btn.pack(side="left", padx=10)
         
@@ -120,9 +122,7 @@ class AplicacionInterfaz:
             botones_frame,
             text="Limpiar",
             command=self.limpiar_formulario,
-            font=ctk.CTkFont(size=14),
-            fg_color="orange",
-            hover_color="darkorange"
+            **self.estilos.boton("aviso")
         )
         limpiar_btn.pack(side="left", padx=10)
         
@@ -131,7 +131,7 @@ class AplicacionInterfaz:
             botones_frame,
             text="Cambiar Tema",
             command=self.cambiar_tema,
-            font=ctk.CTkFont(size=14)
+            font=self.estilos.fuente("boton")
         )
         tema_btn.pack(side="left", padx=10)
         
@@ -176,9 +176,7 @@ Datos guardados exitosamente:
         
         # Guardar en archivo JSON
         try:
-            with open("datos_usuarios.json", "a", encoding="utf-8") as f:
-                json.dump(datos, f, ensure_ascii=False, indent=2)
-                f.write("\n")
+            escribir_registro(datos)
             messagebox.showinfo("Éxito", "Datos guardados en 'datos_usuarios.json'")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo guardar el archivo: {e}")
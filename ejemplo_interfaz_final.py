@@ -1,22 +1,36 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox, filedialog
-import json
 import csv
 from datetime import datetime
 import re
 from typing import List, Dict
-import os
+
+from almacen_registros import RegistrosColumnares, cargar_columnares, escribir_registro, validar_registro
+from contrasenas import EjecutorSegundoPlano
+from estilos import RegistroEstilos
+from indice_registros import IndiceRegistros, VistaFiltrada
+from tabla_virtual import TablaVirtual
 
 # Configurar el tema
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
+GENEROS = ["Masculino", "Femenino", "No binario", "Prefiero no decir"]
+INTERESES = ["Programación", "Música", "Deportes", "Arte", "Ciencia", "Viajes", "Cocina", "Fotografía"]
+# Resultados de búsqueda que se muestran como máximo: la búsqueda por prefijo
+# se detiene al llegar aquí en lugar de recorrer y ordenar todas las coincidencias
+LIMITE_RESULTADOS = 1000
+# Espera desde la última tecla antes de filtrar
+ESPERA_BUSQUEDA_MS = 250
+
 class AplicacionInterfazFinal:
     def __init__(self):
         self.root = ctk.CTk()
         self.root.title("Interfaz Moderna Final - Python GUI Demo")
         self.root.geometry("1000x700")
+        # Fuentes y colores compartidos por todos los widgets
+        self.estilos = RegistroEstilos()
         
         # Variables
         self.nombre_var = tk.StringVar()
@@ -24,7 +38,12 @@ class AplicacionInterfazFinal:
         self.edad_var = tk.StringVar()
         self.genero_var = tk.StringVar(value="Masculino")
         self.intereses = []
-        self.datos_guardados = []
+        # Almacén por columnas: mucha menos memoria que una lista de dicts
+        self.datos_guardados = RegistrosColumnares()
+        # Índices de búsqueda; se construyen en segundo plano tras cargar los datos
+        self.indice = None
+        self.error_indice = None
+        self.ejecutor = EjecutorSegundoPlano(self.root, max_workers=1)
         
         # Temas disponibles
         self.temas = {
@@ -35,60 +54,42 @@ class AplicacionInterfazFinal:
         self.tema_actual = "blue"
         
         self.cargar_datos()
+        self.construir_indice()
         self.crear_interfaz()
     
     def cargar_datos(self):
         """Cargar datos existentes del archivo JSON de forma robusta"""
-        if not os.path.exists("datos_usuarios.json"):
-            return
-        
         try:
-            with open("datos_usuarios.json", "r", encoding="utf-8") as f:
-                contenido = f.read().strip()
-                if not contenido:
-                    return
-                
-                # Intentar cargar como JSON array primero
-                try:
-                    datos_array = json.loads(contenido)
-                    if isinstance(datos_array, list):
-                        for dato in datos_array:
-                            if self.validar_dato(dato):
-                                self.datos_guardados.append(dato)
-                        return
-                except json.JSONDecodeError:
-                    pass
-                
-                # Si no es array, procesar línea por línea
-                for linea in contenido.split('\n'):
-                    linea = linea.strip()
-                    if linea:
-                        try:
-                            dato = json.loads(linea)
-                            if self.validar_dato(dato):
-                                self.datos_guardados.append(dato)
-                        except json.JSONDecodeError:
-                            continue
-                            
+            # Acepta NDJSON y el formato antiguo con sangría; con la caché binaria
+            # (datos_usuarios.json.bin) solo se parsean los registros nuevos
+            self.datos_guardados = cargar_columnares(validar=self.validar_dato)
         except Exception as e:
             print(f"Error cargando datos: {e}")
     
+    def construir_indice(self):
+        """Construir los índices de búsqueda en un hilo, sin bloquear la interfaz"""
+        total = len(self.datos_guardados)
+        datos = self.datos_guardados
+        self.ejecutor.ejecutar(
+            lambda: IndiceRegistros.construir(datos[i] for i in range(total)),
+            al_terminar=lambda indice: self._indice_construido(indice, total),
+            al_fallar=self._indice_fallido
+        )
+    
+    def _indice_construido(self, indice: IndiceRegistros, total: int):
+        # Registros guardados mientras se construía el índice
+        for i in range(total, len(self.datos_guardados)):
+            indice.agregar(i, self.datos_guardados[i])
+        self.indice = indice
+    
+    def _indice_fallido(self, error: Exception):
+        # Sin índice no hay búsqueda: se avisa y la tabla deja de esperarlo
+        self.error_indice = error
+        messagebox.showerror("Error", f"No se pudieron preparar los índices de búsqueda: {error}")
+    
     def validar_dato(self, dato):
         """Validar que un dato tenga la estructura correcta"""
-        if not isinstance(dato, dict):
-            return False
-        
-        # Verificar campos obligatorios
-        campos_requeridos = ['nombre', 'email', 'genero', 'intereses', 'fecha_registro']
-        for campo in campos_requeridos:
-            if campo not in dato:
-                return False
-        
-        # Verificar que intereses sea una lista
-        if not isinstance(dato['intereses'], list):
-            return False
-        
-        return True
+        return validar_registro(dato)
     
     def crear_interfaz(self):
         # Frame principal
@@ -99,7 +100,7 @@ class AplicacionInterfazFinal:
         titulo = ctk.CTkLabel(
             main_frame, 
             text="Formulario de Registro Final", 
-            font=ctk.CTkFont(size=24, weight="bold")
+            font=self.estilos.fuente("titulo")
         )
         titulo.pack(pady=20)
         
@@ -108,7 +109,7 @@ class AplicacionInterfazFinal:
         controles_frame.pack(fill="x", padx=20, pady=10)
         
         # Selector de tema
-        ctk.CTkLabel(controles_frame, text="Tema:", font=ctk.CTkFont(size=14)).pack(side="left", padx=10)
+        ctk.CTkLabel(controles_frame, text="Tema:", font=self.estilos.fuente("texto")).pack(side="left", padx=10)
         tema_menu = ctk.CTkOptionMenu(
             controles_frame,
             values=list(self.temas.keys()),
@@ -122,9 +123,7 @@ class AplicacionInterfazFinal:
             controles_frame,
             text="Exportar CSV",
             command=self.exportar_csv,
-            font=ctk.CTkFont(size=12),
-            fg_color="#FF9800",
-            hover_color="#F57C00"
+            **self.estilos.boton("aviso", "boton_pequeno")
         )
         exportar_btn.pack(side="right", padx=10)
         
@@ -133,9 +132,7 @@ class AplicacionInterfazFinal:
             controles_frame,
             text="Ver Datos",
             command=self.mostrar_tabla_datos,
-            font=ctk.CTkFont(size=12),
-            fg_color="#8B5CF6",
-            hover_color="#7C3AED"
+            **self.estilos.boton("acento", "boton_pequeno")
         )
         ver_datos_btn.pack(side="right", padx=10)
         
@@ -144,7 +141,7 @@ class AplicacionInterfazFinal:
         form_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Nombre
-        ctk.CTkLabel(form_frame, text="Nombre:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(20,5))
+        ctk.CTkLabel(form_frame, text="Nombre:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(20,5))
         nombre_entry = ctk.CTkEntry(
             form_frame, 
             textvariable=self.nombre_var,
@@ -154,7 +151,7 @@ class AplicacionInterfazFinal:
         nombre_entry.pack(padx=20, pady=(0,10))
         
         # Email
-        ctk.CTkLabel(form_frame, text="Email:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Email:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         email_entry = ctk.CTkEntry(
             form_frame, 
             textvariable=self.email_var,
@@ -164,7 +161,7 @@ class AplicacionInterfazFinal:
         email_entry.pack(padx=20, pady=(0,10))
         
         # Edad
-        ctk.CTkLabel(form_frame, text="Edad:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Edad:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         edad_entry = ctk.CTkEntry(
             form_frame, 
             textvariable=self.edad_var,
@@ -174,32 +171,31 @@ class AplicacionInterfazFinal:
         edad_entry.pack(padx=20, pady=(0,10))
         
         # Género
-        ctk.CTkLabel(form_frame, text="Género:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Género:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         genero_menu = ctk.CTkOptionMenu(
             form_frame,
-            values=["Masculino", "Femenino", "No binario", "Prefiero no decir"],
+            values=GENEROS,
             variable=self.genero_var,
             width=300
         )
         genero_menu.pack(padx=20, pady=(0,10))
         
         # Intereses
-        ctk.CTkLabel(form_frame, text="Intereses:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Intereses:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         
         intereses_frame = ctk.CTkFrame(form_frame)
         intereses_frame.pack(padx=20, pady=(0,10))
         
-        intereses = ["Programación", "Música", "Deportes", "Arte", "Ciencia", "Viajes", "Cocina", "Fotografía"]
         self.intereses_vars = {}
         
-        for i, interes in enumerate(intereses):
+        for i, interes in enumerate(INTERESES):
             var = tk.BooleanVar()
             self.intereses_vars[interes] = var
             checkbox = ctk.CTkCheckBox(
                 intereses_frame, 
                 text=interes, 
                 variable=var,
-                font=ctk.CTkFont(size=12)
+                font=self.estilos.fuente("texto_pequeno")
             )
             checkbox.grid(row=i//4, column=i%4, padx=10, pady=5, sticky="w")
         
@@ -212,9 +208,7 @@ class AplicacionInterfazFinal:
             botones_frame,
             text="Guardar Datos",
             command=self.guardar_datos,
-            font=ctk.CTkFont(size=14, weight="bold"),
-            fg_color="#4CAF50",
-            hover_color="#45A049"
+            **self.estilos.boton("exito", "boton_destacado")
         )
         guardar_btn.pack(side="left", padx=10)
         
@@ -223,9 +217,7 @@ class AplicacionInterfazFinal:
             botones_frame,
             text="Limpiar",
             command=self.limpiar_formulario,
-            font=ctk.CTkFont(size=14),
-            fg_color="#FF9800",
-            hover_color="#F57C00"
+            **self.estilos.boton("aviso")
         )
         limpiar_btn.pack(side="left", padx=10)
         
@@ -234,7 +226,7 @@ class AplicacionInterfazFinal:
             botones_frame,
             text="Cambiar Modo",
             command=self.cambiar_modo,
-            font=ctk.CTkFont(size=14)
+            font=self.estilos.fuente("boton")
         )
         tema_btn.pack(side="left", padx=10)
         
@@ -318,65 +310,106 @@ class AplicacionInterfazFinal:
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
         
         # Título
-        ctk.CTkLabel(
+        titulo = ctk.CTkLabel(
             main_frame, 
             text=f"Datos Guardados ({len(self.datos_guardados)} registros)", 
-            font=ctk.CTkFont(size=18, weight="bold")
-        ).pack(pady=10)
+            font=self.estilos.fuente("subtitulo")
+        )
+        titulo.pack(pady=10)
         
-        # Crear tabla usando Text widget
-        tabla_text = ctk.CTkTextbox(main_frame, font=ctk.CTkFont(size=11))
-        tabla_text.pack(fill="both", expand=True, padx=10, pady=10)
+        # Búsqueda y filtros sobre los índices
+        filtros_frame = ctk.CTkFrame(main_frame)
+        filtros_frame.pack(fill="x", padx=10, pady=5)
         
-        # Encabezados
-        headers = "Nombre".ljust(20) + "Email".ljust(25) + "Edad".ljust(8) + "Género".ljust(15) + "Intereses".ljust(30) + "Fecha\n"
-        tabla_text.insert("1.0", headers)
-        tabla_text.insert("2.0", "-" * 120 + "\n")
+        busqueda_var = tk.StringVar()
+        ctk.CTkEntry(
+            filtros_frame,
+            textvariable=busqueda_var,
+            placeholder_text="Buscar por nombre o email",
+            width=250
+        ).pack(side="left", padx=5, pady=5)
         
-        # Datos
-        registros_validos = 0
-        for i, dato in enumerate(self.datos_guardados, 3):
-            try:
-                # Verificar que dato sea un diccionario válido
-                if not self.validar_dato(dato):
-                    continue
-                
-                # Obtener valores de forma segura
-                nombre = str(dato['nombre'])[:18].ljust(20)
-                email = str(dato['email'])[:23].ljust(25)
-                edad = str(dato.get('edad', ''))[:8].ljust(8)
-                genero = str(dato['genero'])[:13].ljust(15)
-                
-                # Manejar intereses (siempre debe ser lista)
-                intereses = dato['intereses']
-                if isinstance(intereses, list):
-                    intereses_str = ', '.join(intereses)
-                else:
-                    intereses_str = str(intereses)
-                intereses_str = intereses_str[:28].ljust(30)
-                
-                fecha = str(dato['fecha_registro'])[:16]
-                
-                linea = f"{nombre}{email}{edad}{genero}{intereses_str}{fecha}\n"
-                tabla_text.insert(f"{i}.0", linea)
-                registros_validos += 1
-                
-            except Exception as e:
-                print(f"Error procesando dato: {e}")
-                continue
+        genero_menu = ctk.CTkOptionMenu(
+            filtros_frame,
+            values=["Todos"] + GENEROS,
+            command=lambda _: programar_filtros(0),
+            width=150
+        )
+        genero_menu.pack(side="left", padx=5, pady=5)
         
-        # Mostrar resumen
-        if registros_validos == 0:
-            tabla_text.insert("3.0", "No se encontraron datos válidos para mostrar.\n")
-        else:
-            tabla_text.insert(f"{registros_validos + 3}.0", f"\nTotal de registros válidos: {registros_validos}")
+        interes_menu = ctk.CTkOptionMenu(
+            filtros_frame,
+            values=["Todos"] + INTERESES,
+            command=lambda _: programar_filtros(0),
+            width=150
+        )
+        interes_menu.pack(side="left", padx=5, pady=5)
+        
+        pendiente = None
+        
+        def aplicar_filtros(*_):
+            nonlocal pendiente
+            pendiente = None
+            if not tabla_window.winfo_exists():
+                return
+            texto = busqueda_var.get().strip()
+            genero = genero_menu.get()
+            interes = interes_menu.get()
+            if not texto and genero == "Todos" and interes == "Todos":
+                fuente = self.datos_guardados
+                resumen = f"{len(fuente)} registros"
+            elif self.indice is None and self.error_indice is not None:
+                fuente = self.datos_guardados
+                resumen = f"{len(fuente)} registros, búsqueda no disponible"
+            elif self.indice is None:
+                # El índice aún se está construyendo: se reintenta en cuanto esté
+                titulo.configure(text="Datos Guardados (preparando la búsqueda...)")
+                programar_filtros(200)
+                return
+            else:
+                ids = self.indice.filtrar(
+                    texto,
+                    genero=None if genero == "Todos" else genero,
+                    intereses=[] if interes == "Todos" else [interes],
+                    limite=LIMITE_RESULTADOS + 1
+                )
+                if len(ids) > LIMITE_RESULTADOS:
+                    ids = ids[:LIMITE_RESULTADOS]
+                    resumen = f"más de {LIMITE_RESULTADOS} coincidencias, se muestran {LIMITE_RESULTADOS}"
+                else:
+                    resumen = f"{len(ids)} de {len(self.datos_guardados)} registros"
+                fuente = VistaFiltrada(self.datos_guardados, ids)
+            tabla.establecer_fuente(fuente)
+            titulo.configure(text=f"Datos Guardados ({resumen})")
+        
+        def programar_filtros(espera_ms=ESPERA_BUSQUEDA_MS):
+            # Solo se filtra cuando el usuario deja de teclear
+            nonlocal pendiente
+            if pendiente is not None:
+                tabla_window.after_cancel(pendiente)
+            pendiente = tabla_window.after(espera_ms, aplicar_filtros)
+        
+        busqueda_var.trace_add("write", lambda *_: programar_filtros())
+        
+        # Tabla virtual: solo se dibujan las filas visibles
+        columnas = [
+            ("Nombre", 20, lambda d: d['nombre']),
+            ("Email", 25, lambda d: d['email']),
+            ("Edad", 8, lambda d: d.get('edad', '')),
+            ("Género", 15, lambda d: d['genero']),
+            ("Intereses", 30, lambda d: ', '.join(d['intereses'])),
+            ("Fecha", 18, lambda d: d['fecha_registro'][:16]),
+        ]
+        tabla = TablaVirtual(main_frame, columnas, fuente=self.datos_guardados,
+                             font=self.estilos.fuente("tabla"))
+        tabla.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Botón cerrar
         ctk.CTkButton(
             main_frame,
             text="Cerrar",
             command=tabla_window.destroy,
-            font=ctk.CTkFont(size=12)
+            font=self.estilos.fuente("boton_pequeno")
         ).pack(pady=10)
     
     def guardar_datos(self):
@@ -416,6 +449,8 @@ class AplicacionInterfazFinal:
         
         # Agregar a la lista de datos
         self.datos_guardados.append(datos)
+        if self.indice is not None:
+            self.indice.agregar(len(self.datos_guardados) - 1, datos)
         
         # Mostrar información
         info_text = f"""✅ Datos guardados exitosamente:
@@ -434,9 +469,7 @@ class AplicacionInterfazFinal:
         
         # Guardar en archivo JSON
         try:
-            with open("datos_usuarios.json", "a", encoding="utf-8") as f:
-                json.dump(datos, f, ensure_ascii=False, indent=2)
-                f.write("\n")
+            escribir_registro(datos)
             messagebox.showinfo("Éxito", "Datos guardados en 'datos_usuarios.json'")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo guardar el archivo: {e}")
@@ -457,6 +490,7 @@ class AplicacionInterfazFinal:
     
     def ejecutar(self):
         self.root.mainloop()
+        self.ejecutor.cerrar()
 
 if __name__ == "__main__":
     app = AplicacionInterfazFinal()
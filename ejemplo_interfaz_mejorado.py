@@ -1,12 +1,14 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox, filedialog
-import json
 import csv
 from datetime import datetime
 import re
 from typing import List, Dict
 
+from almacen_registros import escribir_registro, leer_registros
+from estilos import RegistroEstilos
+
 # Configurar el tema
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -16,6 +18,8 @@ class AplicacionInterfazMejorada:
         self.root = ctk.CTk()
         self.root.title("Interfaz Moderna Mejorada - Python GUI Demo")
         self.root.geometry("1000x700")
+        # Fuentes y colores compartidos por todos los widgets
+        self.estilos = RegistroEstilos()
         
         # Variables
         self.nombre_var = tk.StringVar()
@@ -38,29 +42,25 @@ class AplicacionInterfazMejorada:
         self.crear_interfaz()
     
     def cargar_datos(self):
-        """Cargar datos existentes del archivo JSON"""
+        """Cargar datos existentes del archivo JSON (NDJSON, formato antiguo o array)"""
+        omitidos = []
         try:
-            with open("datos_usuarios.json", "r", encoding="utf-8") as f:
-                contenido = f.read().strip()
-                if contenido:
-                    # Procesar cada línea JSON
-                    for linea in contenido.split('\n'):
-                        if linea.strip():
-                            try:
-                                self.datos_guardados.append(json.loads(linea))
-                            except json.JSONDecodeError:
-                                # Ignorar líneas JSON malformadas
-                                continue
-        except FileNotFoundError:
-            pass
-        except Exception as e:
-            print(f"Error cargando datos: {e}")
-            # Si hay error, intentar cargar como array JSON
-            try:
-                with open("datos_usuarios.json", "r", encoding="utf-8") as f:
-                    self.datos_guardados = json.load(f)
-            except:
-                pass
+            self.datos_guardados.extend(leer_registros(omitidos=omitidos))
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo leer 'datos_usuarios.json': {e}")
+            return
+        if omitidos:
+            # Cuando la ventana ya está visible
+            self.root.after_idle(self.avisar_omitidos, omitidos)
+    
+    def avisar_omitidos(self, omitidos: List[str]):
+        """Avisar de los registros dañados que no se cargaron"""
+        ejemplos = "\n".join(omitidos[:5])
+        messagebox.showwarning(
+            "Registros omitidos",
+            f"Se omitieron {len(omitidos)} registros dañados o incompletos de "
+            f"'datos_usuarios.json':\n\n{ejemplos}"
+        )
     
     def crear_interfaz(self):
         # Frame principal
@@ -71,7 +71,7 @@ class AplicacionInterfazMejorada:
         titulo = ctk.CTkLabel(
             main_frame, 
             text="Formulario de Registro Mejorado", 
-            font=ctk.CTkFont(size=24, weight="bold")
+            font=self.estilos.fuente("titulo")
         )
         titulo.pack(pady=20)
         
@@ -80,7 +80,7 @@ class AplicacionInterfazMejorada:
         controles_frame.pack(fill="x", padx=20, pady=10)
         
         # Selector de tema
-        ctk.CTkLabel(controles_frame, text="Tema:", font=ctk.CTkFont(size=14)).pack(side="left", padx=10)
+        ctk.CTkLabel(controles_frame, text="Tema:", font=self.estilos.fuente("texto")).pack(side="left", padx=10)
         tema_menu = ctk.CTkOptionMenu(
             controles_frame,
             values=list(self.temas.keys()),
@@ -94,9 +94,7 @@ class AplicacionInterfazMejorada:
             controles_frame,
             text="Exportar CSV",
             command=self.exportar_csv,
-            font=ctk.CTkFont(size=12),
-            fg_color="orange",
-            hover_color="darkorange"
+            **self.estilos.boton("aviso", "boton_pequeno")
         )
         exportar_btn.pack(side="right", padx=10)
         
@@ -105,9 +103,7 @@ class AplicacionInterfazMejorada:
             controles_frame,
             text="Ver Datos",
             command=self.mostrar_tabla_datos,
-            font=ctk.CTkFont(size=12),
-            fg_color="#8B5CF6",
-            hover_color="#7C3AED"
+            **self.estilos.boton("acento", "boton_pequeno")
         )
         ver_datos_btn.pack(side="right", padx=10)
         
@@ -116,7 +112,7 @@ class AplicacionInterfazMejorada:
         form_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Nombre
-        ctk.CTkLabel(form_frame, text="Nombre:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(20,5))
+        ctk.CTkLabel(form_frame, text="Nombre:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(20,5))
         nombre_entry = ctk.CTkEntry(
             form_frame, 
             textvariable=self.nombre_var,
@@ -126,7 +122,7 @@ class AplicacionInterfazMejorada:
         nombre_entry.pack(padx=20, pady=(0,10))
         
         # Email
-        ctk.CTkLabel(form_frame, text="Email:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Email:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         email_entry = ctk.CTkEntry(
             form_frame, 
             textvariable=self.email_var,
@@ -136,7 +132,7 @@ class AplicacionInterfazMejorada:
         email_entry.pack(padx=20, pady=(0,10))
         
         # Edad
-        ctk.CTkLabel(form_frame, text="Edad:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Edad:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         edad_entry = ctk.CTkEntry(
             form_frame, 
             textvariable=self.edad_var,
@@ -146,7 +142,7 @@ class AplicacionInterfazMejorada:
         edad_entry.pack(padx=20, pady=(0,10))
         
         # Género
-        ctk.CTkLabel(form_frame, text="Género:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Género:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         genero_menu = ctk.CTkOptionMenu(
             form_frame,
             values=["Masculino", "Femenino", "No binario", "Prefiero no decir"],
@@ -156,7 +152,7 @@ class AplicacionInterfazMejorada:
         genero_menu.pack(padx=20, pady=(0,10))
         
         # Intereses
-        ctk.CTkLabel(form_frame, text="Intereses:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Intereses:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         
         intereses_frame = ctk.CTkFrame(form_frame)
         intereses_frame.pack(padx=20, pady=(0,10))
@@ -171,7 +167,7 @@ class AplicacionInterfazMejorada:
                 intereses_frame, 
                 text=interes, 
                 variable=var,
-                font=ctk.CTkFont(size=12)
+                font=self.estilos.fuente("texto_pequeno")
             )
             checkbox.grid(row=i//4, column=i%4, padx=10, pady=5, sticky="w")
         
@@ -184,9 +180,7 @@ class AplicacionInterfazMejorada:
             botones_frame,
             text="Guardar Datos",
             command=self.guardar_datos,
-            font=ctk.CTkFont(size=14, weight="bold"),
-            fg_color="green",
-            hover_color="darkgreen"
+            **self.estilos.boton("exito", "boton_destacado")
         )
         guardar_btn.pack(side="left", padx=10)
         
@@ -195,9 +189,7 @@ class AplicacionInterfazMejorada:
             botones_frame,
             text="Limpiar",
             command=self.limpiar_formulario,
-            font=ctk.CTkFont(size=14),
-            fg_color="orange",
-            hover_color="darkorange"
+            **self.estilos.boton("aviso")
         )
         limpiar_btn.pack(side="left", padx=10)
         
@@ -206,7 +198,7 @@ class AplicacionInterfazMejorada:
             botones_frame,
             text="Cambiar Modo",
             command=self.cambiar_modo,
-            font=ctk.CTkFont(size=14)
+            font=self.estilos.fuente("boton")
         )
         tema_btn.pack(side="left", padx=10)
         
@@ -293,11 +285,11 @@ class AplicacionInterfazMejorada:
         ctk.CTkLabel(
             main_frame, 
             text=f"Datos Guardados ({len(self.datos_guardados)} registros)", 
-            font=ctk.CTkFont(size=18, weight="bold")
+            font=self.estilos.fuente("subtitulo")
         ).pack(pady=10)
         
         # Crear tabla usando Text widget
-        tabla_text = ctk.CTkTextbox(main_frame, font=ctk.CTkFont(size=11))
+        tabla_text = ctk.CTkTextbox(main_frame, font=self.estilos.fuente("texto_tabla"))
         tabla_text.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Encabezados
@@ -322,7 +314,7 @@ class AplicacionInterfazMejorada:
             main_frame,
             text="Cerrar",
             command=tabla_window.destroy,
-            font=ctk.CTkFont(size=12)
+            font=self.estilos.fuente("boton_pequeno")
         ).pack(pady=10)
     
     def guardar_datos(self):
@@ -380,9 +372,7 @@ class AplicacionInterfazMejorada:
         
         # Guardar en archivo JSON
         try:
-            with open("datos_usuarios.json", "a", encoding="utf-8") as f:
-                json.dump(datos, f, ensure_ascii=False, indent=2)
-                f.write("\n")
+            escribir_registro(datos)
             messagebox.showinfo("Éxito", "Datos guardados en 'datos_usuarios.json'")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo guardar el archivo: {e}")
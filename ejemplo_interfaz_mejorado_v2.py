@@ -1,12 +1,13 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox, filedialog
-import json
 import csv
 from datetime import datetime
 import re
 from typing import List, Dict
-import os
+
+from almacen_registros import escribir_registro, leer_registros, validar_registro
+from estilos import RegistroEstilos
 
 # Configurar el tema
 ctk.set_appearance_mode("dark")
@@ -17,6 +18,8 @@ class AplicacionInterfazMejoradaV2:
         self.root = ctk.CTk()
         self.root.title("Interfaz Moderna Mejorada v2 - Python GUI Demo")
         self.root.geometry("1000x700")
+        # Fuentes y colores compartidos por todos los widgets
+        self.estilos = RegistroEstilos()
         
         # Variables
         self.nombre_var = tk.StringVar()
@@ -39,57 +42,17 @@ class AplicacionInterfazMejoradaV2:
     
     def cargar_datos(self):
         """Cargar datos existentes del archivo JSON de forma robusta"""
-        if not os.path.exists("datos_usuarios.json"):
-            return
-        
         try:
-            with open("datos_usuarios.json", "r", encoding="utf-8") as f:
-                contenido = f.read().strip()
-                if not contenido:
-                    return
-                
-                # Intentar cargar como JSON array primero
-                try:
-                    datos_array = json.loads(contenido)
-                    if isinstance(datos_array, list):
-                        # Validar que cada elemento sea un diccionario válido
-                        for dato in datos_array:
-                            if isinstance(dato, dict) and self.validar_dato(dato):
-                                self.datos_guardados.append(dato)
-                        return
-                except json.JSONDecodeError:
-                    pass
-                
-                # Si no es array, procesar línea por línea
-                for linea in contenido.split('\n'):
-                    linea = linea.strip()
-                    if linea:
-                        try:
-                            dato = json.loads(linea)
-                            if self.validar_dato(dato):
-                                self.datos_guardados.append(dato)
-                        except json.JSONDecodeError:
-                            continue
-                            
+            # Lectura en streaming: acepta NDJSON y el formato antiguo con sangría
+            for dato in leer_registros(validar=False):
+                if self.validar_dato(dato):
+                    self.datos_guardados.append(dato)
         except Exception as e:
             print(f"Error cargando datos: {e}")
     
     def validar_dato(self, dato):
         """Validar que un dato tenga la estructura correcta"""
-        if not isinstance(dato, dict):
-            return False
-        
-        # Verificar campos obligatorios
-        campos_requeridos = ['nombre', 'email', 'genero', 'intereses', 'fecha_registro']
-        for campo in campos_requeridos:
-            if campo not in dato:
-                return False
-        
-        # Verificar que intereses sea una lista
-        if not isinstance(dato['intereses'], list):
-            return False
-        
-        return True
+        return validar_registro(dato)
     
     def crear_interfaz(self):
         # Frame principal
@@ -100,7 +63,7 @@ class AplicacionInterfazMejoradaV2:
         titulo = ctk.CTkLabel(
             main_frame, 
             text="Formulario de Registro Mejorado v2", 
-            font=ctk.CTkFont(size=24, weight="bold")
+            font=self.estilos.fuente("titulo")
         )
         titulo.pack(pady=20)
         
@@ -109,7 +72,7 @@ class AplicacionInterfazMejoradaV2:
         controles_frame.pack(fill="x", padx=20, pady=10)
         
         # Selector de tema
-        ctk.CTkLabel(controles_frame, text="Tema:", font=ctk.CTkFont(size=14)).pack(side="left", padx=10)
+        ctk.CTkLabel(controles_frame, text="Tema:", font=self.estilos.fuente("texto")).pack(side="left", padx=10)
         tema_menu = ctk.CTkOptionMenu(
             controles_frame,
             values=list(self.temas.keys()),
@@ -123,9 +86,7 @@ class AplicacionInterfazMejoradaV2:
             controles_frame,
             text="Exportar CSV",
             command=self.exportar_csv,
-            font=ctk.CTkFont(size=12),
-            fg_color="#FF9800",
-            hover_color="#F57C00"
+            **self.estilos.boton("aviso", "boton_pequeno")
         )
         exportar_btn.pack(side="right", padx=10)
         
@@ -134,9 +95,7 @@ class AplicacionInterfazMejoradaV2:
             controles_frame,
             text="Ver Datos",
             command=self.mostrar_tabla_datos,
-            font=ctk.CTkFont(size=12),
-            fg_color="#8B5CF6",
-            hover_color="#7C3AED"
+            **self.estilos.boton("acento", "boton_pequeno")
         )
         ver_datos_btn.pack(side="right", padx=10)
         
@@ -145,7 +104,7 @@ class AplicacionInterfazMejoradaV2:
         form_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Nombre
-        ctk.CTkLabel(form_frame, text="Nombre:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(20,5))
+        ctk.CTkLabel(form_frame, text="Nombre:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(20,5))
         nombre_entry = ctk.CTkEntry(
             form_frame, 
             textvariable=self.nombre_var,
@@ -155,7 +114,7 @@ class AplicacionInterfazMejoradaV2:
         nombre_entry.pack(padx=20, pady=(0,10))
         
         # Email
-        ctk.CTkLabel(form_frame, text="Email:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Email:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         email_entry = ctk.CTkEntry(
             form_frame, 
             textvariable=self.email_var,
@@ -165,7 +124,7 @@ class AplicacionInterfazMejoradaV2:
         email_entry.pack(padx=20, pady=(0,10))
         
         # Edad
-        ctk.CTkLabel(form_frame, text="Edad:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Edad:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         edad_entry = ctk.CTkEntry(
             form_frame, 
             textvariable=self.edad_var,
@@ -175,7 +134,7 @@ class AplicacionInterfazMejoradaV2:
         edad_entry.pack(padx=20, pady=(0,10))
         
         # Género
-        ctk.CTkLabel(form_frame, text="Género:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Género:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         genero_menu = ctk.CTkOptionMenu(
             form_frame,
             values=["Masculino", "Femenino", "No binario", "Prefiero no decir"],
@@ -185,7 +144,7 @@ class AplicacionInterfazMejoradaV2:
         genero_menu.pack(padx=20, pady=(0,10))
         
         # Intereses
-        ctk.CTkLabel(form_frame, text="Intereses:", font=ctk.CTkFont(size=14)).pack(anchor="w", padx=20, pady=(10,5))
+        ctk.CTkLabel(form_frame, text="Intereses:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
         
         intereses_frame = ctk.CTkFrame(form_frame)
         intereses_frame.pack(padx=20, pady=(0,10))
@@ -200,7 +159,7 @@ class AplicacionInterfazMejoradaV2:
                 intereses_frame, 
                 text=interes, 
                 variable=var,
-                font=ctk.CTkFont(size=12)
+                font=self.estilos.fuente("texto_pequeno")
             )
             checkbox.grid(row=i//4, column=i%4, padx=10, pady=5, sticky="w")
         
@@ -213,9 +172,7 @@ class AplicacionInterfazMejoradaV2:
             botones_frame,
             text="Guardar Datos",
             command=self.guardar_datos,
-            font=ctk.CTkFont(size=14, weight="bold"),
-            fg_color="#4CAF50",
-            hover_color="#45A049"
+            **self.estilos.boton("exito", "boton_destacado")
         )
         guardar_btn.pack(side="left", padx=10)
         
@@ -224,9 +181,7 @@ class AplicacionInterfazMejoradaV2:
             botones_frame,
             text="Limpiar",
             command=self.limpiar_formulario,
-            font=ctk.CTkFont(size=14),
-            fg_color="#FF9800",
-            hover_color="#F57C00"
+            **self.estilos.boton("aviso")
         )
         limpiar_btn.pack(side="left", padx=10)
         
@@ -235,7 +190,7 @@ class AplicacionInterfazMejoradaV2:
             botones_frame,
             text="Cambiar Modo",
             command=self.cambiar_modo,
-            font=ctk.CTkFont(size=14)
+            font=self.estilos.fuente("boton")
         )
         tema_btn.pack(side="left", padx=10)
         
@@ -322,11 +277,11 @@ class AplicacionInterfazMejoradaV2:
         ctk.CTkLabel(
             main_frame, 
             text=f"Datos Guardados ({len(self.datos_guardados)} registros)", 
-            font=ctk.CTkFont(size=18, weight="bold")
+            font=self.estilos.fuente("subtitulo")
         ).pack(pady=10)
         
         # Crear tabla usando Text widget
-        tabla_text = ctk.CTkTextbox(main_frame, font=ctk.CTkFont(size=11))
+        tabla_text = ctk.CTkTextbox(main_frame, font=self.estilos.fuente("texto_tabla"))
         tabla_text.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Encabezados
@@ -370,7 +325,7 @@ class AplicacionInterfazMejoradaV2:
             main_frame,
             text="Cerrar",
             command=tabla_window.destroy,
-            font=ctk.CTkFont(size=12)
+            font=self.estilos.fuente("boton_pequeno")
         ).pack(pady=10)
     
     def guardar_datos(self):
@@ -428,9 +383,7 @@ class AplicacionInterfazMejoradaV2:
         
         # Guardar en archivo JSON
         try:
-            with open("datos_usuarios.json", "a", encoding="utf-8") as f:
-                json.dump(datos, f, ensure_ascii=False, indent=2)
-                f.write("\n")
+            escribir_registro(datos)
             messagebox.showinfo("Éxito", "Datos guardados en 'datos_usuarios.json'")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo guardar el archivo: {e}")
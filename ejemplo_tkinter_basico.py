@@ -1,8 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 from datetime import datetime
 
+from almacen_registros import escribir_registro
+
 class AplicacionBasica:
     def __init__(self):
         self.root = tk.Tk()
@@ -171,9 +172,7 @@ class AplicacionBasica:
         
         # Guardar en archivo JSON
         try:
-            with open("datos_usuarios.json", "a", encoding="utf-8") as f:
-                json.dump(datos, f, ensure_ascii=False, indent=2)
-                f.write("\n")
+            escribir_registro(datos)
             messagebox.showinfo("Éxito", "Datos guardados en 'datos_usuarios.json'")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo guardar el archivo: {e}")
@@ -0,0 +1,136 @@
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from diario_usuarios import escribir_json_atomico
+
+DIAS_HISTORIAL = 30
+
+
+class EstadisticasUsuarios:
+    """Contadores del sistema actualizados en cada alta y login.
+
+    El panel de estadísticas lee estos contadores en O(1) en lugar de
+    recorrer todos los usuarios. Las series por día/hora se guardan solo
+    para los últimos DIAS_HISTORIAL días.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.por_rol: Dict[str, int] = {}
+        self.con_login = 0
+        self.registros_por_dia: Dict[str, int] = {}   # "YYYY-MM-DD" -> altas
+        self.logins_por_hora: Dict[str, int] = {}     # "YYYY-MM-DD HH" -> logins
+
+    # --- Eventos ---
+    def registrar_alta(self, role: str, created_at: str):
+        self.total += 1
+        self.por_rol[role] = self.por_rol.get(role, 0) + 1
+        dia = created_at[:10]
+        self.registros_por_dia[dia] = self.registros_por_dia.get(dia, 0) + 1
+
+    def registrar_login(self, momento: str, primer_login: bool):
+        if primer_login:
+            self.con_login += 1
+        hora = momento[:13]
+        self.logins_por_hora[hora] = self.logins_por_hora.get(hora, 0) + 1
+
+    # --- Consultas ---
+    def registrados_hoy(self) -> int:
+        return self.registros_por_dia.get(datetime.now().strftime("%Y-%m-%d"), 0)
+
+    def logins_ultimas_horas(self, horas: int = 24) -> int:
+        ahora = datetime.now()
+        return sum(
+            self.logins_por_hora.get((ahora - timedelta(hours=h)).strftime("%Y-%m-%d %H"), 0)
+            for h in range(horas)
+        )
+
+    def serie_diaria(self, dias: int = DIAS_HISTORIAL) -> List[Tuple[str, int, int]]:
+        """(día, altas, logins) de los últimos `dias` días, del más antiguo al más reciente"""
+        logins_por_dia: Dict[str, int] = {}
+        for hora, cantidad in self.logins_por_hora.items():
+            logins_por_dia[hora[:10]] = logins_por_dia.get(hora[:10], 0) + cantidad
+        hoy = datetime.now()
+        serie = []
+        for d in range(dias - 1, -1, -1):
+            dia = (hoy - timedelta(days=d)).strftime("%Y-%m-%d")
+            serie.append((dia, self.registros_por_dia.get(dia, 0), logins_por_dia.get(dia, 0)))
+        return serie
+
+    # --- Persistencia ---
+    def _podar(self):
+        self.registros_por_dia, self.logins_por_hora = self._series_recientes()
+
+    def _series_recientes(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        # list() copia los items de una vez, así que se puede llamar desde el
+        # hilo de escritura aunque la interfaz siga sumando contadores
+        limite = (datetime.now() - timedelta(days=DIAS_HISTORIAL)).strftime("%Y-%m-%d")
+        registros = {d: n for d, n in list(self.registros_por_dia.items()) if d >= limite}
+        logins = {h: n for h, n in list(self.logins_por_hora.items()) if h[:10] >= limite}
+        return registros, logins
+
+    def to_dict(self) -> Dict:
+        registros_por_dia, logins_por_hora = self._series_recientes()
+        return {
+            "total": self.total,
+            "por_rol": dict(self.por_rol),
+            "con_login": self.con_login,
+            "registros_por_dia": registros_por_dia,
+            "logins_por_hora": logins_por_hora,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EstadisticasUsuarios":
+        stats = cls()
+        stats.total = data.get("total", 0)
+        stats.por_rol = data.get("por_rol", {})
+        stats.con_login = data.get("con_login", 0)
+        stats.registros_por_dia = data.get("registros_por_dia", {})
+        stats.logins_por_hora = data.get("logins_por_hora", {})
+        return stats
+
+    def guardar(self, ruta: str, sincronizar: bool = True):
+        escribir_json_atomico(ruta, self.to_dict(), indent=None, sincronizar=sincronizar)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> "EstadisticasUsuarios":
+        if not os.path.exists(ruta):
+            return cls()
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except Exception as e:
+            print(f"Error cargando estadísticas: {e}")
+            return cls()
+
+    def reconstruir(self, usuarios: Iterable):
+        """Recalcular los contadores a partir de los usuarios.
+
+        Se usa cuando el archivo de estadísticas falta o no cuadra con los
+        datos. Conserva la serie de logins por hora ya guardada, que no se
+        puede deducir de los usuarios (solo guardan el último login).
+        """
+        self.total = 0
+        self.por_rol = {}
+        self.con_login = 0
+        self.registros_por_dia = {}
+        for user in usuarios:
+            self.registrar_alta(user.role, user.created_at)
+            if user.last_login:
+                self.con_login += 1
+        self._podar()
+
+    def reconstruir_desde_resumen(self, total: int, resumen: Dict):
+        """Recalcular los contadores desde un resumen ya agregado, sin recorrer usuarios
+
+        `resumen` tiene `por_rol`, `con_login` y `registros_por_dia` (el del
+        snapshot indexado más los cambios del diario). Como `reconstruir`,
+        conserva la serie de logins por hora.
+        """
+        self.total = total
+        self.por_rol = dict(resumen["por_rol"])
+        self.con_login = resumen["con_login"]
+        self.registros_por_dia = dict(resumen["registros_por_dia"])
+        self._podar()
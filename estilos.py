@@ -0,0 +1,92 @@
+"""Fuentes y colores compartidos por rol para las interfaces CustomTkinter.
+
+Cada `ctk.CTkFont(...)` es una fuente con nombre de Tk distinta, y
+CustomTkinter la reescala por separado en cada widget que la usa. El registro
+entrega un único objeto por rol (título, texto, botón, tabla...), creado la
+primera vez que se pide, así que una pantalla con cientos de widgets usa unas
+pocas fuentes en lugar de una por widget.
+
+Es además el único sitio donde se cambian: `configurar_fuente` y `escalar`
+reconfiguran la fuente compartida y CustomTkinter actualiza todos los widgets
+que la usan. Los colores van en pares (normal, hover); el modo claro/oscuro lo
+resuelve CustomTkinter y no necesita tocarlos.
+"""
+from typing import Dict, Optional, Tuple
+
+import customtkinter as ctk
+
+# Opciones de ctk.CTkFont por rol (el tamaño es el de escala 1)
+FUENTES: Dict[str, Dict] = {
+    "titulo_grande": {"size": 28, "weight": "bold"},
+    "titulo": {"size": 24, "weight": "bold"},
+    "titulo_dialogo": {"size": 20, "weight": "bold"},
+    "subtitulo": {"size": 18, "weight": "bold"},
+    "cabecera": {"size": 16, "weight": "bold"},
+    "texto": {"size": 14},
+    "texto_pequeno": {"size": 12},
+    "boton": {"size": 14},
+    "boton_destacado": {"size": 14, "weight": "bold"},
+    "boton_pequeno": {"size": 12},
+    "tabla": {"family": "Courier", "size": 11},
+    "texto_tabla": {"size": 11},
+}
+
+# (color normal, color al pasar el ratón) por rol
+COLORES: Dict[str, Tuple[str, str]] = {
+    "exito": ("#4CAF50", "#45A049"),
+    "peligro": ("#F44336", "#D32F2F"),
+    "info": ("#2196F3", "#1976D2"),
+    "aviso": ("#FF9800", "#F57C00"),
+    "acento": ("#8B5CF6", "#7C3AED"),
+    "morado": ("#9C27B0", "#7B1FA2"),
+    "neutro": ("#607D8B", "#455A64"),
+}
+
+
+class RegistroEstilos:
+    """Fuentes y colores de una aplicación; las fuentes se crean tras la ventana raíz"""
+
+    def __init__(self, fuentes: Optional[Dict[str, Dict]] = None,
+                 colores: Optional[Dict[str, Tuple[str, str]]] = None, escala: float = 1.0):
+        self._roles = {rol: dict(opciones) for rol, opciones in (fuentes or FUENTES).items()}
+        self.colores = dict(colores or COLORES)
+        self.escala = escala
+        self._fuentes: Dict[str, ctk.CTkFont] = {}
+
+    def _opciones(self, rol: str) -> Dict:
+        opciones = dict(self._roles[rol])
+        opciones["size"] = max(1, round(opciones["size"] * self.escala))
+        return opciones
+
+    def fuente(self, rol: str) -> ctk.CTkFont:
+        """Fuente compartida del rol"""
+        fuente = self._fuentes.get(rol)
+        if fuente is None:
+            fuente = self._fuentes[rol] = ctk.CTkFont(**self._opciones(rol))
+        return fuente
+
+    def color(self, rol: str) -> str:
+        return self.colores[rol][0]
+
+    def boton(self, color: Optional[str] = None, fuente: str = "boton") -> Dict:
+        """Opciones de un CTkButton: `ctk.CTkButton(..., **estilos.boton("exito"))`"""
+        opciones = {"font": self.fuente(fuente)}
+        if color is not None:
+            opciones["fg_color"], opciones["hover_color"] = self.colores[color]
+        return opciones
+
+    def configurar_fuente(self, rol: str, **opciones):
+        """Cambiar la fuente de un rol en todos los widgets que la usan"""
+        self._roles.setdefault(rol, {"size": 14}).update(opciones)
+        if rol in self._fuentes:
+            self._fuentes[rol].configure(**self._opciones(rol))
+
+    def escalar(self, escala: float):
+        """Cambiar el tamaño de todas las fuentes (la escala por DPI la aplica CustomTkinter)"""
+        self.escala = escala
+        for rol, fuente in self._fuentes.items():
+            fuente.configure(**self._opciones(rol))
+
+    @property
+    def fuentes_creadas(self) -> int:
+        return len(self._fuentes)
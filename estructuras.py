@@ -0,0 +1,44 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator, Tuple
+
+
+class CacheLRU:
+    """Caché acotada que descarta la entrada usada hace más tiempo"""
+
+    def __init__(self, capacidad: int = 1024):
+        self.capacidad = capacidad
+        self._datos: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave: Hashable, defecto: Any = None) -> Any:
+        try:
+            valor = self._datos[clave]
+        except KeyError:
+            self.fallos += 1
+            return defecto
+        self._datos.move_to_end(clave)
+        self.aciertos += 1
+        return valor
+
+    def guardar(self, clave: Hashable, valor: Any):
+        self._datos[clave] = valor
+        self._datos.move_to_end(clave)
+        if len(self._datos) > self.capacidad:
+            self._datos.popitem(last=False)
+
+    def invalidar(self, clave: Hashable):
+        self._datos.pop(clave, None)
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Entradas de la más antigua a la más reciente (sin contar como uso)"""
+        return iter(list(self._datos.items()))
+
+    def limpiar(self):
+        self._datos.clear()
+
+    def __contains__(self, clave: Hashable) -> bool:
+        return clave in self._datos
+
+    def __len__(self) -> int:
+        return len(self._datos)
@@ -0,0 +1,115 @@
+import csv
+import json
+import re
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from almacen_registros import iterar_valores
+from contrasenas import hashear_password
+
+CAMPOS_EXPORTACION = ["username", "password_hash", "email", "role", "created_at", "last_login"]
+ROLES_VALIDOS = ("user", "admin")
+MAX_ERRORES_GUARDADOS = 10000
+PATRON_FECHA = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+# Campos que deben ser texto (en JSON pueden llegar números, listas o booleanos)
+CAMPOS_TEXTO = ("username", "email", "role", "password", "password_hash", "created_at", "last_login")
+
+
+class ResultadoImportacion:
+    """Resumen de una importación: filas importadas y errores por fila"""
+
+    def __init__(self):
+        self.importados = 0
+        self.total_errores = 0
+        # (número de fila, motivo); se guardan como mucho MAX_ERRORES_GUARDADOS
+        self.errores: List[Tuple[int, str]] = []
+
+    def agregar_error(self, fila: int, motivo: str):
+        self.total_errores += 1
+        if len(self.errores) < MAX_ERRORES_GUARDADOS:
+            self.errores.append((fila, motivo))
+
+    def __repr__(self):
+        return f"ResultadoImportacion(importados={self.importados}, errores={self.total_errores})"
+
+
+def leer_usuarios_csv(ruta: str) -> Iterator[Dict]:
+    """Leer filas de usuario desde un CSV con cabecera, una a una"""
+    with open(ruta, "r", newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def leer_usuarios_ndjson(ruta: str) -> Iterator[Dict]:
+    """Leer filas de usuario desde un archivo NDJSON (o array JSON), una a una"""
+    with open(ruta, "r", encoding="utf-8") as f:
+        for valor in iterar_valores(f):
+            if isinstance(valor, dict):
+                yield valor
+
+
+def leer_usuarios(ruta: str) -> Iterator[Dict]:
+    """Elegir el lector según la extensión del archivo"""
+    if ruta.lower().endswith(".csv"):
+        return leer_usuarios_csv(ruta)
+    return leer_usuarios_ndjson(ruta)
+
+
+def normalizar_fila(fila: Dict, validar_email: Callable[[str], bool]) -> Tuple[Optional[str], Optional[Dict]]:
+    """Validar una fila de importación y convertirla al formato de Usuario.to_dict
+
+    Devuelve (motivo del error, None) o (None, datos). La fila debe traer
+    `password` (se hashea) o un `password_hash` ya calculado.
+    """
+    for campo in CAMPOS_TEXTO:
+        valor = fila.get(campo)
+        if valor is not None and not isinstance(valor, str):
+            return f"El campo {campo} debe ser texto", None
+    username = (fila.get("username") or "").strip()
+    email = (fila.get("email") or "").strip()
+    role = (fila.get("role") or "user").strip()
+    password = fila.get("password") or ""
+    password_hash = fila.get("password_hash") or ""
+
+    if not username:
+        return "Falta el nombre de usuario", None
+    if not validar_email(email):
+        return "El formato del email no es válido", None
+    if role not in ROLES_VALIDOS:
+        return f"Rol desconocido: {role}", None
+    created_at = fila.get("created_at") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    last_login = fila.get("last_login") or None
+    if not PATRON_FECHA.match(created_at) or (last_login and not PATRON_FECHA.match(last_login)):
+        return "Fecha con formato inválido (se espera YYYY-MM-DD HH:MM:SS)", None
+    if not password_hash:
+        if len(password) < 6:
+            return "La contraseña debe tener al menos 6 caracteres", None
+        password_hash = hashear_password(password)
+
+    profile_data = fila.get("profile_data")
+    return None, {
+        "username": username,
+        "password_hash": password_hash,
+        "email": email,
+        "role": role,
+        "created_at": created_at,
+        "last_login": last_login,
+        "profile_data": profile_data if isinstance(profile_data, dict) else {},
+    }
+
+
+def escribir_usuarios(filas: Iterable[Dict], stream: TextIO, formato: str = "csv") -> int:
+    """Escribir usuarios en un stream abierto como CSV o NDJSON"""
+    total = 0
+    if formato == "csv":
+        writer = csv.DictWriter(stream, fieldnames=CAMPOS_EXPORTACION, extrasaction="ignore")
+        writer.writeheader()
+        for fila in filas:
+            writer.writerow(fila)
+            total += 1
+    elif formato == "ndjson":
+        for fila in filas:
+            stream.write(json.dumps(fila, ensure_ascii=False, separators=(",", ":")) + "\n")
+            total += 1
+    else:
+        raise ValueError(f"Formato de exportación desconocido: {formato}")
+    return total
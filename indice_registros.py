@@ -0,0 +1,163 @@
+from bisect import bisect_left
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+# Clave reservada en los nodos del trie para los ids que terminan en ese nodo
+_IDS = ""
+
+
+def _normalizar(texto: str) -> str:
+    return " ".join(str(texto).lower().split())
+
+
+def _hashable(valor) -> bool:
+    try:
+        hash(valor)
+    except TypeError:
+        return False
+    return True
+
+
+class TrieNombres:
+    """Trie de prefijos sobre nombres normalizados (minúsculas, espacios simples)"""
+
+    def __init__(self):
+        self.raiz: Dict = {}
+
+    def insertar(self, texto: str, id_registro: int):
+        nodo = self.raiz
+        for caracter in texto:
+            nodo = nodo.setdefault(caracter, {})
+        nodo.setdefault(_IDS, []).append(id_registro)
+
+    def buscar_prefijo(self, prefijo: str) -> Iterator[int]:
+        """Ids cuyos textos empiezan por `prefijo` (se generan de forma perezosa)"""
+        nodo = self.raiz
+        for caracter in prefijo:
+            nodo = nodo.get(caracter)
+            if nodo is None:
+                return
+        pendientes = [nodo]
+        while pendientes:
+            actual = pendientes.pop()
+            for clave, hijo in actual.items():
+                if clave == _IDS:
+                    yield from hijo
+                else:
+                    pendientes.append(hijo)
+
+
+class IndiceRegistros:
+    """Índices en memoria sobre los registros del formulario.
+
+    - email y género: índices hash (valor -> ids)
+    - intereses: índice invertido (interés -> ids)
+    - nombre: trie de prefijos sobre el nombre completo y cada palabra
+
+    Los ids son posiciones en la lista de registros, así que `agregar` se
+    llama con el índice del registro recién añadido.
+    """
+
+    def __init__(self):
+        self.por_email: Dict[str, List[int]] = {}
+        self.por_genero: Dict[str, List[int]] = {}
+        self.por_interes: Dict[str, List[int]] = {}
+        self.nombres = TrieNombres()
+        self.total = 0
+
+    @classmethod
+    def construir(cls, registros: Iterable[Dict]) -> "IndiceRegistros":
+        indice = cls()
+        for id_registro, dato in enumerate(registros):
+            indice.agregar(id_registro, dato)
+        return indice
+
+    def agregar(self, id_registro: int, dato: Dict):
+        """Añadir un registro a todos los índices"""
+        self.por_email.setdefault(_normalizar(dato["email"]), []).append(id_registro)
+        genero = dato["genero"] if _hashable(dato["genero"]) else str(dato["genero"])
+        self.por_genero.setdefault(genero, []).append(id_registro)
+        # `validar_registro` admite cualquier valor en la lista; los no hashables
+        # (listas, dicts) no se pueden elegir en el filtro y se omiten
+        for interes in dict.fromkeys(i for i in dato["intereses"] if _hashable(i)):
+            self.por_interes.setdefault(interes, []).append(id_registro)
+
+        nombre = _normalizar(dato["nombre"])
+        self.nombres.insertar(nombre, id_registro)
+        # Cada palabra posterior a la primera, para encontrar "pérez" en "juan pérez"
+        for palabra in set(nombre.split(" ")[1:]):
+            self.nombres.insertar(palabra, id_registro)
+        self.total = max(self.total, id_registro + 1)
+
+    def buscar_email(self, email: str) -> List[int]:
+        return list(self.por_email.get(_normalizar(email), []))
+
+    def filtrar(self, texto: str = "", genero: Optional[str] = None,
+                intereses: Sequence[str] = (), limite: Optional[int] = None) -> List[int]:
+        """Ids que cumplen todos los filtros, en orden de inserción.
+
+        `texto` se busca como email exacto si contiene "@" y como prefijo de
+        nombre en otro caso. Con `limite` la búsqueda se detiene al llegar a
+        ese número de resultados; con prefijo de nombre no son necesariamente
+        los primeros en orden de inserción, porque se recorre el trie.
+        """
+        conjuntos = []
+        if genero:
+            conjuntos.append(self.por_genero.get(genero, []))
+        for interes in intereses:
+            conjuntos.append(self.por_interes.get(interes, []))
+
+        texto = _normalizar(texto)
+        if texto and "@" in texto:
+            conjuntos.append(self.por_email.get(texto, []))
+            texto = ""
+
+        if not texto:
+            if not conjuntos:
+                ids = range(self.total)
+                return list(ids[:limite] if limite else ids)
+            if len(conjuntos) == 1:
+                # Las listas de los índices ya están en orden de inserción
+                return list(conjuntos[0][:limite] if limite else conjuntos[0])
+            # Intersección empezando por el índice más pequeño
+            conjuntos.sort(key=len)
+            comunes = set(conjuntos[0])
+            for ids in conjuntos[1:]:
+                comunes.intersection_update(ids)
+            ids = sorted(comunes)
+            return ids[:limite] if limite else ids
+
+        # Con prefijo de nombre se recorre el trie de forma perezosa y se
+        # comprueban el resto de filtros con bisect (las listas están ordenadas)
+        candidatos = self._sin_repetir(self.nombres.buscar_prefijo(texto))
+        resultado = (i for i in candidatos if all(self._contiene(c, i) for c in conjuntos))
+        ids = list(islice(resultado, limite) if limite else resultado)
+        ids.sort()
+        return ids
+
+    @staticmethod
+    def _contiene(ids: List[int], id_registro: int) -> bool:
+        posicion = bisect_left(ids, id_registro)
+        return posicion < len(ids) and ids[posicion] == id_registro
+
+    @staticmethod
+    def _sin_repetir(ids: Iterable[int]) -> Iterator[int]:
+        vistos = set()
+        for i in ids:
+            if i not in vistos:
+                vistos.add(i)
+                yield i
+
+
+class VistaFiltrada:
+    """Secuencia de solo lectura con un subconjunto de registros (para TablaVirtual)"""
+
+    def __init__(self, registros: Sequence, ids: Sequence[int]):
+        self.registros = registros
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, posicion: int):
+        return self.registros[self.ids[posicion]]
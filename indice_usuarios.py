@@ -0,0 +1,460 @@
+"""Snapshot de usuarios con índice aparte, para cargar los usuarios bajo demanda.
+
+El snapshot sigue siendo un array JSON válido (lo pueden leer el modo normal
+y el migrador), pero con un usuario compacto por línea. `<archivo>.indice`
+guarda dónde empieza y cuánto ocupa cada uno:
+
+    cabecera   magia, tamaño y mtime del snapshot, número de usuarios
+    entradas   (posición, longitud, hash del username, hash del email) en orden de archivo
+    username   números de entrada ordenados por hash del username
+    email      números de entrada ordenados por hash del email normalizado
+    resumen    JSON con los contadores de estadísticas del snapshot (por rol,
+               con login, altas por día), para recalcularlas sin recorrerlo
+
+Los dos archivos se abren con mmap: al arrancar no se lee ningún usuario y
+cada búsqueda es una búsqueda binaria sobre el índice más un `json.loads`
+del registro. Si el índice falta o no corresponde al snapshot (p. ej. lo
+reescribió el modo normal) se reconstruye una vez recorriendo el snapshot.
+
+Windows no deja reemplazar un archivo abierto con mmap, así que al escribir
+un snapshot nuevo se cierran los mapas del anterior (con el lock tomado)
+antes de los `os.replace`. Por eso ninguna lectura guarda un
+`IndiceUsuarios` fuera del lock: todas pasan por `UsuariosPerezosos`.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from almacen_registros import iterar_valores
+from estructuras import CacheLRU
+from modelo_usuarios import Usuario, normalizar_email
+
+MAGIA = b"USRIDX02"
+CABECERA = struct.Struct("<8sQqQ")   # magia, tamaño y mtime_ns del snapshot, usuarios
+ENTRADA = struct.Struct("<QIQQ")     # posición, longitud, hash username, hash email
+NUMERO = struct.Struct("<I")
+CAPACIDAD_CACHE = 10000              # usuarios materializados que se conservan
+
+# (índice, {username: datos modificados}, {username: datos nuevos})
+CapturaUsuarios = Tuple["IndiceUsuarios", Dict[str, Dict], Dict[str, Dict]]
+
+
+def hash_clave(texto: str) -> int:
+    # Estable entre procesos, a diferencia de hash()
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def resumen_vacio() -> Dict:
+    return {"por_rol": {}, "con_login": 0, "registros_por_dia": {}}
+
+
+def sumar_al_resumen(resumen: Dict, datos: Dict, signo: int = 1):
+    """Añadir (o con signo -1 quitar) un usuario en formato to_dict a los contadores"""
+    for contadores, clave in ((resumen["por_rol"], datos["role"]),
+                              (resumen["registros_por_dia"], datos["created_at"][:10])):
+        contadores[clave] = contadores.get(clave, 0) + signo
+        if not contadores[clave]:
+            del contadores[clave]
+    if datos.get("last_login"):
+        resumen["con_login"] += signo
+
+
+def _abrir_mmap(ruta: str) -> mmap.mmap:
+    with open(ruta, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class IndiceUsuarios:
+    """Snapshot indexado abierto con mmap (solo lectura)"""
+
+    def __init__(self, snapshot: Optional[mmap.mmap] = None, indice: Optional[mmap.mmap] = None):
+        self.snapshot = snapshot
+        self.indice = indice
+        self.total = CABECERA.unpack_from(indice)[3] if indice is not None else 0
+        self._inicio_username = CABECERA.size + self.total * ENTRADA.size
+        self._inicio_email = self._inicio_username + self.total * NUMERO.size
+        self._inicio_resumen = self._inicio_email + self.total * NUMERO.size
+        # Contadores de estadísticas de los usuarios del snapshot
+        self.resumen = (json.loads(indice[self._inicio_resumen:]) if indice is not None
+                        else resumen_vacio())
+
+    @classmethod
+    def abrir(cls, ruta: str, ruta_indice: str) -> Optional["IndiceUsuarios"]:
+        """Abrir el snapshot y su índice; None si falta alguno o no se corresponden"""
+        try:
+            estado = os.stat(ruta)
+            indice = _abrir_mmap(ruta_indice)
+        except (OSError, ValueError):
+            return None
+        try:
+            magia, tamano, mtime_ns, total = CABECERA.unpack_from(indice)
+        except struct.error:
+            magia = None
+        minimo = CABECERA.size + total * (ENTRADA.size + 2 * NUMERO.size) if magia else -1
+        if (magia != MAGIA or tamano != estado.st_size or mtime_ns != estado.st_mtime_ns
+                or len(indice) <= minimo):
+            # Cerrado ya: se va a reescribir y en Windows no se podría con el mapa abierto
+            indice.close()
+            return None
+        try:
+            return cls(_abrir_mmap(ruta), indice)
+        except (OSError, ValueError):
+            # Resumen cortado o ilegible: se reconstruye como un índice que no cuadra
+            indice.close()
+            return None
+    
+    def cerrar(self):
+        """Cerrar los mapas (hay que hacerlo antes de reemplazar los archivos)"""
+        for mapa in (self.snapshot, self.indice):
+            if mapa is not None:
+                mapa.close()
+
+    def __len__(self) -> int:
+        return self.total
+
+    def entrada(self, numero: int) -> Tuple[int, int, int, int]:
+        return ENTRADA.unpack_from(self.indice, CABECERA.size + numero * ENTRADA.size)
+
+    def crudo(self, numero: int) -> bytes:
+        posicion, longitud, _, _ = self.entrada(numero)
+        return self.snapshot[posicion:posicion + longitud]
+
+    def registro(self, numero: int) -> Dict:
+        return json.loads(self.crudo(numero))
+
+    def _candidatos(self, inicio: int, campo: int, clave: int) -> Iterator[int]:
+        """Números de entrada cuyo hash (campo 2 o 3 de la entrada) es `clave`"""
+        def hash_en(i):
+            numero = NUMERO.unpack_from(self.indice, inicio + i * NUMERO.size)[0]
+            return numero, self.entrada(numero)[campo]
+
+        bajo, alto = 0, self.total
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if hash_en(medio)[1] < clave:
+                bajo = medio + 1
+            else:
+                alto = medio
+        while bajo < self.total:
+            numero, valor = hash_en(bajo)
+            if valor != clave:
+                return
+            yield numero
+            bajo += 1
+
+    def buscar(self, username: str) -> Optional[Dict]:
+        """Datos del usuario en el snapshot, o None"""
+        for numero in self._candidatos(self._inicio_username, 2, hash_clave(username)):
+            datos = self.registro(numero)
+            if datos.get("username") == username:
+                return datos
+        return None
+
+    def usernames_con_email(self, clave: str) -> Iterator[str]:
+        """Usuarios que en el snapshot tienen ese email normalizado"""
+        for numero in self._candidatos(self._inicio_email, 3, hash_clave(clave)):
+            datos = self.registro(numero)
+            if normalizar_email(datos.get("email", "")) == clave:
+                yield datos["username"]
+
+
+class _EscritorSnapshot:
+    """Escribe un snapshot indexado en temporales y los coloca con `colocar`"""
+
+    def __init__(self, ruta: str, resumen: Optional[Dict] = None):
+        self.ruta = ruta
+        # Contadores que se guardan al final del índice; los mantiene quien escribe
+        self.resumen = resumen if resumen is not None else resumen_vacio()
+        self.temporal = f"{ruta}.tmp"
+        self._archivo = open(self.temporal, "wb")
+        self._archivo.write(b"[\n")
+        self._posicion = 2
+        self._entradas = bytearray()
+        self._hashes_username = array("Q")
+        self._hashes_email = array("Q")
+
+    def agregar(self, crudo: bytes, hash_username: int, hash_email: int):
+        if self._hashes_username:
+            self._archivo.write(b",\n")
+            self._posicion += 2
+        self._archivo.write(crudo)
+        self._entradas += ENTRADA.pack(self._posicion, len(crudo), hash_username, hash_email)
+        self._hashes_username.append(hash_username)
+        self._hashes_email.append(hash_email)
+        self._posicion += len(crudo)
+
+    def agregar_datos(self, datos: Dict):
+        crudo = json.dumps(datos, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.agregar(crudo, hash_clave(datos["username"]),
+                     hash_clave(normalizar_email(datos.get("email", ""))))
+
+    def terminar(self, ruta_indice: str):
+        """Completar los temporales; los archivos actuales no se tocan todavía"""
+        self._archivo.write(b"\n]\n")
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self._archivo.close()
+        # El rename conserva tamaño y mtime, así que la cabecera ya vale para el destino
+        estado = os.stat(self.temporal)
+
+        total = len(self._hashes_username)
+        por_username = array("I", sorted(range(total), key=self._hashes_username.__getitem__))
+        por_email = array("I", sorted(range(total), key=self._hashes_email.__getitem__))
+        if sys.byteorder == "big":
+            por_username.byteswap()
+            por_email.byteswap()
+
+        self.ruta_indice = ruta_indice
+        self.temporal_indice = temporal_indice = f"{ruta_indice}.tmp"
+        with open(temporal_indice, "wb") as f:
+            f.write(CABECERA.pack(MAGIA, estado.st_size, estado.st_mtime_ns, total))
+            f.write(self._entradas)
+            f.write(por_username.tobytes())
+            f.write(por_email.tobytes())
+            f.write(json.dumps(self.resumen, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def colocar(self) -> IndiceUsuarios:
+        """Sustituir el snapshot y el índice (sin mapas abiertos sobre ellos) y abrirlos"""
+        # Si se corta entre los dos renames el índice no cuadra y se reconstruye
+        os.replace(self.temporal, self.ruta)
+        os.replace(self.temporal_indice, self.ruta_indice)
+        return IndiceUsuarios.abrir(self.ruta, self.ruta_indice)
+
+
+def construir_indice(ruta: str, ruta_indice: str) -> IndiceUsuarios:
+    """Reescribir el snapshot (cualquier formato JSON) como snapshot indexado"""
+    escritor = _EscritorSnapshot(ruta)
+    if os.path.exists(ruta):
+        with open(ruta, "r", encoding="utf-8") as f:
+            for valor in iterar_valores(f):
+                if isinstance(valor, dict) and "username" in valor:
+                    escritor.agregar_datos(valor)
+                    sumar_al_resumen(escritor.resumen, valor)
+    escritor.terminar(ruta_indice)
+    return escritor.colocar()
+
+
+class UsuariosPerezosos:
+    """Usuarios del snapshot indexado, materializados al pedirlos.
+
+    Se usa como el dict username -> Usuario de SistemaUsuarios. Los usuarios
+    leídos del snapshot se guardan en una CacheLRU acotada; los cambiados
+    (`modificados`) o dados de alta (`nuevos`) desde el último snapshot se
+    quedan en memoria hasta que `escribir_snapshot` los incorpora.
+    """
+
+    def __init__(self, archivo: str, capacidad_cache: int = CAPACIDAD_CACHE):
+        self.archivo = archivo
+        self.archivo_indice = f"{archivo}.indice"
+        self.indice = IndiceUsuarios()
+        self.cache = CacheLRU(capacidad_cache)
+        self.modificados: Dict[str, Usuario] = {}
+        self.nuevos: Dict[str, Usuario] = {}
+        # La caché y el cambio de índice tras un snapshot se comparten entre hilos
+        self._lock = threading.RLock()
+
+    def abrir(self):
+        """Abrir el snapshot indexado, reconstruyendo el índice si hace falta"""
+        indice = IndiceUsuarios.abrir(self.archivo, self.archivo_indice)
+        if indice is None:
+            indice = construir_indice(self.archivo, self.archivo_indice)
+        self.indice = indice
+
+    def get(self, username: str, defecto: Optional[Usuario] = None) -> Optional[Usuario]:
+        with self._lock:
+            user = self.modificados.get(username)
+            if user is None:
+                user = self.nuevos.get(username)
+            if user is None:
+                user = self.cache.obtener(username)
+            if user is None:
+                datos = self.indice.buscar(username)
+                if datos is None:
+                    return defecto
+                user = Usuario.from_dict(datos)
+                self.cache.guardar(username, user)
+            return user
+
+    def __getitem__(self, username: str) -> Usuario:
+        user = self.get(username)
+        if user is None:
+            raise KeyError(username)
+        return user
+
+    def __setitem__(self, username: str, user: Usuario):
+        """Fijar un usuario en memoria hasta el próximo snapshot"""
+        with self._lock:
+            self.cache.invalidar(username)
+            if username in self.modificados or (username not in self.nuevos
+                                                and self.indice.buscar(username) is not None):
+                self.modificados[username] = user
+            else:
+                self.nuevos[username] = user
+
+    def __contains__(self, username: str) -> bool:
+        return self.get(username) is not None
+
+    def __len__(self) -> int:
+        return len(self.indice) + len(self.nuevos)
+
+    def registro(self, numero: int) -> Optional[Dict]:
+        """Datos de la entrada `numero` del snapshot actual, o None si no existe
+        
+        Un snapshot nuevo conserva el orden del anterior y añade los nuevos al
+        final, así que un recorrido por número sigue siendo válido tras él.
+        """
+        with self._lock:
+            if numero >= len(self.indice):
+                return None
+            return self.indice.registro(numero)
+
+    def _recorrer(self) -> Iterator[Dict]:
+        numero = 0
+        while True:
+            datos = self.registro(numero)
+            if datos is None:
+                return
+            yield datos
+            numero += 1
+
+    def __iter__(self) -> Iterator[str]:
+        for datos in self._recorrer():
+            yield datos["username"]
+        with self._lock:
+            nuevos = list(self.nuevos)
+        yield from nuevos
+
+    def values(self) -> Iterator[Usuario]:
+        """Recorrer todos los usuarios en orden de alta sin llenar la caché"""
+        for datos in self._recorrer():
+            username = datos["username"]
+            with self._lock:
+                user = self.modificados.get(username)
+                if user is None and username in self.cache:
+                    user = self.cache.obtener(username)
+            yield user if user is not None else Usuario.from_dict(datos)
+        with self._lock:
+            nuevos = list(self.nuevos.values())
+        yield from nuevos
+
+    def resumen(self) -> Dict:
+        """Contadores de estadísticas actuales: los del snapshot más los cambios en memoria
+
+        Solo lee del snapshot la versión anterior de los usuarios modificados.
+        """
+        with self._lock:
+            resumen = json.loads(json.dumps(self.indice.resumen))
+            for username, user in self.modificados.items():
+                anterior = self.indice.buscar(username)
+                if anterior is not None:
+                    sumar_al_resumen(resumen, anterior, -1)
+                sumar_al_resumen(resumen, user.to_dict())
+            for user in self.nuevos.values():
+                sumar_al_resumen(resumen, user.to_dict())
+            return resumen
+
+    def en_memoria(self) -> List[Usuario]:
+        """Usuarios pendientes de pasar al snapshot"""
+        with self._lock:
+            return list(self.modificados.values()) + list(self.nuevos.values())
+
+    def username_por_email(self, clave: str) -> Optional[str]:
+        """Usuario del snapshot cuyo email actual es `clave` (ya normalizado)"""
+        with self._lock:
+            candidatos = list(self.indice.usernames_con_email(clave))
+        for username in candidatos:
+            user = self.get(username)
+            # El usuario puede haber cambiado de email desde el snapshot
+            if user is not None and normalizar_email(user.email) == clave:
+                return username
+        return None
+
+    def capturar(self) -> CapturaUsuarios:
+        """Estado a escribir en el próximo snapshot (se llama con las escrituras paradas)"""
+        with self._lock:
+            return (self.indice,
+                    {n: user.to_dict() for n, user in self.modificados.items()},
+                    {n: user.to_dict() for n, user in self.nuevos.items()})
+
+    def escribir_snapshot(self, ruta: str, captura: CapturaUsuarios):
+        """Escribir un snapshot indexado nuevo a partir de una captura
+
+        Los usuarios sin cambios se copian tal cual del snapshot anterior; solo
+        se serializan los modificados y los nuevos. Tiene la misma firma que
+        `escribir_json_atomico` para usarse como escritor del diario.
+        """
+        indice, modificados, nuevos = captura
+        hashes_modificados = {hash_clave(username) for username in modificados}
+        # Los contadores se actualizan con lo que cambia, sin leer el resto
+        escritor = _EscritorSnapshot(ruta, json.loads(json.dumps(indice.resumen)))
+        for numero in range(len(indice)):
+            _, _, hash_username, hash_email = indice.entrada(numero)
+            if hash_username in hashes_modificados:
+                anterior = indice.registro(numero)
+                datos = modificados.get(anterior["username"])
+                if datos is not None:
+                    escritor.agregar_datos(datos)
+                    sumar_al_resumen(escritor.resumen, anterior, -1)
+                    sumar_al_resumen(escritor.resumen, datos)
+                    continue
+            escritor.agregar(indice.crudo(numero), hash_username, hash_email)
+        for datos in nuevos.values():
+            escritor.agregar_datos(datos)
+            sumar_al_resumen(escritor.resumen, datos)
+        escritor.terminar(f"{ruta}.indice")
+
+        with self._lock:
+            # En Windows no se puede reemplazar un archivo con un mmap abierto
+            self.indice.cerrar()
+            if indice is not self.indice:
+                indice.cerrar()
+            self.indice = escritor.colocar()
+            # Lo que cambió después de la captura sigue pendiente del próximo snapshot
+            for username, datos in modificados.items():
+                user = self.modificados.get(username)
+                if user is not None and user.to_dict() == datos:
+                    del self.modificados[username]
+                    self.cache.guardar(username, user)
+            for username, datos in nuevos.items():
+                user = self.nuevos.pop(username, None)
+                if user is None:
+                    continue
+                if user.to_dict() == datos:
+                    self.cache.guardar(username, user)
+                else:
+                    self.modificados[username] = user
+
+
+class VistaUsuariosIndexados:
+    """Usuarios en orden de alta como secuencia de solo lectura (para TablaVirtual).
+
+    Cada fila se lee del snapshot al pedirla, así que abrir la tabla no
+    materializa a todos los usuarios.
+    """
+
+    def __init__(self, usuarios: UsuariosPerezosos):
+        self.usuarios = usuarios
+        with usuarios._lock:
+            self.en_snapshot = len(usuarios.indice)
+            self.nuevos = list(usuarios.nuevos.values())
+
+    def __len__(self) -> int:
+        return self.en_snapshot + len(self.nuevos)
+
+    def __getitem__(self, posicion: int) -> Usuario:
+        if posicion < 0:
+            posicion += len(self)
+        if not 0 <= posicion < len(self):
+            raise IndexError(posicion)
+        if posicion >= self.en_snapshot:
+            return self.nuevos[posicion - self.en_snapshot]
+        # Del snapshot actual: si se escribió uno nuevo, las posiciones se conservan
+        return self.usuarios.get(self.usuarios.registro(posicion)["username"])
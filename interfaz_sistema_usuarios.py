@@ -0,0 +1,917 @@
+import customtkinter as ctk
+import tkinter as tk
+from tkinter import messagebox
+from datetime import datetime
+
+from backends_usuarios import BACKEND_POR_DEFECTO, BACKENDS, crear_backend
+from contrasenas import EjecutorSegundoPlano
+from dialogos import PoolDialogos
+from estilos import RegistroEstilos
+from pantallas import GestorPantallas
+from tabla_virtual import TablaVirtual
+
+# Configurar el tema
+ctk.set_appearance_mode("dark")
+ctk.set_default_color_theme("blue")
+
+
+class AplicacionSistemaUsuarios:
+    titulo = "Sistema de Usuarios - Python GUI Demo"
+    
+    def __init__(self, backend: str = BACKEND_POR_DEFECTO, ruta: str = None):
+        self.root = ctk.CTk()
+        self.root.title(self.titulo)
+        self.root.geometry("900x600")
+        # Fuentes y colores compartidos por todos los widgets
+        self.estilos = RegistroEstilos()
+        
+        # Cualquier backend de backends_usuarios; con "diario" las escrituras a
+        # disco se hacen en un hilo aparte, agrupadas cada 500 ms
+        self.sistema = crear_backend(backend, ruta)
+        # El KDF de contraseñas se ejecuta fuera del hilo de la interfaz
+        self.ejecutor = EjecutorSegundoPlano(self.root)
+        self.estado_guardado_label = None
+        # Sesión del operador de esta ventana (el backend admite muchas a la vez)
+        self.sesion = None
+        # Login y panel se construyen una vez; login/logout solo los intercambian
+        self.pantallas = GestorPantallas(self.root)
+        self.pantallas.registrar("login", self._construir_login, self._preparar_login,
+                                 padx=50, pady=50)
+        self.pantallas.registrar("principal", self._construir_principal, self._preparar_principal,
+                                 padx=20, pady=20)
+        # Diálogos: se construyen al abrirlos la primera vez y al cerrarlos solo se ocultan
+        self.dialogos = PoolDialogos(self.root, ctk.CTkToplevel)
+        self.dialogos.registrar("perfil", "Mi Perfil", "500x600",
+                                self._construir_perfil, self._refrescar_perfil)
+        self.dialogos.registrar("password", "Cambiar Contraseña", "400x300",
+                                self._construir_cambiar_password, self._refrescar_cambiar_password)
+        self.dialogos.registrar("historial", "Historial de Sesiones", "600x400",
+                                self._construir_historial, self._refrescar_historial)
+        self.dialogos.registrar("gestion", "Gestión de Usuarios", "800x600",
+                                self._construir_gestion_usuarios, self._refrescar_gestion_usuarios)
+        self.dialogos.registrar("estadisticas", "Estadísticas del Sistema", "500x600",
+                                self._construir_estadisticas, self._refrescar_estadisticas)
+        # Con --ciclos-dialogos se miden los diálogos tras el primer login
+        self.ciclos_dialogos = 0
+        self.crear_interfaz_login()
+        self.vigilar_escritura()
+    
+    def usuario_sesion(self):
+        """Usuario de la sesión, o None si caducó (entonces se vuelve al login)"""
+        user = self.sistema.usuario_de(self.sesion)
+        if user is None and self.sesion is not None:
+            # Diferido: puede llamarse mientras se muestra una pantalla o un diálogo
+            self.root.after_idle(self.sesion_expirada)
+        return user
+    
+    def sesion_expirada(self):
+        """Cerrar los diálogos y volver al login avisando de que la sesión caducó"""
+        if self.sesion is None:
+            return
+        self.sesion = None
+        self.dialogos.cerrar_todos()
+        self.crear_interfaz_login()
+        messagebox.showwarning("Sesión caducada", "Tu sesión ha caducado. Inicia sesión de nuevo.")
+    
+    def vigilar_escritura(self):
+        """Mostrar el estado del escritor en segundo plano (se consulta con root.after)"""
+        estado = self.sistema.estado_escritura()
+        label = self.estado_guardado_label
+        if estado and label is not None and label.winfo_exists():
+            if estado.ultimo_error:
+                texto, color = f"⚠ Error al guardar: {estado.ultimo_error}", self.estilos.color("peligro")
+            elif estado.pendiente:
+                texto, color = "💾 Guardando cambios...", self.estilos.color("aviso")
+            elif estado.ultimo_guardado is not None:
+                hora = datetime.fromtimestamp(estado.ultimo_guardado).strftime("%H:%M:%S")
+                texto = f"✓ Guardado {hora} ({estado.ultima_latencia_ms:.0f} ms)"
+                color = self.estilos.color("exito")
+            else:
+                texto, color = "✓ Sin cambios pendientes", self.estilos.color("exito")
+            label.configure(text=texto, text_color=color)
+        self.root.after(1000, self.vigilar_escritura)
+    
+    def crear_interfaz_login(self):
+        """Mostrar la pantalla de login (se construye solo la primera vez)"""
+        self.pantallas.mostrar("login")
+    
+    def _preparar_login(self):
+        # Formulario vacío para el siguiente operador
+        self.username_var.set("")
+        self.password_var.set("")
+        self.login_btn.configure(state="normal")
+    
+    def _construir_login(self, contenedor):
+        """Crear los widgets de la pantalla de login"""
+        # Frame principal
+        main_frame = ctk.CTkFrame(contenedor)
+        
+        # Título
+        titulo = ctk.CTkLabel(
+            main_frame, 
+            text="Sistema de Usuarios", 
+            font=self.estilos.fuente("titulo_grande")
+        )
+        titulo.pack(pady=30)
+        
+        # Frame para formulario
+        form_frame = ctk.CTkFrame(main_frame)
+        form_frame.pack(fill="both", expand=True, padx=40, pady=20)
+        
+        # Username
+        ctk.CTkLabel(form_frame, text="Usuario:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(20,5))
+        self.username_var = tk.StringVar()
+        username_entry = ctk.CTkEntry(
+            form_frame, 
+            textvariable=self.username_var,
+            placeholder_text="Ingresa tu usuario",
+            width=300
+        )
+        username_entry.pack(padx=20, pady=(0,15))
+        
+        # Password
+        ctk.CTkLabel(form_frame, text="Contraseña:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
+        self.password_var = tk.StringVar()
+        password_entry = ctk.CTkEntry(
+            form_frame, 
+            textvariable=self.password_var,
+            placeholder_text="Ingresa tu contraseña",
+            show="*",
+            width=300
+        )
+        password_entry.pack(padx=20, pady=(0,20))
+        
+        # Botones
+        botones_frame = ctk.CTkFrame(form_frame)
+        botones_frame.pack(pady=20)
+        
+        # Botón login
+        self.login_btn = ctk.CTkButton(
+            botones_frame,
+            text="Iniciar Sesión",
+            command=self.hacer_login,
+            **self.estilos.boton("exito", "boton_destacado"),
+            width=120
+        )
+        self.login_btn.pack(side="left", padx=10)
+        
+        # Botón registro
+        registro_btn = ctk.CTkButton(
+            botones_frame,
+            text="Registrarse",
+            command=self.mostrar_registro,
+            **self.estilos.boton("info"),
+            width=120
+        )
+        registro_btn.pack(side="left", padx=10)
+        
+        # Información de demo
+        info_text = """🔐 Sistema de Usuarios Demo
+
+Usuario administrador por defecto:
+• Usuario: admin
+• Contraseña: admin123
+
+Características:
+• Registro de usuarios
+• Login/Logout
+• Perfiles personalizados
+• Roles (admin/user)
+• Cambio de contraseña
+• Historial de sesiones"""
+        
+        info_label = ctk.CTkLabel(
+            main_frame,
+            text=info_text,
+            font=self.estilos.fuente("texto_pequeno"),
+            justify="left"
+        )
+        info_label.pack(pady=20)
+        return main_frame
+    
+    def mostrar_registro(self):
+        """Mostrar ventana de registro"""
+        registro_window = ctk.CTkToplevel(self.root)
+        registro_window.title("Registro de Usuario")
+        registro_window.geometry("400x500")
+        registro_window.grab_set()  # Hacer modal
+        
+        # Frame principal
+        main_frame = ctk.CTkFrame(registro_window)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Título
+        ctk.CTkLabel(
+            main_frame, 
+            text="Registro de Usuario", 
+            font=self.estilos.fuente("titulo_dialogo")
+        ).pack(pady=20)
+        
+        # Username
+        ctk.CTkLabel(main_frame, text="Usuario:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
+        username_var = tk.StringVar()
+        username_entry = ctk.CTkEntry(
+            main_frame, 
+            textvariable=username_var,
+            placeholder_text="Elige un usuario",
+            width=300
+        )
+        username_entry.pack(padx=20, pady=(0,15))
+        
+        # Email
+        ctk.CTkLabel(main_frame, text="Email:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
+        email_var = tk.StringVar()
+        email_entry = ctk.CTkEntry(
+            main_frame, 
+            textvariable=email_var,
+            placeholder_text="tu@email.com",
+            width=300
+        )
+        email_entry.pack(padx=20, pady=(0,15))
+        
+        # Password
+        ctk.CTkLabel(main_frame, text="Contraseña:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
+        password_var = tk.StringVar()
+        password_entry = ctk.CTkEntry(
+            main_frame, 
+            textvariable=password_var,
+            placeholder_text="Mínimo 6 caracteres",
+            show="*",
+            width=300
+        )
+        password_entry.pack(padx=20, pady=(0,15))
+        
+        # Confirmar Password
+        ctk.CTkLabel(main_frame, text="Confirmar Contraseña:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
+        confirm_var = tk.StringVar()
+        confirm_entry = ctk.CTkEntry(
+            main_frame, 
+            textvariable=confirm_var,
+            placeholder_text="Repite la contraseña",
+            show="*",
+            width=300
+        )
+        confirm_entry.pack(padx=20, pady=(0,20))
+        
+        # Botones
+        botones_frame = ctk.CTkFrame(main_frame)
+        botones_frame.pack(pady=20)
+        
+        def registrar():
+            username = username_var.get().strip()
+            email = email_var.get().strip()
+            password = password_var.get()
+            confirm = confirm_var.get()
+            
+            if not username or not email or not password:
+                messagebox.showerror("Error", "Todos los campos son obligatorios")
+                return
+            
+            if password != confirm:
+                messagebox.showerror("Error", "Las contraseñas no coinciden")
+                return
+            
+            # El KDF se calcula en segundo plano; el alta se guarda en el hilo de la interfaz
+            registrar_btn.configure(state="disabled")
+            self.ejecutor.ejecutar(
+                self.sistema.preparar_alta, username, password, email,
+                al_terminar=lambda resultado: alta_preparada(username, email, resultado),
+                al_fallar=fallo
+            )
+        
+        def alta_preparada(username, email, resultado):
+            success, message, password_hash = resultado
+            if success:
+                success, message = self.sistema.completar_alta(username, email, password_hash)
+            if not registro_window.winfo_exists():
+                return
+            if success:
+                messagebox.showinfo("Éxito", message)
+                registro_window.destroy()
+            else:
+                registrar_btn.configure(state="normal")
+                messagebox.showerror("Error", message)
+        
+        def fallo(error):
+            if registro_window.winfo_exists():
+                registrar_btn.configure(state="normal")
+            messagebox.showerror("Error", f"No se pudo registrar el usuario: {error}")
+        
+        # Botón registrar
+        registrar_btn = ctk.CTkButton(
+            botones_frame,
+            text="Registrarse",
+            command=registrar,
+            **self.estilos.boton("exito")
+        )
+        registrar_btn.pack(side="left", padx=10)
+        
+        # Botón cancelar
+        ctk.CTkButton(
+            botones_frame,
+            text="Cancelar",
+            command=registro_window.destroy,
+            **self.estilos.boton("peligro")
+        ).pack(side="left", padx=10)
+    
+    def hacer_login(self):
+        """Realizar login"""
+        username = self.username_var.get().strip()
+        password = self.password_var.get()
+        
+        if not username or not password:
+            messagebox.showerror("Error", "Usuario y contraseña son obligatorios")
+            return
+        
+        self.login_btn.configure(state="disabled")
+        self.ejecutor.ejecutar(
+            self.sistema.verificar_credenciales, username, password,
+            al_terminar=lambda resultado: self.login_verificado(username, resultado),
+            al_fallar=self.login_fallido
+        )
+    
+    def login_fallido(self, error):
+        """La verificación en segundo plano lanzó una excepción"""
+        self.login_btn.configure(state="normal")
+        messagebox.showerror("Error", f"No se pudo iniciar sesión: {error}")
+    
+    def login_verificado(self, username, resultado):
+        """Terminar el login en el hilo de la interfaz"""
+        success, message, nuevo_hash = resultado
+        if success:
+            self.sesion = self.sistema.completar_login(username, nuevo_hash)
+            messagebox.showinfo("Éxito", message)
+            self.crear_interfaz_principal()
+        else:
+            self.login_btn.configure(state="normal")
+            messagebox.showerror("Error", message)
+    
+    def crear_interfaz_principal(self):
+        """Mostrar el panel del usuario de la sesión (se construye solo la primera vez)"""
+        self.pantallas.mostrar("principal")
+        if self.ciclos_dialogos:
+            ciclos, self.ciclos_dialogos = self.ciclos_dialogos, 0
+            self.root.after(100, lambda: self.probar_dialogos(ciclos))
+    
+    def probar_dialogos(self, ciclos: int):
+        """Abrir y cerrar los diálogos del usuario `ciclos` veces e imprimir latencias y widgets"""
+        user = self.usuario_sesion()
+        if user is None:
+            return
+        nombres = ["perfil", "password", "historial"]
+        if user.role == "admin":
+            nombres += ["gestion", "estadisticas"]
+        resultado = self.dialogos.ciclar(ciclos, nombres)
+        print(f"{ciclos} ciclos: widgets vivos {resultado['widgets_antes']} -> "
+              f"{resultado['widgets_despues']}")
+        for nombre, datos in resultado["dialogos"].items():
+            if datos["aperturas"]:
+                print(f"{nombre:<13} construcciones={datos['construcciones']} "
+                      f"aperturas={datos['aperturas']} media={datos['apertura_media_ms']:.1f} ms "
+                      f"máx={datos['apertura_max_ms']:.1f} ms")
+    
+    def _preparar_principal(self):
+        # Lo único que depende del usuario: la cabecera y las opciones de admin
+        user = self.usuario_sesion()
+        if user is None:
+            return
+        self.usuario_label.configure(text=f"👤 {user.username} ({user.role})")
+        for btn in self.botones_admin:
+            if user.role == "admin":
+                btn.grid()
+            else:
+                btn.grid_remove()
+    
+    def _construir_principal(self, contenedor):
+        """Crear los widgets del panel principal (los datos del usuario los pone _preparar_principal)"""
+        # Frame principal
+        main_frame = ctk.CTkFrame(contenedor)
+        
+        # Header con información del usuario
+        header_frame = ctk.CTkFrame(main_frame)
+        header_frame.pack(fill="x", padx=20, pady=10)
+        
+        # Información del usuario
+        self.usuario_label = ctk.CTkLabel(
+            header_frame,
+            text="",
+            font=self.estilos.fuente("cabecera")
+        )
+        self.usuario_label.pack(side="left", padx=20, pady=10)
+        
+        # Estado de la escritura en segundo plano (lo actualiza vigilar_escritura)
+        self.estado_guardado_label = ctk.CTkLabel(header_frame, text="", font=self.estilos.fuente("texto_pequeno"))
+        self.estado_guardado_label.pack(side="left", padx=10, pady=10)
+        
+        # Botón logout
+        logout_btn = ctk.CTkButton(
+            header_frame,
+            text="Cerrar Sesión",
+            command=self.logout,
+            **self.estilos.boton("peligro", "boton_pequeno")
+        )
+        logout_btn.pack(side="right", padx=20, pady=10)
+        
+        # Título
+        titulo = ctk.CTkLabel(
+            main_frame, 
+            text="Panel de Usuario", 
+            font=self.estilos.fuente("titulo")
+        )
+        titulo.pack(pady=20)
+        
+        # Frame para opciones
+        opciones_frame = ctk.CTkFrame(main_frame)
+        opciones_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Botones de opciones
+        opciones = [
+            ("📝 Mi Perfil", self.mostrar_perfil, "info"),
+            ("🔐 Cambiar Contraseña", self.mostrar_cambiar_password, "aviso"),
+            ("📊 Historial de Sesiones", self.mostrar_historial, "morado"),
+            # Opciones de admin: _preparar_principal las oculta a los demás usuarios
+            ("👥 Gestionar Usuarios", self.mostrar_gestion_usuarios, "exito"),
+            ("📈 Estadísticas del Sistema", self.mostrar_estadisticas, "neutro")
+        ]
+        
+        # Crear botones
+        self.botones_admin = []
+        for i, (texto, comando, color) in enumerate(opciones):
+            btn = ctk.CTkButton(
+                opciones_frame,
+                text=texto,
+                command=comando,
+                height=50,
+                **self.estilos.boton(color)
+            )
+            btn.grid(row=i//2, column=i%2, padx=20, pady=20, sticky="ew")
+            if i >= 3:
+                self.botones_admin.append(btn)
+        
+        # Configurar grid
+        opciones_frame.grid_columnconfigure(0, weight=1)
+        opciones_frame.grid_columnconfigure(1, weight=1)
+        return main_frame
+    
+    def mostrar_perfil(self):
+        """Mostrar ventana de perfil"""
+        self.dialogos.abrir("perfil")
+    
+    def _construir_perfil(self, perfil_window):
+        # Frame principal
+        main_frame = ctk.CTkFrame(perfil_window)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Título
+        ctk.CTkLabel(
+            main_frame, 
+            text="Mi Perfil", 
+            font=self.estilos.fuente("titulo_dialogo")
+        ).pack(pady=20)
+        
+        # Información del usuario (la rellena _refrescar_perfil)
+        self.perfil_label = ctk.CTkLabel(
+            main_frame,
+            text="",
+            font=self.estilos.fuente("texto_pequeno"),
+            justify="left"
+        )
+        self.perfil_label.pack(pady=20, padx=20)
+        
+        # Botón editar perfil
+        ctk.CTkButton(
+            main_frame,
+            text="Editar Perfil",
+            command=lambda: self.editar_perfil(perfil_window),
+            **self.estilos.boton("exito")
+        ).pack(pady=20)
+        
+        # Botón cerrar
+        ctk.CTkButton(
+            main_frame,
+            text="Cerrar",
+            command=lambda: self.dialogos.cerrar("perfil"),
+            font=self.estilos.fuente("boton")
+        ).pack(pady=10)
+    
+    def _refrescar_perfil(self):
+        user = self.usuario_sesion()
+        if user is None:
+            return
+        info_text = f"""👤 Información del Usuario:
+
+• Usuario: {user.username}
+• Email: {user.email}
+• Rol: {user.role}
+• Fecha de registro: {user.created_at}
+• Último login: {user.last_login or 'Nunca'}
+
+📝 Datos del Perfil:
+• Nombre completo: {user.profile_data.get('nombre_completo', 'No especificado')}
+• Edad: {user.profile_data.get('edad', 'No especificado')}
+• Ciudad: {user.profile_data.get('ciudad', 'No especificado')}
+• Intereses: {', '.join(user.profile_data.get('intereses', [])) or 'No especificados'}"""
+        self.perfil_label.configure(text=info_text)
+    
+    def editar_perfil(self, parent_window):
+        """Editar perfil del usuario"""
+        # El backend SQLite devuelve una copia del usuario en cada consulta
+        user = self.usuario_sesion()
+        if user is None:
+            return
+        edit_window = ctk.CTkToplevel(parent_window)
+        edit_window.title("Editar Perfil")
+        edit_window.geometry("400x500")
+        edit_window.grab_set()
+        
+        # Frame principal
+        main_frame = ctk.CTkFrame(edit_window)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Título
+        ctk.CTkLabel(
+            main_frame, 
+            text="Editar Perfil", 
+            font=self.estilos.fuente("titulo_dialogo")
+        ).pack(pady=20)
+        
+        # Variables
+        nombre_var = tk.StringVar(value=user.profile_data.get('nombre_completo', ''))
+        edad_var = tk.StringVar(value=user.profile_data.get('edad', ''))
+        ciudad_var = tk.StringVar(value=user.profile_data.get('ciudad', ''))
+        
+        # Campos
+        ctk.CTkLabel(main_frame, text="Nombre completo:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
+        nombre_entry = ctk.CTkEntry(main_frame, textvariable=nombre_var, width=300)
+        nombre_entry.pack(padx=20, pady=(0,15))
+        
+        ctk.CTkLabel(main_frame, text="Edad:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
+        edad_entry = ctk.CTkEntry(main_frame, textvariable=edad_var, width=300)
+        edad_entry.pack(padx=20, pady=(0,15))
+        
+        ctk.CTkLabel(main_frame, text="Ciudad:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
+        ciudad_entry = ctk.CTkEntry(main_frame, textvariable=ciudad_var, width=300)
+        ciudad_entry.pack(padx=20, pady=(0,20))
+        
+        # Intereses
+        ctk.CTkLabel(main_frame, text="Intereses:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
+        intereses_frame = ctk.CTkFrame(main_frame)
+        intereses_frame.pack(padx=20, pady=(0,20))
+        
+        intereses = ["Programación", "Música", "Deportes", "Arte", "Ciencia", "Viajes"]
+        intereses_vars = {}
+        
+        for i, interes in enumerate(intereses):
+            var = tk.BooleanVar(value=interes in user.profile_data.get('intereses', []))
+            intereses_vars[interes] = var
+            checkbox = ctk.CTkCheckBox(
+                intereses_frame, 
+                text=interes, 
+                variable=var,
+                font=self.estilos.fuente("texto_pequeno")
+            )
+            checkbox.grid(row=i//3, column=i%3, padx=10, pady=5, sticky="w")
+        
+        # Botones
+        botones_frame = ctk.CTkFrame(main_frame)
+        botones_frame.pack(pady=20)
+        
+        def guardar_perfil():
+            # Guardar datos del perfil
+            user.profile_data = {
+                'nombre_completo': nombre_var.get().strip(),
+                'edad': edad_var.get().strip(),
+                'ciudad': ciudad_var.get().strip(),
+                'intereses': [interes for interes, var in intereses_vars.items() if var.get()]
+            }
+            self.sistema.guardar_usuario(user)
+            messagebox.showinfo("Éxito", "Perfil actualizado exitosamente")
+            edit_window.destroy()
+            # El diálogo de perfil sigue abierto: solo se refrescan sus datos
+            self.mostrar_perfil()
+        
+        ctk.CTkButton(
+            botones_frame,
+            text="Guardar",
+            command=guardar_perfil,
+            **self.estilos.boton("exito")
+        ).pack(side="left", padx=10)
+        
+        ctk.CTkButton(
+            botones_frame,
+            text="Cancelar",
+            command=edit_window.destroy,
+            **self.estilos.boton("peligro")
+        ).pack(side="left", padx=10)
+    
+    def mostrar_cambiar_password(self):
+        """Mostrar ventana para cambiar contraseña"""
+        self.dialogos.abrir("password")
+    
+    def _construir_cambiar_password(self, password_window):
+        # Frame principal
+        main_frame = ctk.CTkFrame(password_window)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Título
+        ctk.CTkLabel(
+            main_frame, 
+            text="Cambiar Contraseña", 
+            font=self.estilos.fuente("titulo_dialogo")
+        ).pack(pady=20)
+        
+        # Variables (se vacían en cada apertura)
+        actual_var = tk.StringVar()
+        nueva_var = tk.StringVar()
+        confirm_var = tk.StringVar()
+        self.password_vars = (actual_var, nueva_var, confirm_var)
+        
+        # Campos
+        ctk.CTkLabel(main_frame, text="Contraseña actual:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
+        actual_entry = ctk.CTkEntry(main_frame, textvariable=actual_var, show="*", width=300)
+        actual_entry.pack(padx=20, pady=(0,15))
+        
+        ctk.CTkLabel(main_frame, text="Nueva contraseña:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
+        nueva_entry = ctk.CTkEntry(main_frame, textvariable=nueva_var, show="*", width=300)
+        nueva_entry.pack(padx=20, pady=(0,15))
+        
+        ctk.CTkLabel(main_frame, text="Confirmar nueva contraseña:", font=self.estilos.fuente("texto")).pack(anchor="w", padx=20, pady=(10,5))
+        confirm_entry = ctk.CTkEntry(main_frame, textvariable=confirm_var, show="*", width=300)
+        confirm_entry.pack(padx=20, pady=(0,20))
+        
+        # Botones
+        botones_frame = ctk.CTkFrame(main_frame)
+        botones_frame.pack(pady=20)
+        
+        def cambiar_password():
+            actual = actual_var.get()
+            nueva = nueva_var.get()
+            confirm = confirm_var.get()
+            
+            if not actual or not nueva or not confirm:
+                messagebox.showerror("Error", "Todos los campos son obligatorios")
+                return
+            
+            if nueva != confirm:
+                messagebox.showerror("Error", "Las contraseñas no coinciden")
+                return
+            
+            # Verificar la actual y hashear la nueva son dos KDF: en segundo plano
+            cambiar_btn.configure(state="disabled")
+            sesion = self.sesion
+            self.ejecutor.ejecutar(
+                self.sistema.preparar_cambio_password, sesion, actual, nueva,
+                al_terminar=lambda resultado: cambio_preparado(sesion, resultado),
+                al_fallar=fallo
+            )
+        
+        def cambio_preparado(sesion, resultado):
+            cambiar_btn.configure(state="normal")
+            success, message, nuevo_hash = resultado
+            if success:
+                success, message = self.sistema.completar_cambio_password(sesion, nuevo_hash)
+            if success:
+                messagebox.showinfo("Éxito", message)
+                self.dialogos.cerrar("password")
+            else:
+                messagebox.showerror("Error", message)
+        
+        def fallo(error):
+            cambiar_btn.configure(state="normal")
+            messagebox.showerror("Error", f"No se pudo cambiar la contraseña: {error}")
+        
+        cambiar_btn = ctk.CTkButton(
+            botones_frame,
+            text="Cambiar Contraseña",
+            command=cambiar_password,
+            **self.estilos.boton("exito")
+        )
+        cambiar_btn.pack(side="left", padx=10)
+        
+        ctk.CTkButton(
+            botones_frame,
+            text="Cancelar",
+            command=lambda: self.dialogos.cerrar("password"),
+            **self.estilos.boton("peligro")
+        ).pack(side="left", padx=10)
+    
+    def _refrescar_cambiar_password(self):
+        for var in self.password_vars:
+            var.set("")
+    
+    def mostrar_historial(self):
+        """Mostrar historial de sesiones"""
+        self.dialogos.abrir("historial")
+    
+    def _construir_historial(self, historial_window):
+        # Frame principal
+        main_frame = ctk.CTkFrame(historial_window)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Título
+        ctk.CTkLabel(
+            main_frame, 
+            text="Historial de Sesiones", 
+            font=self.estilos.fuente("titulo_dialogo")
+        ).pack(pady=20)
+        
+        # Información del usuario (la rellena _refrescar_historial)
+        self.historial_label = ctk.CTkLabel(
+            main_frame,
+            text="",
+            font=self.estilos.fuente("texto_pequeno"),
+            justify="left"
+        )
+        self.historial_label.pack(pady=20, padx=20)
+        
+        # Botón cerrar
+        ctk.CTkButton(
+            main_frame,
+            text="Cerrar",
+            command=lambda: self.dialogos.cerrar("historial"),
+            font=self.estilos.fuente("boton")
+        ).pack(pady=20)
+    
+    def _refrescar_historial(self):
+        user = self.usuario_sesion()
+        if user is None:
+            return
+        info_text = f"""👤 Usuario: {user.username}
+📅 Fecha de registro: {user.created_at}
+🕒 Último login: {user.last_login or 'Nunca'}
+👑 Rol: {user.role}"""
+        self.historial_label.configure(text=info_text)
+    
+    def mostrar_gestion_usuarios(self):
+        """Mostrar gestión de usuarios (solo admin)"""
+        user = self.usuario_sesion()
+        if user is None:
+            return
+        if user.role != "admin":
+            messagebox.showerror("Error", "Solo los administradores pueden acceder a esta función")
+            return
+        self.dialogos.abrir("gestion")
+    
+    def _construir_gestion_usuarios(self, gestion_window):
+        # Frame principal
+        main_frame = ctk.CTkFrame(gestion_window)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Título
+        ctk.CTkLabel(
+            main_frame, 
+            text="Gestión de Usuarios", 
+            font=self.estilos.fuente("titulo_dialogo")
+        ).pack(pady=20)
+        
+        # Se empaqueta este aviso o la tabla según haya usuarios al abrir
+        self.sin_usuarios_label = ctk.CTkLabel(
+            main_frame,
+            text="No hay usuarios registrados",
+            font=self.estilos.fuente("texto")
+        )
+        
+        # Tabla virtual: solo se dibujan las filas visibles
+        columnas = [
+            ("Usuario", 20, lambda u: u.username),
+            ("Email", 30, lambda u: u.email),
+            ("Rol", 10, lambda u: u.role),
+            ("Registro", 20, lambda u: u.created_at),
+            ("Último Login", 20, lambda u: u.last_login or "Nunca"),
+        ]
+        self.tabla_usuarios = TablaVirtual(main_frame, columnas, font=self.estilos.fuente("tabla"))
+        
+        # Botón cerrar
+        self.gestion_cerrar_btn = ctk.CTkButton(
+            main_frame,
+            text="Cerrar",
+            command=lambda: self.dialogos.cerrar("gestion"),
+            font=self.estilos.fuente("boton")
+        )
+        self.gestion_cerrar_btn.pack(pady=20)
+    
+    def _refrescar_gestion_usuarios(self):
+        # Lista de usuarios (con SQLite se cargan por páginas al desplazarse)
+        usuarios = self.sistema.vista_usuarios(self.sesion)
+        self.tabla_usuarios.establecer_fuente(usuarios)
+        if usuarios:
+            self.sin_usuarios_label.pack_forget()
+            self.tabla_usuarios.pack(fill="both", expand=True, padx=20, pady=20,
+                                     before=self.gestion_cerrar_btn)
+        else:
+            self.tabla_usuarios.pack_forget()
+            self.sin_usuarios_label.pack(pady=20, before=self.gestion_cerrar_btn)
+    
+    def mostrar_estadisticas(self):
+        """Mostrar estadísticas del sistema (solo admin)"""
+        user = self.usuario_sesion()
+        if user is None:
+            return
+        if user.role != "admin":
+            messagebox.showerror("Error", "Solo los administradores pueden acceder a esta función")
+            return
+        self.dialogos.abrir("estadisticas")
+    
+    def _construir_estadisticas(self, stats_window):
+        # Frame principal
+        main_frame = ctk.CTkFrame(stats_window)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Título
+        ctk.CTkLabel(
+            main_frame, 
+            text="Estadísticas del Sistema", 
+            font=self.estilos.fuente("titulo_dialogo")
+        ).pack(pady=20)
+        
+        # Resumen (lo rellena _refrescar_estadisticas)
+        self.stats_label = ctk.CTkLabel(
+            main_frame,
+            text="",
+            font=self.estilos.fuente("texto_pequeno"),
+            justify="left"
+        )
+        self.stats_label.pack(pady=10, padx=20)
+        
+        # Serie de los últimos 30 días
+        self.serie_text = ctk.CTkTextbox(main_frame, font=self.estilos.fuente("texto_tabla"), height=150)
+        self.serie_text.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        # Botón cerrar
+        ctk.CTkButton(
+            main_frame,
+            text="Cerrar",
+            command=lambda: self.dialogos.cerrar("estadisticas"),
+            font=self.estilos.fuente("boton")
+        ).pack(pady=20)
+    
+    def _refrescar_estadisticas(self):
+        # Contadores incrementales (JSON) o agregados SQL: no se recorren los usuarios
+        stats = self.sistema.obtener_estadisticas()
+        total_usuarios = stats["total"]
+        admins = stats["por_rol"].get("admin", 0)
+        users = total_usuarios - admins
+        porcentaje = lambda n: (n / total_usuarios * 100) if total_usuarios else 0.0
+        
+        stats_text = f"""📊 Estadísticas del Sistema:
+
+👥 Total de usuarios: {total_usuarios}
+👑 Administradores: {admins}
+👤 Usuarios normales: {users}
+
+📅 Usuarios registrados hoy: {stats["registrados_hoy"]}
+
+🕒 Usuarios activos (con login): {stats["con_login"]}
+🔑 Logins en las últimas 24 h: {stats["logins_24h"]}
+
+📈 Distribución de roles:
+• Administradores: {porcentaje(admins):.1f}%
+• Usuarios: {porcentaje(users):.1f}%"""
+        self.stats_label.configure(text=stats_text)
+        
+        lineas = ["Día".ljust(14) + "Altas".ljust(8) + "Logins"]
+        for dia, altas, logins in reversed(self.sistema.serie_diaria()):
+            lineas.append(dia.ljust(14) + str(altas).ljust(8) + str(logins))
+        self.serie_text.configure(state="normal")
+        self.serie_text.delete("1.0", "end")
+        self.serie_text.insert("1.0", "\n".join(lineas))
+        self.serie_text.configure(state="disabled")
+    
+    def logout(self):
+        """Cerrar sesión"""
+        self.sistema.logout(self.sesion)
+        self.sesion = None
+        # Los diálogos tienen datos del usuario que sale
+        self.dialogos.cerrar_todos()
+        self.crear_interfaz_login()
+    
+    def ejecutar(self):
+        try:
+            self.root.mainloop()
+        finally:
+            self.ejecutor.cerrar()
+            self.sistema.cerrar()
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Sistema de usuarios con interfaz gráfica")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND_POR_DEFECTO)
+    parser.add_argument("--archivo", help="Archivo de datos (por defecto usuarios.json / usuarios.db)")
+    parser.add_argument("--tiempos-pantallas", action="store_true",
+                        help="Mostrar al salir cuánto tardaron los cambios de pantalla")
+    parser.add_argument("--ciclos-dialogos", type=int, default=0,
+                        help="Tras el primer login, abrir y cerrar N veces cada diálogo y medirlo")
+    args = parser.parse_args()
+    app = AplicacionSistemaUsuarios(args.backend, args.archivo)
+    app.ciclos_dialogos = args.ciclos_dialogos
+    app.ejecutar()
+    if args.tiempos_pantallas:
+        for nombre, datos in app.pantallas.resumen().items():
+            print(f"{nombre:<10} construcción={datos['construccion_ms']:.1f} ms "
+                  f"cambio medio={datos['cambio_medio_ms']:.1f} ms "
+                  f"(máx {datos['cambio_max_ms']:.1f} ms, {datos['cambios']} cambios)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+from interfaz_sistema_usuarios import AplicacionSistemaUsuarios
+
+
+class AplicacionSistemaUsuariosSQLite(AplicacionSistemaUsuarios):
+    """La misma aplicación sobre el backend SQLite"""
+    titulo = "Sistema de Usuarios (SQLite) - Python GUI Demo"
+    
+    def __init__(self, ruta: str = None):
+        super().__init__("sqlite", ruta)
+
+
+if __name__ == "__main__":
+    app = AplicacionSistemaUsuariosSQLite()
+    app.ejecutar()
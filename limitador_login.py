@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from diario_usuarios import escribir_json_atomico
+from estructuras import CacheLRU
+
+# Por usuario: 5 fallos seguidos y luego un intento por minuto
+CAPACIDAD_USUARIO = 5
+RECARGA_USUARIO = 1 / 60          # tokens por segundo
+# Por origen (IP, terminal...): ráfagas de 30 intentos y luego uno cada 2 s
+CAPACIDAD_ORIGEN = 30
+RECARGA_ORIGEN = 1 / 2
+MAX_ENTRADAS = 100_000            # cubos en memoria por tipo (LRU)
+
+
+class CuboTokens:
+    """Cubo de tokens que se recarga de forma continua con el tiempo"""
+    __slots__ = ("tokens", "actualizado", "fallos")
+
+    def __init__(self, tokens: float, actualizado: float, fallos: int = 0):
+        self.tokens = tokens
+        self.actualizado = actualizado
+        self.fallos = fallos
+
+    def recargar(self, ahora: float, capacidad: float, recarga: float):
+        if ahora > self.actualizado:
+            self.tokens = min(capacidad, self.tokens + (ahora - self.actualizado) * recarga)
+        self.actualizado = ahora
+
+    def espera(self, recarga: float) -> float:
+        """Segundos hasta tener un token completo"""
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / recarga
+
+
+class LimitadorLogin:
+    """Limitador de intentos de login por usuario y por origen.
+
+    - Cada intento consume un token del cubo de su origen.
+    - Cada fallo consume un token del cubo del usuario; un login correcto lo
+      reinicia. Solo se siguen usuarios que existen, para que una ráfaga de
+      nombres inventados no desplace los bloqueos de cuentas reales.
+
+    Los cubos viven en cachés LRU de tamaño fijo, así que la memoria está
+    acotada aunque lleguen millones de orígenes distintos. `permitir` se
+    llama antes de calcular ningún hash.
+    """
+
+    def __init__(self, capacidad_usuario: float = CAPACIDAD_USUARIO,
+                 recarga_usuario: float = RECARGA_USUARIO,
+                 capacidad_origen: float = CAPACIDAD_ORIGEN,
+                 recarga_origen: float = RECARGA_ORIGEN,
+                 max_entradas: int = MAX_ENTRADAS):
+        self.capacidad_usuario = capacidad_usuario
+        self.recarga_usuario = recarga_usuario
+        self.capacidad_origen = capacidad_origen
+        self.recarga_origen = recarga_origen
+        self.por_usuario = CacheLRU(max_entradas)
+        self.por_origen = CacheLRU(max_entradas)
+        self.rechazados = 0
+        # Se llama desde el hilo de la interfaz y desde los hilos de verificación
+        self._lock = threading.Lock()
+
+    def _cubo(self, cache: CacheLRU, clave: str, capacidad: float, recarga: float,
+              ahora: float, crear: bool) -> Optional[CuboTokens]:
+        cubo = cache.obtener(clave)
+        if cubo is None:
+            if not crear:
+                return None
+            cubo = CuboTokens(capacidad, ahora)
+            cache.guardar(clave, cubo)
+        else:
+            cubo.recargar(ahora, capacidad, recarga)
+        return cubo
+
+    def permitir(self, username: str, origen: str) -> Tuple[bool, float]:
+        """Consumir el token del intento; devuelve (permitido, segundos de espera)"""
+        ahora = time.time()
+        with self._lock:
+            cubo_origen = self._cubo(self.por_origen, origen, self.capacidad_origen,
+                                     self.recarga_origen, ahora, crear=True)
+            cubo_usuario = self._cubo(self.por_usuario, username, self.capacidad_usuario,
+                                      self.recarga_usuario, ahora, crear=False)
+            espera = cubo_origen.espera(self.recarga_origen)
+            if cubo_usuario is not None:
+                espera = max(espera, cubo_usuario.espera(self.recarga_usuario))
+            if espera > 0:
+                self.rechazados += 1
+                return False, espera
+            cubo_origen.tokens -= 1
+            return True, 0.0
+
+    def registrar_fallo(self, username: str):
+        """Contraseña incorrecta para un usuario existente"""
+        ahora = time.time()
+        with self._lock:
+            cubo = self._cubo(self.por_usuario, username, self.capacidad_usuario,
+                              self.recarga_usuario, ahora, crear=True)
+            cubo.tokens = max(cubo.tokens - 1, 0.0)
+            cubo.fallos += 1
+
+    def registrar_exito(self, username: str):
+        with self._lock:
+            self.por_usuario.invalidar(username)
+
+    def fallos(self, username: str) -> int:
+        with self._lock:
+            cubo = self.por_usuario.obtener(username)
+            return cubo.fallos if cubo else 0
+
+    # --- Persistencia ---
+    def to_dict(self) -> Dict:
+        """Solo los contadores por usuario: los de origen son efímeros"""
+        with self._lock:
+            return {username: [cubo.tokens, cubo.actualizado, cubo.fallos]
+                    for username, cubo in self.por_usuario.items()}
+
+    def cargar_dict(self, datos: Dict):
+        with self._lock:
+            for username, (tokens, actualizado, fallos) in datos.items():
+                self.por_usuario.guardar(username, CuboTokens(tokens, actualizado, fallos))
+
+    def guardar(self, ruta: str):
+        escribir_json_atomico(ruta, self.to_dict(), indent=None)
+
+    def cargar(self, ruta: str):
+        if not os.path.exists(ruta):
+            return
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                self.cargar_dict(json.load(f))
+        except Exception as e:
+            print(f"Error cargando intentos de login: {e}")
@@ -0,0 +1,402 @@
+"""Migración de usuarios.json (SistemaUsuarios) a la base de datos de SistemaUsuariosSQLite.
+
+Uso:
+    python migracion_usuarios.py usuarios.json usuarios.db [--lote 20000]
+    python migracion_usuarios.py usuarios.json usuarios.db --verificar
+
+El snapshot y su diario (`usuarios.json.diario`) se leen en streaming y se
+insertan en `usuarios` y `perfiles` por lotes; cada lote va en una
+transacción que también guarda el punto de control en la tabla
+`migracion_json`. Si la migración se interrumpe, al volver a ejecutarla
+sigue tras el último lote confirmado, y si la aplicación ha seguido
+añadiendo cambios al diario, otra ejecución migra solo los nuevos.
+
+Al terminar se comparan el número de usuarios y una suma de comprobación
+(suma de los SHA-256 de cada usuario, independiente del orden) de la base
+de datos con el punto de control y con el origen. La del origen se calcula
+volviendo a leer el JSON y el diario, sin pasar por la conversión a filas:
+cada usuario en el formato de `Usuario.to_dict`, aplicando las mismas reglas
+(la última versión gana, se descartan registros inválidos y emails de otro
+usuario), frente a cada usuario de SQLite reconstruido a ese formato.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from almacen_registros import iterar_valores
+from importacion_usuarios import ResultadoImportacion
+from sistema_usuarios_sqlite import CAMPOS_PERFIL, PRAGMAS, conectar, crear_esquema, perfil_a_columnas
+
+TAMANO_LOTE = 20000
+# Sin mmap: al recorrer millones de filas las páginas mapeadas cuentan como
+# memoria del proceso; la caché de páginas (64 MB) ya acota lo que se retiene
+PRAGMAS_MIGRACION = {**PRAGMAS, "mmap_size": 0}
+MODULO_SUMA = 2 ** 256
+CAMPOS_USUARIO = ("username", "password_hash", "email", "role", "created_at", "last_login")
+# FORMATO_FECHA de modelo_usuarios; con regex y datetime() es mucho más rápido que strptime
+_FECHA = re.compile(r"(\d{4})-(\d{2})-(\d{2}) (\d{2}):(\d{2}):(\d{2})")
+
+# Fila de usuarios y, si tiene perfil, fila de perfiles (sin el username)
+Fila = Tuple[Tuple, Optional[Tuple]]
+
+_SELECT_FILAS = '''
+    SELECT u.username, u.password_hash, u.email, u.role, u.created_at, u.last_login,
+           p.username IS NOT NULL, p.nombre_completo, p.edad, p.ciudad, p.intereses, p.extra
+    FROM usuarios u LEFT JOIN perfiles p ON p.username = u.username
+'''
+
+
+def _digest(fila: Tuple, perfil: Optional[Tuple]) -> int:
+    canonico = json.dumps([fila, perfil], ensure_ascii=False, separators=(",", ":"))
+    return int.from_bytes(hashlib.sha256(canonico.encode("utf-8")).digest(), "big")
+
+
+def _fila_guardada(resultado) -> Fila:
+    """Fila de _SELECT_FILAS -> (fila de usuarios, fila de perfiles o None)"""
+    return tuple(resultado[:6]), tuple(resultado[7:]) if resultado[6] else None
+
+
+def _fecha_valida(valor: str) -> bool:
+    partes = _FECHA.fullmatch(valor)
+    if partes is None:
+        return False
+    try:
+        datetime(*map(int, partes.groups()))
+    except ValueError:
+        return False
+    return True
+
+
+def convertir_usuario(dato: Dict) -> Fila:
+    """Registro de Usuario.to_dict -> filas de `usuarios` y `perfiles`
+
+    Lanza ValueError si al registro le faltan campos o tienen otro tipo.
+    """
+    if not isinstance(dato, dict):
+        raise ValueError("El registro no es un objeto JSON")
+    fila = tuple(dato.get(campo) for campo in CAMPOS_USUARIO)
+    if not all(isinstance(valor, str) and valor for valor in fila[:5]):
+        faltan = [c for c, v in zip(CAMPOS_USUARIO[:5], fila) if not isinstance(v, str) or not v]
+        raise ValueError(f"Campos ausentes o inválidos: {', '.join(faltan)}")
+    if fila[5] is not None and not isinstance(fila[5], str):
+        raise ValueError("Campo inválido: last_login")
+    for campo, valor in (("created_at", fila[4]), ("last_login", fila[5])):
+        if valor is not None and not _fecha_valida(valor):
+            raise ValueError(f"Fecha inválida en {campo}: {valor!r}")
+    perfil = dato.get("profile_data") or None
+    if perfil is not None and not isinstance(perfil, dict):
+        raise ValueError("Campo inválido: profile_data")
+    return fila, perfil_a_columnas(perfil) if perfil else None
+
+
+def _perfil_canonico(perfil: Optional[Dict]) -> Optional[Dict]:
+    """profile_data como lo devuelve el backend SQLite (o None si no tiene perfil)"""
+    if not perfil:
+        return None
+    canonico = {clave: valor for clave, valor in perfil.items() if clave not in CAMPOS_PERFIL}
+    edad = perfil.get("edad")
+    canonico.update(
+        nombre_completo=perfil.get("nombre_completo") or "",
+        edad="" if edad is None else str(edad),
+        ciudad=perfil.get("ciudad") or "",
+        intereses=list(perfil.get("intereses") or []),
+    )
+    return canonico
+
+
+def _digest_usuario(usuario: Dict) -> int:
+    """SHA-256 de un usuario en formato `Usuario.to_dict`, con el perfil canónico"""
+    canonico = [[usuario.get(campo) for campo in CAMPOS_USUARIO],
+                _perfil_canonico(usuario.get("profile_data"))]
+    texto = json.dumps(canonico, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return int.from_bytes(hashlib.sha256(texto.encode("utf-8")).digest(), "big")
+
+
+def _usuario_guardado(resultado) -> Dict:
+    """Fila de _SELECT_FILAS -> usuario en formato `Usuario.to_dict`"""
+    usuario = dict(zip(CAMPOS_USUARIO, resultado[:6]))
+    if resultado[6]:
+        nombre_completo, edad, ciudad, intereses, extra = resultado[7:]
+        perfil = json.loads(extra) if extra else {}
+        perfil.update(nombre_completo=nombre_completo or "", edad=edad or "", ciudad=ciudad or "",
+                      intereses=json.loads(intereses) if intereses else [])
+        usuario["profile_data"] = perfil
+    return usuario
+
+
+def leer_origen(ruta_json: str) -> Iterator:
+    """Registros del snapshot seguidos de los del diario, en orden y sin cargarlos en memoria"""
+    for ruta in (ruta_json, f"{ruta_json}.diario"):
+        if os.path.exists(ruta):
+            with open(ruta, "r", encoding="utf-8") as f:
+                yield from iterar_valores(f)
+
+
+class MigradorUsuarios:
+    """Migración reanudable de un snapshot JSON (y su diario) a SQLite.
+
+    El punto de control (registros leídos, usuarios, errores y suma de
+    comprobación acumulada) se guarda en la misma transacción que cada lote,
+    así que nunca queda por delante ni por detrás de los datos.
+    """
+
+    def __init__(self, ruta_json: str, db_path: str, tamano_lote: int = TAMANO_LOTE):
+        self.ruta_json = ruta_json
+        self.origen = os.path.abspath(ruta_json)
+        self.db_path = db_path
+        self.tamano_lote = tamano_lote
+        self.conn = conectar(db_path, PRAGMAS_MIGRACION)
+        self.conn.row_factory = None
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            crear_esquema(self.conn)
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS migracion_json (
+                    origen TEXT PRIMARY KEY,
+                    firma TEXT NOT NULL,
+                    procesados INTEGER NOT NULL,
+                    usuarios INTEGER NOT NULL,
+                    errores INTEGER NOT NULL,
+                    suma TEXT NOT NULL
+                )
+            ''')
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _firma(self) -> str:
+        # El snapshot solo cambia al compactar; el diario puede seguir creciendo
+        if not os.path.exists(self.ruta_json):
+            return ""
+        info = os.stat(self.ruta_json)
+        return f"{info.st_size}:{info.st_mtime_ns}"
+
+    def punto_control(self) -> Optional[Dict]:
+        fila = self.conn.execute(
+            "SELECT firma, procesados, usuarios, errores, suma FROM migracion_json WHERE origen = ?",
+            (self.origen,)).fetchone()
+        if fila is None:
+            return None
+        return {"firma": fila[0], "procesados": fila[1], "usuarios": fila[2],
+                "errores": fila[3], "suma": int(fila[4], 16)}
+
+    def migrar(self, progreso: Optional[Callable[[Dict], None]] = None) -> ResultadoImportacion:
+        """Migrar los registros pendientes; devuelve lo importado y los errores de esta ejecución"""
+        firma = self._firma()
+        estado = self.punto_control()
+        if estado is None:
+            if self.conn.execute("SELECT 1 FROM usuarios LIMIT 1").fetchone():
+                raise ValueError(f"{self.db_path} ya tiene usuarios que no vienen de {self.ruta_json}")
+            estado = {"firma": firma, "procesados": 0, "usuarios": 0, "errores": 0, "suma": 0}
+        elif estado["firma"] != firma:
+            raise ValueError(f"{self.ruta_json} cambió desde la última ejecución (¿se compactó?); "
+                             "migre de nuevo a una base de datos vacía")
+
+        resultado = ResultadoImportacion()
+        lote = []
+        leidos = errores = 0
+        for numero, dato in enumerate(islice(leer_origen(self.ruta_json), estado["procesados"], None),
+                                      estado["procesados"] + 1):
+            leidos += 1
+            try:
+                lote.append((numero,) + convertir_usuario(dato))
+            except ValueError as e:
+                resultado.agregar_error(numero, str(e))
+                errores += 1
+            if leidos == self.tamano_lote:
+                self._confirmar(lote, leidos, errores, estado, resultado)
+                lote, leidos, errores = [], 0, 0
+                if progreso:
+                    progreso(estado)
+        if leidos:
+            self._confirmar(lote, leidos, errores, estado, resultado)
+            if progreso:
+                progreso(estado)
+        return resultado
+
+    def _confirmar(self, lote, leidos: int, errores: int, estado: Dict,
+                   resultado: ResultadoImportacion):
+        """Escribir un lote y el punto de control en una transacción"""
+        rechazados = []
+        cur = self.conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            usuarios, suma = estado["usuarios"], estado["suma"]
+            cur.execute("SAVEPOINT lote")
+            try:
+                # Caso normal: ningún username del lote existe todavía
+                cur.executemany('''
+                    INSERT INTO usuarios (username, password_hash, email, role, created_at, last_login)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [fila for _, fila, _ in lote])
+                cur.executemany('''
+                    INSERT INTO perfiles (username, nombre_completo, edad, ciudad, intereses, extra)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [(fila[0],) + perfil for _, fila, perfil in lote if perfil])
+                cur.execute("RELEASE lote")
+                usuarios += len(lote)
+                for _, fila, perfil in lote:
+                    suma += _digest(fila, perfil)
+            except sqlite3.IntegrityError:
+                # Usuarios repetidos (normalmente entradas del diario) o emails ya
+                # usados por otro usuario: fila a fila, la última versión gana
+                cur.execute("ROLLBACK TO lote")
+                cur.execute("RELEASE lote")
+                for numero, fila, perfil in lote:
+                    try:
+                        nuevo, suma = self._reemplazar(cur, fila, perfil, suma)
+                    except sqlite3.IntegrityError:
+                        rechazados.append((numero, f"El email {fila[2]} ya es de otro usuario"))
+                        continue
+                    usuarios += nuevo
+            procesados = estado["procesados"] + leidos
+            errores += estado["errores"] + len(rechazados)
+            suma %= MODULO_SUMA
+            cur.execute('''
+                INSERT INTO migracion_json (origen, firma, procesados, usuarios, errores, suma)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(origen) DO UPDATE SET
+                    procesados = excluded.procesados,
+                    usuarios = excluded.usuarios,
+                    errores = excluded.errores,
+                    suma = excluded.suma
+            ''', (self.origen, estado["firma"], procesados, usuarios, errores, format(suma, "x")))
+            cur.execute("COMMIT")
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        # Usuarios nuevos: las versiones posteriores de un usuario (diario) no cuentan
+        resultado.importados += usuarios - estado["usuarios"]
+        estado.update(procesados=procesados, usuarios=usuarios, errores=errores, suma=suma)
+        for numero, motivo in rechazados:
+            resultado.agregar_error(numero, motivo)
+
+    @staticmethod
+    def _reemplazar(cur, fila: Tuple, perfil: Optional[Tuple], suma: int) -> Tuple[int, int]:
+        anterior = cur.execute(_SELECT_FILAS + " WHERE u.username = ?", (fila[0],)).fetchone()
+        # Upsert por username: un email repetido lanza IntegrityError (REPLACE
+        # borraría en silencio al otro usuario con ese email)
+        cur.execute('''
+            INSERT INTO usuarios (username, password_hash, email, role, created_at, last_login)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(username) DO UPDATE SET
+                password_hash = excluded.password_hash,
+                email = excluded.email,
+                role = excluded.role,
+                created_at = excluded.created_at,
+                last_login = excluded.last_login
+        ''', fila)
+        if anterior is not None:
+            suma -= _digest(*_fila_guardada(anterior))
+        if perfil:
+            cur.execute('''
+                INSERT OR REPLACE INTO perfiles (username, nombre_completo, edad, ciudad, intereses, extra)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (fila[0],) + perfil)
+        else:
+            cur.execute("DELETE FROM perfiles WHERE username = ?", (fila[0],))
+        return (0 if anterior is not None else 1), suma + _digest(fila, perfil)
+
+    def resumen_origen(self) -> Tuple[int, int]:
+        """(usuarios, suma de comprobación) del JSON y su diario, leídos de nuevo
+        
+        Reproduce el resultado esperado de la migración sin usar sus filas: la
+        última versión de cada username gana, y se descartan los registros
+        inválidos y los que usan el email de otro usuario (el índice único de
+        SQLite sobre lower(email) los rechaza).
+        """
+        actuales: Dict[str, Tuple[int, str]] = {}  # username -> (digest, email)
+        duenos: Dict[str, str] = {}                # email -> username
+        for dato in leer_origen(self.ruta_json):
+            try:
+                convertir_usuario(dato)
+            except ValueError:
+                continue
+            username, email = dato["username"], dato["email"].lower()
+            dueno = duenos.get(email)
+            if dueno is not None and dueno != username:
+                continue
+            anterior = actuales.get(username)
+            if anterior is not None and anterior[1] != email:
+                del duenos[anterior[1]]
+            duenos[email] = username
+            actuales[username] = (_digest_usuario(dato), email)
+        return len(actuales), sum(digest for digest, _ in actuales.values()) % MODULO_SUMA
+
+    def verificar(self) -> Tuple[bool, str]:
+        """Comparar número de usuarios y sumas de comprobación con el punto de control y el origen"""
+        estado = self.punto_control()
+        if estado is None:
+            return False, f"No hay ninguna migración de {self.ruta_json} en {self.db_path}"
+        total = 0
+        suma = suma_usuarios = 0
+        for resultado in self.conn.execute(_SELECT_FILAS):
+            total += 1
+            suma += _digest(*_fila_guardada(resultado))
+            suma_usuarios += _digest_usuario(_usuario_guardado(resultado))
+        suma %= MODULO_SUMA
+        suma_usuarios %= MODULO_SUMA
+        perfiles = self.conn.execute('''
+            SELECT COUNT(*) FROM perfiles WHERE username IN (SELECT username FROM usuarios)
+        ''').fetchone()[0]
+        if total != estado["usuarios"] or suma != estado["suma"]:
+            return False, (f"SQLite no coincide con el punto de control ({estado['usuarios']} usuarios, "
+                           f"SQLite {total}); ¿se modificó la base de datos tras migrar?")
+        total_origen, suma_origen = self.resumen_origen()
+        if total != total_origen:
+            return False, f"Número de usuarios distinto: JSON {total_origen}, SQLite {total}"
+        if suma_usuarios != suma_origen:
+            return False, "La suma de comprobación no coincide con el JSON"
+        return True, (f"{total} usuarios ({perfiles} con perfil) verificados contra el JSON; "
+                      f"{estado['errores']} registros descartados")
+
+    def cerrar(self):
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrar usuarios.json a SQLite")
+    parser.add_argument("origen", help="Snapshot JSON de SistemaUsuarios (su diario se lee también)")
+    parser.add_argument("destino", help="Base de datos SQLite de SistemaUsuariosSQLite")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Registros por transacción")
+    parser.add_argument("--verificar", action="store_true", help="Solo verificar una migración hecha")
+    args = parser.parse_args()
+
+    migrador = MigradorUsuarios(args.origen, args.destino, args.lote)
+    try:
+        if not args.verificar:
+            inicio = time.perf_counter()
+            previos = (migrador.punto_control() or {}).get("procesados", 0)
+
+            def progreso(estado):
+                transcurrido = time.perf_counter() - inicio
+                print(f"{estado['procesados']:,} registros leídos, {estado['usuarios']:,} usuarios "
+                      f"({(estado['procesados'] - previos) / transcurrido:,.0f} registros/s)", flush=True)
+
+            try:
+                resultado = migrador.migrar(progreso)
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+            for numero, motivo in resultado.errores[:20]:
+                print(f"Registro {numero}: {motivo}")
+            print(f"Migrados {resultado.importados:,} registros, {resultado.total_errores} errores")
+        ok, mensaje = migrador.verificar()
+        print(("OK: " if ok else "ERROR: ") + mensaje)
+        if not ok:
+            sys.exit(1)
+    finally:
+        migrador.cerrar()
+
+
+if __name__ == "__main__":
+    main()
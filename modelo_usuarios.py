@@ -0,0 +1,142 @@
+import re
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from contrasenas import hashear_password, verificar_password
+
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+
+def fecha_a_epoch(texto: str) -> int:
+    """Convertir "YYYY-MM-DD HH:MM:SS" (hora local) a segundos desde epoch"""
+    # Más rápido que strptime, importante al cargar cientos de miles de usuarios
+    return int(time.mktime((int(texto[0:4]), int(texto[5:7]), int(texto[8:10]),
+                            int(texto[11:13]), int(texto[14:16]), int(texto[17:19]), 0, 0, -1)))
+
+
+def epoch_a_fecha(segundos: int) -> str:
+    return time.strftime(FORMATO_FECHA, time.localtime(segundos))
+
+
+PATRON_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+LONGITUD_MINIMA_PASSWORD = 6
+
+
+def validar_email(email: str) -> bool:
+    """Validar formato de email"""
+    return PATRON_EMAIL.match(email) is not None
+
+
+def normalizar_email(email: str) -> str:
+    """Clave para comparar emails sin distinguir mayúsculas ni espacios alrededor"""
+    return email.strip().lower()
+
+
+def agrupar_emails_duplicados(pares: Iterable[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """(username, email) -> {email normalizado: usernames} solo para los emails repetidos"""
+    grupos: Dict[str, List[str]] = {}
+    for username, email in pares:
+        grupos.setdefault(normalizar_email(email), []).append(username)
+    return {email: sorted(usernames) for email, usernames in grupos.items() if len(usernames) > 1}
+
+
+def validar_alta(password: str, email: str) -> Optional[str]:
+    """Validaciones comunes a todos los backends al registrar; devuelve el motivo del error"""
+    if len(password) < LONGITUD_MINIMA_PASSWORD:
+        return f"La contraseña debe tener al menos {LONGITUD_MINIMA_PASSWORD} caracteres"
+    if not validar_email(email):
+        return "El formato del email no es válido"
+    return None
+
+
+class Usuario:
+    # Sin __dict__ por instancia: las fechas se guardan como enteros epoch, el
+    # rol se interna y el perfil solo se crea si se usa
+    __slots__ = ("username", "password_hash", "email", "role",
+                 "creado_ts", "ultimo_login_ts", "_profile_data")
+    
+    def __init__(self, username: str, password: str, email: str, role: str = "user",
+                 password_hash: str = None):
+        self.username = username
+        # Con password_hash (al cargar desde disco) no se vuelve a ejecutar el KDF
+        self.password_hash = password_hash if password_hash is not None else self._hash_password(password)
+        self.email = email
+        self.role = sys.intern(role)
+        self.creado_ts = int(time.time())
+        self.ultimo_login_ts = None
+        self._profile_data = None
+    
+    @property
+    def created_at(self) -> str:
+        return epoch_a_fecha(self.creado_ts)
+    
+    @created_at.setter
+    def created_at(self, valor: str):
+        self.creado_ts = fecha_a_epoch(valor)
+    
+    @property
+    def last_login(self) -> Optional[str]:
+        return epoch_a_fecha(self.ultimo_login_ts) if self.ultimo_login_ts is not None else None
+    
+    @last_login.setter
+    def last_login(self, valor: Optional[str]):
+        self.ultimo_login_ts = fecha_a_epoch(valor) if valor else None
+    
+    @property
+    def profile_data(self) -> Dict:
+        if self._profile_data is None:
+            self._profile_data = {}
+        return self._profile_data
+    
+    @profile_data.setter
+    def profile_data(self, valor: Dict):
+        self._profile_data = valor or None
+    
+    def _hash_password(self, password: str) -> str:
+        """Hashear contraseña de forma segura"""
+        return hashear_password(password)
+    
+    def check_password(self, password: str) -> bool:
+        """Verificar si la contraseña es correcta"""
+        return verificar_password(password, self.password_hash)
+    
+    def to_dict(self) -> Dict:
+        """Convertir usuario a diccionario para guardar"""
+        return {
+            "username": self.username,
+            "password_hash": self.password_hash,
+            "email": self.email,
+            "role": self.role,
+            "created_at": self.created_at,
+            "last_login": self.last_login,
+            "profile_data": self._profile_data or {}
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Usuario':
+        """Crear usuario desde diccionario"""
+        user = cls.__new__(cls)
+        user.username = data["username"]
+        user.password_hash = data["password_hash"]
+        user.email = data["email"]
+        user.role = sys.intern(data["role"])
+        user.creado_ts = fecha_a_epoch(data["created_at"])
+        last_login = data.get("last_login")
+        user.ultimo_login_ts = fecha_a_epoch(last_login) if last_login else None
+        user._profile_data = data.get("profile_data") or None
+        return user
+    
+    def to_tupla(self) -> Tuple:
+        """Campos tal como están en memoria (fechas epoch), para la caché binaria"""
+        return (self.username, self.password_hash, self.email, self.role,
+                self.creado_ts, self.ultimo_login_ts, self._profile_data)
+    
+    @classmethod
+    def from_tupla(cls, fila: Tuple) -> 'Usuario':
+        """Crear usuario desde `to_tupla` sin volver a convertir fechas"""
+        user = cls.__new__(cls)
+        (user.username, user.password_hash, user.email, role,
+         user.creado_ts, user.ultimo_login_ts, user._profile_data) = fila
+        user.role = sys.intern(role)
+        return user
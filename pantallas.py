@@ -0,0 +1,80 @@
+"""Pantallas de una ventana que se construyen una sola vez y se intercambian.
+
+Cada pantalla se construye la primera vez que se muestra; después solo se
+oculta (`pack_forget`) y se vuelve a mostrar (`pack` + `tkraise`). Los datos
+que dependen del usuario se actualizan en su `al_mostrar`, así que un
+login/logout no destruye y recrea todos los frames, etiquetas y botones.
+
+Cada transición se mide hasta que Tk ha calculado la geometría
+(`update_idletasks`) y `resumen()` separa las que construyeron la pantalla
+de las que solo la cambiaron.
+"""
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+MAX_TRANSICIONES = 1000  # transiciones recientes que se guardan para el resumen
+
+
+class Pantalla:
+    """Cómo construir una pantalla y cómo refrescar sus datos al mostrarla"""
+    __slots__ = ("nombre", "construir", "al_mostrar", "opciones_pack", "frame")
+
+    def __init__(self, nombre: str, construir: Callable[[Any], Any],
+                 al_mostrar: Optional[Callable[[], None]], opciones_pack: Dict):
+        self.nombre = nombre
+        self.construir = construir
+        self.al_mostrar = al_mostrar
+        self.opciones_pack = opciones_pack
+        self.frame = None
+
+
+class GestorPantallas:
+    """Pantallas de `contenedor`, de las que solo una está empaquetada a la vez"""
+
+    def __init__(self, contenedor):
+        self.contenedor = contenedor
+        self._pantallas: Dict[str, Pantalla] = {}
+        self.actual: Optional[str] = None
+        # (pantalla, si se construyó en esta transición, milisegundos)
+        self.transiciones: Deque[Tuple[str, bool, float]] = deque(maxlen=MAX_TRANSICIONES)
+
+    def registrar(self, nombre: str, construir: Callable[[Any], Any],
+                  al_mostrar: Optional[Callable[[], None]] = None, **opciones_pack):
+        """Registrar una pantalla; `construir(contenedor)` devuelve su frame sin empaquetar"""
+        opciones_pack = {"fill": "both", "expand": True, **opciones_pack}
+        self._pantallas[nombre] = Pantalla(nombre, construir, al_mostrar, opciones_pack)
+
+    def mostrar(self, nombre: str):
+        """Mostrar una pantalla, construyéndola si es la primera vez"""
+        inicio = time.perf_counter()
+        pantalla = self._pantallas[nombre]
+        construida = pantalla.frame is None
+        if construida:
+            pantalla.frame = pantalla.construir(self.contenedor)
+        if pantalla.al_mostrar is not None:
+            pantalla.al_mostrar()
+        if self.actual is not None and self.actual != nombre:
+            self._pantallas[self.actual].frame.pack_forget()
+        pantalla.frame.pack(**pantalla.opciones_pack)
+        pantalla.frame.tkraise()
+        self.actual = nombre
+        self.contenedor.update_idletasks()
+        self.transiciones.append((nombre, construida, (time.perf_counter() - inicio) * 1000))
+
+    def resumen(self) -> Dict[str, Dict[str, float]]:
+        """Por pantalla: ms de la construcción y media/máximo de los cambios posteriores"""
+        resumen: Dict[str, Dict[str, float]] = {}
+        for nombre, construida, ms in self.transiciones:
+            datos = resumen.setdefault(nombre, {"construccion_ms": 0.0, "cambios": 0,
+                                                "cambio_medio_ms": 0.0, "cambio_max_ms": 0.0})
+            if construida:
+                datos["construccion_ms"] = round(ms, 2)
+                continue
+            datos["cambios"] += 1
+            datos["cambio_medio_ms"] += (ms - datos["cambio_medio_ms"]) / datos["cambios"]
+            datos["cambio_max_ms"] = max(datos["cambio_max_ms"], ms)
+        for datos in resumen.values():
+            datos["cambio_medio_ms"] = round(datos["cambio_medio_ms"], 2)
+            datos["cambio_max_ms"] = round(datos["cambio_max_ms"], 2)
+        return resumen
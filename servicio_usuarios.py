@@ -0,0 +1,263 @@
+"""Servicio HTTP/JSON local sobre los backends de usuarios (sin interfaz gráfica).
+
+Uso:
+    python servicio_usuarios.py --backend diario --puerto 8080
+    python servicio_usuarios.py --backend sqlite --archivo usuarios.db
+
+Endpoints (cuerpo y respuesta en JSON; la sesión va en `Authorization: Bearer <token>`):
+    POST /registro          {"username", "password", "email"}
+    POST /login             {"username", "password"}            -> {"token"}
+    POST /logout
+    POST /cambiar-password  {"password_actual", "password_nuevo"}
+    GET  /usuarios?after_username=&limit=   (solo admin; páginas por username)
+    GET  /estadisticas      (solo admin)
+"""
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from backends_usuarios import BACKEND_POR_DEFECTO, BACKENDS, BackendUsuarios, crear_backend
+
+MAX_CONCURRENTES = 32
+ESPERA_HUECO = 5.0              # segundos esperando un hueco antes de responder 503
+TAMANO_MAXIMO_CUERPO = 64 * 1024
+LIMITE_PAGINA = 1000            # usuarios por respuesta de GET /usuarios
+
+
+class ServicioUsuarios:
+    """Operaciones del API sobre cualquier BackendUsuarios.
+
+    SistemaUsuarios (JSON) guarda el estado en dicts que no son seguros
+    entre hilos, así que los cambios se serializan con `_lock`; la
+    verificación de la contraseña (el KDF, lo caro) se hace fuera del lock.
+    """
+
+    def __init__(self, sistema: BackendUsuarios):
+        self.sistema = sistema
+        self._lock = threading.RLock()
+
+    def registrar(self, username: str, password: str, email: str) -> Tuple[bool, str]:
+        # El hash se calcula fuera del lock; completar_alta vuelve a comprobar duplicados
+        ok, mensaje, password_hash = self.sistema.preparar_alta(username, password, email)
+        if not ok:
+            return False, mensaje
+        with self._lock:
+            return self.sistema.completar_alta(username, email, password_hash)
+
+    def login(self, username: str, password: str, origen: str) -> Tuple[bool, str, Optional[str]]:
+        ok, mensaje, nuevo_hash = self.sistema.verificar_credenciales(username, password, origen)
+        if not ok:
+            return False, mensaje, None
+        with self._lock:
+            sesion = self.sistema.completar_login(username, nuevo_hash)
+        return True, mensaje, sesion.token
+
+    def logout(self, token: str) -> bool:
+        return self.sistema.logout(token)
+
+    def cambiar_password(self, token: str, actual: str, nuevo: str) -> Tuple[bool, str]:
+        # Verificar la actual y hashear la nueva (dos KDF) fuera del lock
+        ok, mensaje, nuevo_hash = self.sistema.preparar_cambio_password(token, actual, nuevo)
+        if not ok:
+            return False, mensaje
+        with self._lock:
+            return self.sistema.completar_cambio_password(token, nuevo_hash)
+
+    def es_admin(self, token: Optional[str]) -> bool:
+        user = self.sistema.usuario_de(token)
+        return user is not None and user.role == "admin"
+
+    def listar_usuarios(self, token: str, after_username: Optional[str] = None,
+                        limit: int = LIMITE_PAGINA):
+        with self._lock:
+            usuarios = self.sistema.obtener_usuarios(token, after_username, limit)
+            filas = [user.to_dict() for user in usuarios]
+        for fila in filas:
+            fila.pop("password_hash", None)
+        return filas
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            return self.sistema.obtener_estadisticas()
+
+
+class ManejadorAPI(BaseHTTPRequestHandler):
+    # HTTP/1.1 mantiene la conexión abierta entre peticiones (keep-alive)
+    protocol_version = "HTTP/1.1"
+    # Cabeceras y cuerpo van en escrituras separadas: sin TCP_NODELAY cada
+    # respuesta esperaría al ACK retrasado del cliente (~40 ms)
+    disable_nagle_algorithm = True
+    server_version = "SistemaUsuarios/1.0"
+
+    def log_message(self, formato, *args):
+        if self.server.registrar_peticiones:
+            super().log_message(formato, *args)
+
+    def _responder(self, estado: int, datos: Dict):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _leer_json(self) -> Optional[Dict]:
+        try:
+            largo = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            largo = -1
+        if largo < 0:
+            # rfile.read(-1) leería hasta que el cliente cierre y bloquearía el hilo
+            self.close_connection = True
+            self._responder(400, {"ok": False, "mensaje": "Content-Length no válido"})
+            return None
+        if largo > TAMANO_MAXIMO_CUERPO:
+            self.close_connection = True
+            self._responder(400, {"ok": False, "mensaje": "Cuerpo demasiado grande"})
+            return None
+        try:
+            datos = json.loads(self.rfile.read(largo) or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            datos = None
+        if not isinstance(datos, dict):
+            self._responder(400, {"ok": False, "mensaje": "Se esperaba un objeto JSON"})
+            return None
+        return datos
+
+    def _token(self) -> Optional[str]:
+        cabecera = self.headers.get("Authorization", "")
+        return cabecera[7:].strip() if cabecera.startswith("Bearer ") else None
+
+    def _atender(self, rutas: Dict):
+        manejador = rutas.get(self.path.split("?", 1)[0])
+        if manejador is None:
+            # El cuerpo no se lee, así que la conexión no se puede reutilizar
+            self.close_connection = True
+            self._responder(404, {"ok": False, "mensaje": "Ruta desconocida"})
+            return
+        limite = self.server.limite_concurrencia
+        if not limite.acquire(timeout=ESPERA_HUECO):
+            self.close_connection = True
+            self._responder(503, {"ok": False, "mensaje": "Servicio ocupado"})
+            return
+        try:
+            manejador()
+        except Exception as e:
+            self._responder(500, {"ok": False, "mensaje": f"Error interno: {e}"})
+        finally:
+            limite.release()
+
+    def do_GET(self):
+        self._atender({"/usuarios": self.listar_usuarios, "/estadisticas": self.estadisticas})
+
+    def do_POST(self):
+        self._atender({
+            "/registro": self.registrar,
+            "/login": self.login,
+            "/logout": self.logout,
+            "/cambiar-password": self.cambiar_password,
+        })
+
+    # --- Endpoints ---
+    def registrar(self):
+        datos = self._leer_json()
+        if datos is None:
+            return
+        ok, mensaje = self.server.servicio.registrar(
+            str(datos.get("username", "")).strip(), str(datos.get("password", "")),
+            str(datos.get("email", "")).strip())
+        self._responder(201 if ok else 400, {"ok": ok, "mensaje": mensaje})
+
+    def login(self):
+        datos = self._leer_json()
+        if datos is None:
+            return
+        ok, mensaje, token = self.server.servicio.login(
+            str(datos.get("username", "")).strip(), str(datos.get("password", "")),
+            self.client_address[0])
+        respuesta = {"ok": ok, "mensaje": mensaje}
+        if ok:
+            respuesta["token"] = token
+        self._responder(200 if ok else 401, respuesta)
+
+    def logout(self):
+        if self._leer_json() is None:
+            return
+        ok = self.server.servicio.logout(self._token())
+        self._responder(200 if ok else 401, {"ok": ok})
+
+    def cambiar_password(self):
+        datos = self._leer_json()
+        if datos is None:
+            return
+        ok, mensaje = self.server.servicio.cambiar_password(
+            self._token(), str(datos.get("password_actual", "")),
+            str(datos.get("password_nuevo", "")))
+        self._responder(200 if ok else 400, {"ok": ok, "mensaje": mensaje})
+
+    def listar_usuarios(self):
+        token = self._token()
+        if not self.server.servicio.es_admin(token):
+            self._responder(403, {"ok": False, "mensaje": "Solo para administradores"})
+            return
+        parametros = parse_qs(self.path.partition("?")[2])
+        after_username = parametros.get("after_username", [None])[0]
+        try:
+            limit = max(1, min(int(parametros.get("limit", [LIMITE_PAGINA])[0]), LIMITE_PAGINA))
+        except ValueError:
+            self._responder(400, {"ok": False, "mensaje": "limit debe ser un número"})
+            return
+        usuarios = self.server.servicio.listar_usuarios(token, after_username, limit)
+        respuesta = {"ok": True, "usuarios": usuarios}
+        if len(usuarios) == limit:
+            # Cursor para pedir la página siguiente
+            respuesta["siguiente"] = usuarios[-1]["username"]
+        self._responder(200, respuesta)
+
+    def estadisticas(self):
+        if not self.server.servicio.es_admin(self._token()):
+            self._responder(403, {"ok": False, "mensaje": "Solo para administradores"})
+            return
+        self._responder(200, {"ok": True, "estadisticas": self.server.servicio.estadisticas()})
+
+
+class ServidorUsuarios(ThreadingHTTPServer):
+    """Servidor con un hilo por conexión y como mucho `max_concurrentes` peticiones a la vez"""
+    daemon_threads = True
+
+    def __init__(self, direccion, sistema, max_concurrentes: int = MAX_CONCURRENTES,
+                 registrar_peticiones: bool = False):
+        super().__init__(direccion, ManejadorAPI)
+        self.servicio = ServicioUsuarios(sistema)
+        self.limite_concurrencia = threading.BoundedSemaphore(max_concurrentes)
+        self.registrar_peticiones = registrar_peticiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON de usuarios")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND_POR_DEFECTO)
+    parser.add_argument("--archivo", help="Archivo de datos (por defecto usuarios.json / usuarios.db)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--max-concurrentes", type=int, default=MAX_CONCURRENTES)
+    parser.add_argument("--registrar", action="store_true", help="Mostrar cada petición")
+    args = parser.parse_args()
+
+    sistema = crear_backend(args.backend, args.archivo)
+    servidor = ServidorUsuarios((args.host, args.puerto), sistema, args.max_concurrentes,
+                                args.registrar)
+    print(f"Servicio de usuarios ({args.backend}) en http://{args.host}:{servidor.server_port}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        sistema.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import base64
+import hashlib
+import heapq
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+TTL_SESION = 8 * 60 * 60  # 8 horas; se renueva con el uso
+
+
+def _nuevo_token() -> str:
+    # Equivale a secrets.token_urlsafe(32) sin importar secrets/random al arrancar
+    return base64.urlsafe_b64encode(os.urandom(32)).rstrip(b"=").decode("ascii")
+
+
+def _clave(token: str) -> str:
+    # Se guarda el hash del token: quien lea la tabla no puede suplantar sesiones
+    return hashlib.sha256(token.encode("ascii")).hexdigest()
+
+
+class Sesion:
+    """Sesión de un usuario; `token` solo se conoce al crearla"""
+    __slots__ = ("clave", "token", "username", "creada", "expira")
+
+    def __init__(self, clave: str, username: str, creada: float, expira: float,
+                 token: Optional[str] = None):
+        self.clave = clave
+        self.token = token
+        self.username = username
+        self.creada = creada
+        self.expira = expira
+
+    def __repr__(self):
+        return f"Sesion(username={self.username!r}, expira={self.expira:.0f})"
+
+
+class GestorSesiones:
+    """Sesiones con token opaco y caducidad.
+
+    Las sesiones están en un dict (clave -> Sesion) y un montículo ordenado
+    por caducidad, así que `purgar` solo saca las caducadas en O(log n) cada
+    una. Las entradas del montículo que ya no corresponden a la caducidad
+    actual de la sesión (renovada o cerrada) se descartan al salir.
+
+    Con `db_path` las sesiones se guardan también en la tabla `sesiones` de
+    esa base de datos SQLite y sobreviven a un reinicio.
+    """
+
+    def __init__(self, ttl: float = TTL_SESION, db_path: Optional[str] = None):
+        self.ttl = ttl
+        self._sesiones: Dict[str, Sesion] = {}
+        self._caducidades: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self.conn = None
+        if db_path is not None:
+            import sqlite3  # solo hace falta con sesiones persistentes
+            self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS sesiones (
+                    clave TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    creada REAL NOT NULL,
+                    expira REAL NOT NULL
+                )
+            ''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sesiones_expira ON sesiones(expira)")
+            self._cargar()
+
+    def _cargar(self):
+        ahora = time.time()
+        self.conn.execute("DELETE FROM sesiones WHERE expira <= ?", (ahora,))
+        for clave, username, creada, expira in self.conn.execute(
+                "SELECT clave, username, creada, expira FROM sesiones"):
+            self._sesiones[clave] = Sesion(clave, username, creada, expira)
+            self._caducidades.append((expira, clave))
+        heapq.heapify(self._caducidades)
+
+    def crear(self, username: str) -> Sesion:
+        """Abrir una sesión nueva y devolverla con su token"""
+        token = _nuevo_token()
+        ahora = time.time()
+        sesion = Sesion(_clave(token), username, ahora, ahora + self.ttl, token)
+        with self._lock:
+            self._purgar(ahora)
+            self._sesiones[sesion.clave] = sesion
+            heapq.heappush(self._caducidades, (sesion.expira, sesion.clave))
+            if self.conn:
+                self.conn.execute(
+                    "INSERT INTO sesiones (clave, username, creada, expira) VALUES (?, ?, ?, ?)",
+                    (sesion.clave, username, sesion.creada, sesion.expira))
+        return sesion
+
+    def obtener(self, sesion: Union[Sesion, str, None]) -> Optional[Sesion]:
+        """Sesión vigente para un token (o una Sesion ya emitida); None si caducó o no existe
+
+        Las sesiones con menos de la mitad del TTL restante se renuevan.
+        """
+        if sesion is None:
+            return None
+        clave = sesion.clave if isinstance(sesion, Sesion) else _clave(sesion)
+        ahora = time.time()
+        with self._lock:
+            actual = self._sesiones.get(clave)
+            if actual is None:
+                return None
+            if actual.expira <= ahora:
+                self._eliminar(clave)
+                return None
+            if actual.expira - ahora < self.ttl / 2:
+                actual.expira = ahora + self.ttl
+                heapq.heappush(self._caducidades, (actual.expira, clave))
+                if self.conn:
+                    self.conn.execute("UPDATE sesiones SET expira = ? WHERE clave = ?",
+                                      (actual.expira, clave))
+            return actual
+
+    def cerrar(self, sesion: Union[Sesion, str, None]) -> bool:
+        """Cerrar una sesión; devuelve False si no existía"""
+        if sesion is None:
+            return False
+        clave = sesion.clave if isinstance(sesion, Sesion) else _clave(sesion)
+        with self._lock:
+            return self._eliminar(clave)
+
+    def _eliminar(self, clave: str) -> bool:
+        # La entrada del montículo se queda y se descarta al purgar
+        if self._sesiones.pop(clave, None) is None:
+            return False
+        if self.conn:
+            self.conn.execute("DELETE FROM sesiones WHERE clave = ?", (clave,))
+        return True
+
+    def purgar(self) -> int:
+        """Eliminar las sesiones caducadas; devuelve cuántas se eliminaron"""
+        with self._lock:
+            return self._purgar(time.time())
+
+    def _purgar(self, ahora: float) -> int:
+        eliminadas = []
+        while self._caducidades and self._caducidades[0][0] <= ahora:
+            expira, clave = heapq.heappop(self._caducidades)
+            sesion = self._sesiones.get(clave)
+            # Entrada obsoleta si la sesión se renovó o ya se cerró
+            if sesion is not None and sesion.expira == expira:
+                del self._sesiones[clave]
+                eliminadas.append((clave,))
+        if eliminadas and self.conn:
+            self.conn.executemany("DELETE FROM sesiones WHERE clave = ?", eliminadas)
+        return len(eliminadas)
+
+    def desconectar(self):
+        """Cerrar la conexión a la base de datos (las sesiones guardadas se conservan)"""
+        with self._lock:
+            if self.conn:
+                self.conn.close()
+                self.conn = None
+
+    def __len__(self) -> int:
+        return len(self._sesiones)
@@ -1,163 +1,652 @@
-import customtkinter as ctk
-import tkinter as tk
-from tkinter import messagebox
 import sqlite3
-import hashlib
-from datetime import datetime
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 import json
-import re
-import os
 
-# Configurar el tema
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("blue")
+from contrasenas import hashear_password, necesita_rehash, verificar_password
+from estructuras import CacheLRU
+from importacion_usuarios import ResultadoImportacion, escribir_usuarios, normalizar_fila
+from limitador_login import LimitadorLogin
+from modelo_usuarios import (LONGITUD_MINIMA_PASSWORD, Usuario, normalizar_email, validar_alta,
+                             validar_email)
+from sesiones import GestorSesiones
 
 DB_PATH = "usuarios.db"
+TAMANO_LOTE = 500  # filas por executemany (también límite de parámetros en IN)
+TAMANO_CACHE_PERFILES = 1024
+TAMANO_PAGINA = 100          # usuarios por página en la vista del administrador
+PAGINAS_EN_CACHE = 32
+
+# Pragmas de la conexión: WAL permite lectores concurrentes y, con
+# synchronous=NORMAL, los commits no hacen fsync (solo los checkpoints)
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,        # 64 MB de caché de páginas
+    "mmap_size": 268435456,      # 256 MB mapeados en memoria
+    "temp_store": "MEMORY",
+}
+
+
+def conectar(db_path=DB_PATH, pragmas=None):
+    """Abrir una conexión en modo autocommit con los pragmas configurados"""
+    conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for nombre, valor in (pragmas or PRAGMAS).items():
+        conn.execute(f"PRAGMA {nombre} = {valor}")
+    return conn
+
+
+def ahora():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+# Claves de profile_data con columna propia en perfiles; el resto va a `extra` (JSON)
+CAMPOS_PERFIL = ("nombre_completo", "edad", "ciudad", "intereses")
+
+
+def crear_esquema(cur):
+    """Crear las tablas (y las columnas añadidas después) si no existen"""
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS usuarios (
+            username TEXT PRIMARY KEY,
+            password_hash TEXT NOT NULL,
+            email TEXT NOT NULL,
+            role TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            last_login TEXT
+        )
+    ''')
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS perfiles (
+            username TEXT PRIMARY KEY,
+            nombre_completo TEXT,
+            edad TEXT,
+            ciudad TEXT,
+            intereses TEXT,
+            extra TEXT,
+            FOREIGN KEY(username) REFERENCES usuarios(username)
+        )
+    ''')
+    columnas = {fila[1] for fila in cur.execute("PRAGMA table_info(perfiles)")}
+    if "extra" not in columnas:
+        cur.execute("ALTER TABLE perfiles ADD COLUMN extra TEXT")
+    # Índices secundarios: los conteos y agregados por rol y fecha se
+    # resuelven recorriendo solo el índice, sin leer las filas
+    for columna in ("role", "created_at", "last_login"):
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_usuarios_{columna} ON usuarios({columna})")
+    _crear_indice_email(cur)
+
+
+def _crear_indice_email(cur):
+    """Índice único de emails sin distinguir mayúsculas.
+
+    Si los datos existentes ya tienen emails repetidos el índice único no se
+    puede crear: se usa uno normal (las búsquedas siguen siendo rápidas) y se
+    vuelve a intentar en el siguiente arranque.
+    """
+    # Sustituido por el índice sobre lower(email)
+    cur.execute("DROP INDEX IF EXISTS idx_usuarios_email")
+    existe = cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                         ("idx_usuarios_email_unico",)).fetchone()
+    if existe:
+        return
+    cur.execute("SAVEPOINT indice_email")
+    try:
+        cur.execute("CREATE UNIQUE INDEX idx_usuarios_email_unico ON usuarios(lower(email))")
+    except sqlite3.IntegrityError:
+        cur.execute("ROLLBACK TO indice_email")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_email_normalizado ON usuarios(lower(email))")
+        print("Aviso: hay emails repetidos; el índice de emails no es único hasta resolverlos "
+              "(ver: python backends_usuarios.py duplicados <base de datos>)")
+    else:
+        cur.execute("DROP INDEX IF EXISTS idx_usuarios_email_normalizado")
+    cur.execute("RELEASE indice_email")
+
+
+def consultar_emails_duplicados(conn):
+    """{email en minúsculas: usernames} de los emails compartidos por varios usuarios"""
+    duplicados = {}
+    for email, username in conn.execute('''
+        SELECT lower(email), username FROM usuarios
+        WHERE lower(email) IN (SELECT lower(email) FROM usuarios GROUP BY 1 HAVING COUNT(*) > 1)
+        ORDER BY 1, 2
+    '''):
+        duplicados.setdefault(email, []).append(username)
+    return duplicados
+
+
+def perfil_a_columnas(perfil):
+    """profile_data (formato JSON) -> (nombre_completo, edad, ciudad, intereses, extra)"""
+    extra = {clave: valor for clave, valor in perfil.items() if clave not in CAMPOS_PERFIL}
+    edad = perfil.get("edad")
+    return (
+        perfil.get("nombre_completo") or "",
+        "" if edad is None else str(edad),
+        perfil.get("ciudad") or "",
+        json.dumps(perfil.get("intereses") or [], ensure_ascii=False),
+        json.dumps(extra, ensure_ascii=False, sort_keys=True) if extra else None,
+    )
+
 
 class SistemaUsuariosSQLite:
-    def __init__(self):
-        self.conn = sqlite3.connect(DB_PATH)
-        self.conn.row_factory = sqlite3.Row
+    def __init__(self, db_path=DB_PATH, intervalo_grupo_ms=0, sesiones=None):
+        # Una sola conexión reutilizada; el lock la protege del hilo de volcado
+        self.conn = conectar(db_path)
+        # Número de sentencias SQL ejecutadas (instrumentación para tests y benchmarks)
+        self.contador_consultas = 0
+        self.conn.set_trace_callback(self._contar_consulta)
+        self._lock = threading.RLock()
+        self._en_transaccion = False
+        # Commit en grupo: los last_login se acumulan y se escriben cada N ms
+        self.intervalo_grupo_ms = intervalo_grupo_ms
+        self._logins_pendientes = {}
+        self._temporizador = None
+        self._cache_perfiles = CacheLRU(TAMANO_CACHE_PERFILES)
         self.crear_tablas()
-        self.usuario_actual = None
+        # En memoria por defecto; GestorSesiones(db_path=db_path) las guarda en la tabla sesiones
+        self.sesiones = sesiones if sesiones is not None else GestorSesiones()
+        # Mismo limitador que el backend JSON; los fallos se guardan junto a la base de datos
+        self.archivo_intentos = None if db_path == ":memory:" else f"{db_path}.intentos"
+        self.limitador = LimitadorLogin()
+        if self.archivo_intentos:
+            self.limitador.cargar(self.archivo_intentos)
         self.crear_admin_default()
 
+    @contextmanager
+    def transaccion(self):
+        """Ejecutar varias sentencias en una única transacción (reentrante)"""
+        with self._lock:
+            if self._en_transaccion:
+                yield self.conn.cursor()
+                return
+            self._en_transaccion = True
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn.cursor()
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._en_transaccion = False
+
+    def _contar_consulta(self, sql):
+        self.contador_consultas += 1
+
+    def _consultar_uno(self, sql, parametros=()):
+        with self._lock:
+            return self.conn.execute(sql, parametros).fetchone()
+
+    def _consultar_todos(self, sql, parametros=()):
+        with self._lock:
+            return self.conn.execute(sql, parametros).fetchall()
+
     def crear_tablas(self):
-        cur = self.conn.cursor()
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS usuarios (
-                username TEXT PRIMARY KEY,
-                password_hash TEXT NOT NULL,
-                email TEXT NOT NULL,
-                role TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                last_login TEXT
-            )
-        ''')
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS perfiles (
-                username TEXT PRIMARY KEY,
-                nombre_completo TEXT,
-                edad TEXT,
-                ciudad TEXT,
-                intereses TEXT,
-                FOREIGN KEY(username) REFERENCES usuarios(username)
-            )
-        ''')
-        self.conn.commit()
+        with self.transaccion() as cur:
+            crear_esquema(cur)
 
     def crear_admin_default(self):
-        if not self.obtener_usuario("admin"):
+        if not self._consultar_uno('SELECT 1 FROM usuarios WHERE username = ?', ("admin",)):
             self.registrar_usuario("admin", "admin123", "admin@demo.com", role="admin")
 
     def hash_password(self, password):
-        return hashlib.sha256(password.encode()).hexdigest()
+        return hashear_password(password)
 
     def validar_email(self, email):
-        patron = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(patron, email) is not None
+        return validar_email(email)
 
     def registrar_usuario(self, username, password, email, role="user"):
-        if self.obtener_usuario(username):
-            return False, "El nombre de usuario ya existe"
-        if len(password) < 6:
-            return False, "La contraseña debe tener al menos 6 caracteres"
-        if not self.validar_email(email):
-            return False, "El formato del email no es válido"
-        cur = self.conn.cursor()
-        cur.execute('''
-            INSERT INTO usuarios (username, password_hash, email, role, created_at, last_login)
-            VALUES (?, ?, ?, ?, ?, NULL)
-        ''', (username, self.hash_password(password), email, role, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-        self.conn.commit()
+        ok, mensaje, password_hash = self.preparar_alta(username, password, email)
+        if not ok:
+            return False, mensaje
+        return self.completar_alta(username, email, password_hash, role)
+
+    def preparar_alta(self, username, password, email):
+        """Validar un alta y calcular el hash sin escribir nada (se puede llamar desde un hilo)
+
+        Devuelve (éxito, mensaje, hash de la contraseña o None).
+        """
+        if self._consultar_uno('SELECT 1 FROM usuarios WHERE username = ?', (username,)):
+            return False, "El nombre de usuario ya existe", None
+        error = validar_alta(password, email)
+        if error:
+            return False, error, None
+        if self.email_registrado(email):
+            return False, "El email ya está registrado", None
+        return True, "", self.hash_password(password)
+
+    def completar_alta(self, username, email, password_hash, role="user"):
+        """Insertar un usuario con el hash de `preparar_alta`"""
+        try:
+            with self.transaccion() as cur:
+                cur.execute('''
+                    INSERT INTO usuarios (username, password_hash, email, role, created_at, last_login)
+                    VALUES (?, ?, ?, ?, ?, NULL)
+                ''', (username, password_hash, email, role, ahora()))
+        except sqlite3.IntegrityError:
+            # Otro hilo registró el mismo username o email entre la comprobación y el INSERT
+            return False, "El nombre de usuario o el email ya están registrados"
         return True, "Usuario registrado exitosamente"
 
-    def login(self, username, password):
-        user = self.obtener_usuario(username)
+    def email_registrado(self, email):
+        """Comprobar si algún usuario tiene ya ese email (búsqueda por el índice de lower(email))"""
+        return self._consultar_uno('SELECT 1 FROM usuarios WHERE lower(email) = lower(?)',
+                                   (email.strip(),)) is not None
+
+    def emails_duplicados(self):
+        """Emails compartidos por varios usuarios (datos anteriores al índice único)"""
+        self.volcar_logins()
+        with self._lock:
+            return consultar_emails_duplicados(self.conn)
+
+    def verificar_credenciales(self, username, password, origen="local"):
+        """Comprobar credenciales sin modificar el estado (se puede llamar desde un hilo)
+
+        Devuelve (éxito, mensaje, hash nuevo o None) igual que SistemaUsuarios.
+        """
+        permitido, espera = self.limitador.permitir(username, origen)
+        if not permitido:
+            return False, f"Demasiados intentos. Inténtalo de nuevo en {int(espera) + 1} s", None
+        fila = self._consultar_uno('SELECT password_hash FROM usuarios WHERE username = ?', (username,))
+        if not fila:
+            return False, "Usuario no encontrado", None
+        if not verificar_password(password, fila["password_hash"]):
+            self.limitador.registrar_fallo(username)
+            return False, "Contraseña incorrecta", None
+        self.limitador.registrar_exito(username)
+        # Sustituir hashes SHA-256 antiguos (o con otro coste) por el KDF actual
+        nuevo_hash = self.hash_password(password) if necesita_rehash(fila["password_hash"]) else None
+        return True, f"Bienvenido, {username}!", nuevo_hash
+
+    def completar_login(self, username, nuevo_hash=None):
+        """Registrar el login de un usuario ya verificado y abrir su sesión"""
+        if nuevo_hash:
+            with self.transaccion() as cur:
+                cur.execute('''
+                    UPDATE usuarios SET password_hash = ? WHERE username = ?
+                ''', (nuevo_hash, username))
+        momento = ahora()
+        if self.intervalo_grupo_ms > 0:
+            self._encolar_login(username, momento)
+        else:
+            with self.transaccion() as cur:
+                cur.execute('''
+                    UPDATE usuarios SET last_login = ? WHERE username = ?
+                ''', (momento, username))
+        return self.sesiones.crear(username)
+
+    def login(self, username, password, origen="local"):
+        """Iniciar sesión; devuelve (éxito, mensaje, sesión o None)"""
+        ok, mensaje, nuevo_hash = self.verificar_credenciales(username, password, origen)
+        sesion = self.completar_login(username, nuevo_hash) if ok else None
+        return ok, mensaje, sesion
+
+    def _encolar_login(self, username, momento):
+        with self._lock:
+            self._logins_pendientes[username] = momento
+            if self._temporizador is None:
+                self._temporizador = threading.Timer(self.intervalo_grupo_ms / 1000, self.volcar_logins)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+
+    def volcar_logins(self):
+        """Escribir en una sola transacción los last_login acumulados"""
+        with self._lock:
+            pendientes = self._logins_pendientes
+            self._logins_pendientes = {}
+            self._temporizador = None
+            if not pendientes:
+                return
+            with self.transaccion() as cur:
+                cur.executemany(
+                    'UPDATE usuarios SET last_login = ? WHERE username = ?',
+                    [(momento, username) for username, momento in pendientes.items()]
+                )
+
+    def cerrar(self):
+        """Volcar los cambios pendientes y cerrar la conexión"""
+        with self._lock:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+            self.volcar_logins()
+            self.conn.close()
+        self.sesiones.desconectar()
+        if self.archivo_intentos:
+            try:
+                self.limitador.guardar(self.archivo_intentos)
+            except Exception as e:
+                print(f"Error guardando intentos de login: {e}")
+
+    def usuario_de(self, sesion):
+        """Usuario de una sesión vigente (o de su token); None si caducó o no existe"""
+        actual = self.sesiones.obtener(sesion)
+        return self.obtener_usuario(actual.username) if actual else None
+
+    def logout(self, sesion):
+        return self.sesiones.cerrar(sesion)
+
+    def cambiar_password(self, sesion, password_actual, password_nuevo):
+        ok, mensaje, nuevo_hash = self.preparar_cambio_password(sesion, password_actual, password_nuevo)
+        if not ok:
+            return False, mensaje
+        return self.completar_cambio_password(sesion, nuevo_hash)
+
+    def preparar_cambio_password(self, sesion, password_actual, password_nuevo):
+        """Comprobar la contraseña actual y calcular el hash nuevo sin escribir nada
+
+        Se puede llamar desde un hilo; devuelve (éxito, mensaje, hash nuevo o None).
+        """
+        user = self.usuario_de(sesion)
+        if not user:
+            return False, "No hay usuario logueado", None
+        if not user.check_password(password_actual):
+            return False, "Contraseña actual incorrecta", None
+        if len(password_nuevo) < LONGITUD_MINIMA_PASSWORD:
+            return False, f"La nueva contraseña debe tener al menos {LONGITUD_MINIMA_PASSWORD} caracteres", None
+        return True, "", self.hash_password(password_nuevo)
+
+    def completar_cambio_password(self, sesion, nuevo_hash):
+        """Guardar el hash de `preparar_cambio_password`"""
+        user = self.usuario_de(sesion)
         if not user:
-            return False, "Usuario no encontrado"
-        if user["password_hash"] != self.hash_password(password):
-            return False, "Contraseña incorrecta"
-        cur = self.conn.cursor()
-        cur.execute('''
-            UPDATE usuarios SET last_login = ? WHERE username = ?
-        ''', (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), username))
-        self.conn.commit()
-        self.usuario_actual = user
-        return True, f"Bienvenido, {username}!"
-
-    def logout(self):
-        self.usuario_actual = None
-
-    def cambiar_password(self, password_actual, password_nuevo):
-        if not self.usuario_actual:
             return False, "No hay usuario logueado"
-        if self.usuario_actual["password_hash"] != self.hash_password(password_actual):
-            return False, "Contraseña actual incorrecta"
-        if len(password_nuevo) < 6:
-            return False, "La nueva contraseña debe tener al menos 6 caracteres"
-        cur = self.conn.cursor()
-        cur.execute('''
-            UPDATE usuarios SET password_hash = ? WHERE username = ?
-        ''', (self.hash_password(password_nuevo), self.usuario_actual["username"]))
-        self.conn.commit()
+        with self.transaccion() as cur:
+            cur.execute('''
+                UPDATE usuarios SET password_hash = ? WHERE username = ?
+            ''', (nuevo_hash, user.username))
         return True, "Contraseña cambiada exitosamente"
 
+    @staticmethod
+    def _a_usuario(fila, perfil=None):
+        user = Usuario.from_dict(dict(fila))
+        if perfil:
+            user.profile_data = perfil
+        return user
+
     def obtener_usuario(self, username):
-        cur = self.conn.cursor()
-        cur.execute('SELECT * FROM usuarios WHERE username = ?', (username,))
-        return cur.fetchone()
+        """Usuario con su perfil, o None si no existe
+
+        Una sola consulta: si el perfil no está en la caché llega en la misma
+        fila (LEFT JOIN).
+        """
+        with self._lock:
+            perfil = self._cache_perfiles.obtener(username)
+            if perfil is not None:
+                fila = self._consultar_uno('SELECT * FROM usuarios WHERE username = ?', (username,))
+            else:
+                fila = self._consultar_uno('''
+                    SELECT u.*, p.nombre_completo, p.edad AS edad_perfil, p.ciudad,
+                           p.intereses, p.extra
+                    FROM usuarios u LEFT JOIN perfiles p ON p.username = u.username
+                    WHERE u.username = ?
+                ''', (username,))
+                if fila is not None:
+                    perfil = self._perfil_de_columnas(fila["nombre_completo"], fila["edad_perfil"],
+                                                      fila["ciudad"], fila["intereses"], fila["extra"])
+                    self._cache_perfiles.guardar(username, perfil)
+            if fila is None:
+                return None
+            # Login aún en la cola del commit en grupo
+            pendiente = self._logins_pendientes.get(username)
+        perfil = {**perfil, "intereses": list(perfil["intereses"])}
+        user = self._a_usuario(fila, perfil if any(perfil.values()) else None)
+        if pendiente:
+            user.last_login = pendiente
+        return user
+
+    def obtener_usuarios(self, sesion, after_username=None, limit=None):
+        """Usuarios ordenados por username (solo admin); el perfil no se carga en el listado
+
+        Paginación por clave: la siguiente página empieza tras el último
+        username de la anterior (`after_username`), así que cada página
+        cuesta lo mismo esté al principio o al final de la tabla.
+        """
+        user = self.usuario_de(sesion)
+        if not user or user.role != "admin":
+            return []
+        self.volcar_logins()
+        filas = self._consultar_todos(
+            'SELECT * FROM usuarios WHERE username > ? ORDER BY username LIMIT ?',
+            (after_username or "", -1 if limit is None else limit))
+        return [self._a_usuario(fila) for fila in filas]
+
+    def vista_usuarios(self, sesion):
+        """Secuencia perezosa de usuarios para la tabla del administrador"""
+        user = self.usuario_de(sesion)
+        if not user or user.role != "admin":
+            return []
+        self.volcar_logins()
+        total = self._consultar_uno('SELECT COUNT(*) FROM usuarios')[0]
+        return VistaUsuariosSQLite(self, sesion, total)
+
+    def _username_en_posicion(self, posicion):
+        # OFFSET sobre la clave primaria: solo recorre el índice, sin leer filas
+        fila = self._consultar_uno('SELECT username FROM usuarios ORDER BY username LIMIT 1 OFFSET ?',
+                                   (posicion,))
+        return fila[0] if fila else None
+
+    def guardar_usuario(self, user):
+        """Persistir los cambios de un Usuario (datos y perfil) en una transacción"""
+        with self.transaccion() as cur:
+            cur.execute('''
+                UPDATE usuarios SET password_hash = ?, email = ?, role = ?, last_login = ?
+                WHERE username = ?
+            ''', (user.password_hash, user.email, user.role, user.last_login, user.username))
+            if user._profile_data:
+                perfil = user._profile_data
+                extra = {clave: valor for clave, valor in perfil.items() if clave not in CAMPOS_PERFIL}
+                self.guardar_perfil(user.username, perfil.get("nombre_completo", ""),
+                                    perfil.get("edad", ""), perfil.get("ciudad", ""),
+                                    perfil.get("intereses", []), extra)
+
+    def estado_escritura(self):
+        # Las escrituras son síncronas (salvo el commit en grupo de los logins)
+        return None
+
+    def obtener_estadisticas(self):
+        """Resumen de las estadísticas calculado con agregados SQL"""
+        self.volcar_logins()
+        hoy = datetime.now().strftime("%Y-%m-%d")
+        hace_24h = (datetime.now() - timedelta(hours=24)).strftime("%Y-%m-%d %H:%M:%S")
+        # Consultas separadas para que cada una use su índice (un SUM(...) sobre
+        # la tabla entera obligaría a leer todas las filas)
+        contar = lambda sql, parametros=(): self._consultar_uno(sql, parametros)[0]
+        por_rol = self._consultar_todos('SELECT role, COUNT(*) FROM usuarios GROUP BY role')
+        return {
+            "total": sum(cantidad for _, cantidad in por_rol),
+            "por_rol": {role: cantidad for role, cantidad in por_rol},
+            "con_login": contar('SELECT COUNT(*) FROM usuarios WHERE last_login IS NOT NULL'),
+            "registrados_hoy": contar('SELECT COUNT(*) FROM usuarios WHERE created_at >= ?', (hoy,)),
+            # Solo se guarda el último login de cada usuario
+            "logins_24h": contar('SELECT COUNT(*) FROM usuarios WHERE last_login >= ?', (hace_24h,)),
+        }
+
+    def serie_diaria(self, dias=30):
+        """(día, altas, logins) de los últimos `dias` días.
+
+        Solo se guarda el último login de cada usuario, así que la columna de
+        logins cuenta usuarios cuyo último acceso fue ese día.
+        """
+        self.volcar_logins()
+        hoy = datetime.now()
+        desde = (hoy - timedelta(days=dias - 1)).strftime("%Y-%m-%d")
+        altas = dict(self._consultar_todos(
+            'SELECT substr(created_at, 1, 10), COUNT(*) FROM usuarios WHERE created_at >= ? GROUP BY 1',
+            (desde,)))
+        logins = dict(self._consultar_todos(
+            'SELECT substr(last_login, 1, 10), COUNT(*) FROM usuarios WHERE last_login >= ? GROUP BY 1',
+            (desde,)))
+        serie = []
+        for d in range(dias - 1, -1, -1):
+            dia = (hoy - timedelta(days=d)).strftime("%Y-%m-%d")
+            serie.append((dia, altas.get(dia, 0), logins.get(dia, 0)))
+        return serie
+
+    # --- Importación / exportación ---
+    def importar_usuarios(self, filas, tamano_lote=TAMANO_LOTE):
+        """Importar usuarios en bloque con executemany dentro de una transacción
+        
+        Las filas se consumen en lotes, así que la memoria no depende del
+        tamaño del archivo de origen.
+        """
+        resultado = ResultadoImportacion()
+        lote = []
+        with self.transaccion():
+            for numero, fila in enumerate(filas, 1):
+                error, datos = normalizar_fila(fila, self.validar_email)
+                if error:
+                    resultado.agregar_error(numero, error)
+                    continue
+                lote.append((numero, datos))
+                if len(lote) >= tamano_lote:
+                    self._insertar_lote(lote, resultado)
+                    lote = []
+            if lote:
+                self._insertar_lote(lote, resultado)
+        return resultado
 
-    def obtener_usuarios(self):
-        if self.usuario_actual and self.usuario_actual["role"] == "admin":
-            cur = self.conn.cursor()
-            cur.execute('SELECT * FROM usuarios')
-            return cur.fetchall()
-        return []
+    def _insertar_lote(self, lote, resultado):
+        usernames = [datos["username"] for _, datos in lote]
+        marcadores = ",".join("?" * len(usernames))
+        existentes = {fila["username"] for fila in self._consultar_todos(
+            f'SELECT username FROM usuarios WHERE username IN ({marcadores})', usernames
+        )}
+        emails = {fila[0] for fila in self._consultar_todos(
+            f'SELECT lower(email) FROM usuarios WHERE lower(email) IN ({marcadores})',
+            [normalizar_email(datos["email"]) for _, datos in lote]
+        )}
+        nuevos = []
+        for numero, datos in lote:
+            if datos["username"] in existentes:
+                resultado.agregar_error(numero, "El nombre de usuario ya existe")
+                continue
+            if normalizar_email(datos["email"]) in emails:
+                resultado.agregar_error(numero, "El email ya está registrado")
+                continue
+            existentes.add(datos["username"])
+            emails.add(normalizar_email(datos["email"]))
+            nuevos.append((datos["username"], datos["password_hash"], datos["email"],
+                           datos["role"], datos["created_at"], datos["last_login"]))
+        with self.transaccion() as cur:
+            cur.executemany('''
+                INSERT INTO usuarios (username, password_hash, email, role, created_at, last_login)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', nuevos)
+        resultado.importados += len(nuevos)
+
+    def exportar_usuarios(self, stream, formato="csv"):
+        """Exportar todos los usuarios a un stream abierto (CSV o NDJSON) sin cargarlos en memoria"""
+        self.volcar_logins()
+        with self._lock:
+            cursor = self.conn.execute('SELECT * FROM usuarios ORDER BY username')
+            return escribir_usuarios((dict(fila) for fila in cursor), stream, formato)
 
     # --- Perfiles ---
     def obtener_perfil(self, username):
-        cur = self.conn.cursor()
-        cur.execute('SELECT * FROM perfiles WHERE username = ?', (username,))
-        perfil = cur.fetchone()
-        if perfil:
-            intereses = json.loads(perfil["intereses"]) if perfil["intereses"] else []
-            return {
-                "nombre_completo": perfil["nombre_completo"] or "",
-                "edad": perfil["edad"] or "",
-                "ciudad": perfil["ciudad"] or "",
-                "intereses": intereses
-            }
-        else:
+        with self._lock:
+            perfil = self._cache_perfiles.obtener(username)
+            if perfil is None:
+                perfil = self._leer_perfil(username)
+                self._cache_perfiles.guardar(username, perfil)
+        # Copia para que quien llama no modifique la entrada de la caché
+        return {**perfil, "intereses": list(perfil["intereses"])}
+
+    def _leer_perfil(self, username):
+        perfil = self._consultar_uno('SELECT * FROM perfiles WHERE username = ?', (username,))
+        if perfil is None:
             return {"nombre_completo": "", "edad": "", "ciudad": "", "intereses": []}
+        return self._perfil_de_columnas(perfil["nombre_completo"], perfil["edad"], perfil["ciudad"],
+                                        perfil["intereses"], perfil["extra"])
+
+    @staticmethod
+    def _perfil_de_columnas(nombre_completo, edad, ciudad, intereses, extra):
+        """Columnas de perfiles (NULL si no hay fila) -> profile_data"""
+        datos = json.loads(extra) if extra else {}
+        datos.update({
+            "nombre_completo": nombre_completo or "",
+            "edad": edad or "",
+            "ciudad": ciudad or "",
+            "intereses": json.loads(intereses) if intereses else []
+        })
+        return datos
 
-    def guardar_perfil(self, username, nombre_completo, edad, ciudad, intereses):
-        cur = self.conn.cursor()
+    def guardar_perfil(self, username, nombre_completo, edad, ciudad, intereses, extra=None):
+        """Insertar o actualizar el perfil con una única sentencia (upsert)
+
+        `extra` son las claves de profile_data sin columna propia.
+        """
         intereses_json = json.dumps(intereses)
-        if self.obtener_perfil(username)["nombre_completo"] == "" and self.obtener_perfil(username)["edad"] == "" and self.obtener_perfil(username)["ciudad"] == "" and not self.obtener_perfil(username)["intereses"]:
-            cur.execute('''
-                INSERT INTO perfiles (username, nombre_completo, edad, ciudad, intereses)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (username, nombre_completo, edad, ciudad, intereses_json))
+        extra_json = json.dumps(extra, ensure_ascii=False, sort_keys=True) if extra else None
+        with self._lock:
+            self.conn.execute('''
+                INSERT INTO perfiles (username, nombre_completo, edad, ciudad, intereses, extra)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(username) DO UPDATE SET
+                    nombre_completo = excluded.nombre_completo,
+                    edad = excluded.edad,
+                    ciudad = excluded.ciudad,
+                    intereses = excluded.intereses,
+                    extra = excluded.extra
+            ''', (username, nombre_completo, edad, ciudad, intereses_json, extra_json))
+            self._cache_perfiles.invalidar(username)
+
+
+class VistaUsuariosSQLite:
+    """Usuarios ordenados por username como secuencia de solo lectura (para TablaVirtual).
+
+    Se cargan por páginas con `obtener_usuarios` y se guardan las últimas
+    PAGINAS_EN_CACHE. Al desplazarse se continúa desde la página vecina
+    (paginación por clave); un salto de la barra de desplazamiento busca el
+    username inicial de la página con un OFFSET sobre el índice.
+    """
+
+    def __init__(self, sistema, sesion, total, tamano_pagina=TAMANO_PAGINA):
+        self.sistema = sistema
+        self.sesion = sesion
+        self.total = total
+        self.tamano_pagina = tamano_pagina
+        self._paginas = CacheLRU(PAGINAS_EN_CACHE)
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, posicion):
+        if posicion < 0:
+            posicion += self.total
+        if not 0 <= posicion < self.total:
+            raise IndexError(posicion)
+        numero, desplazamiento = divmod(posicion, self.tamano_pagina)
+        pagina = self._paginas.obtener(numero)
+        if pagina is None:
+            pagina = self._cargar(numero)
+        # Si se borraron usuarios desde que se abrió la vista la página puede ser más corta
+        return pagina[desplazamiento] if desplazamiento < len(pagina) else None
+
+    def _cargar(self, numero):
+        anterior = self._paginas.obtener(numero - 1) if numero else []
+        if numero == 0:
+            desde = None
+        elif anterior:
+            desde = anterior[-1].username
         else:
-            cur.execute('''
-                UPDATE perfiles SET nombre_completo = ?, edad = ?, ciudad = ?, intereses = ? WHERE username = ?
-            ''', (nombre_completo, edad, ciudad, intereses_json, username))
-        self.conn.commit()
-
-class AplicacionSistemaUsuariosSQLite:
-    def __init__(self):
-        self.root = ctk.CTk()
-        self.root.title("Sistema de Usuarios (SQLite) - Python GUI Demo")
-        self.root.geometry("900x600")
-        self.sistema = SistemaUsuariosSQLite()
-        self.crear_interfaz_login()
-
-    # ...
-    # La interfaz y lógica es igual que antes, pero usando self.sistema para todas las operaciones
-    # Puedes copiar la interfaz de sistema_usuarios.py y reemplazar las llamadas a JSON por llamadas a SQLite
-    # ...
+            desde = self.sistema._username_en_posicion(numero * self.tamano_pagina - 1)
+        pagina = self.sistema.obtener_usuarios(self.sesion, after_username=desde,
+                                               limit=self.tamano_pagina)
+        self._paginas.guardar(numero, pagina)
+        return pagina
+
+
+def __getattr__(nombre):
+    # La interfaz se importa solo si se pide (ver sistema_usuarios.__getattr__)
+    if nombre == "AplicacionSistemaUsuariosSQLite":
+        from interfaz_sistema_usuarios_sqlite import AplicacionSistemaUsuariosSQLite
+        return AplicacionSistemaUsuariosSQLite
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
 
 if __name__ == "__main__":
+    from interfaz_sistema_usuarios_sqlite import AplicacionSistemaUsuariosSQLite
     app = AplicacionSistemaUsuariosSQLite()
-    app.root.mainloop() 
\ No newline at end of file
+    app.ejecutar()
@@ -0,0 +1,114 @@
+import customtkinter as ctk
+from typing import Any, Callable, List, Sequence, Tuple
+
+# (título, ancho en caracteres, función que extrae el texto de un registro)
+Columna = Tuple[str, int, Callable[[Any], str]]
+
+
+class TablaVirtual(ctk.CTkFrame):
+    """Tabla que solo dibuja las filas visibles de una fuente de registros.
+
+    La fuente puede ser cualquier secuencia (lista en memoria, vista de
+    usuarios, resultados de un filtro...). Las etiquetas de las filas se crean una vez
+    según el alto de la ventana y se reutilizan al desplazarse, así que abrir
+    la tabla cuesta lo mismo con 10 que con 1.000.000 de registros.
+    """
+
+    def __init__(self, master, columnas: List[Columna], fuente: Sequence = (),
+                 alto_fila: int = 22, font: ctk.CTkFont = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.columnas = columnas
+        self.fuente = fuente
+        self.alto_fila = alto_fila
+        self.primera = 0
+        # Fuente compartida (RegistroEstilos) o una propia si no se pasa
+        self.font = font if font is not None else ctk.CTkFont(family="Courier", size=11)
+        self.filas: List[ctk.CTkLabel] = []
+
+        encabezado = "".join(titulo.ljust(ancho) for titulo, ancho, _ in columnas)
+        ctk.CTkLabel(self, text=encabezado, font=self.font, anchor="w").grid(
+            row=0, column=0, sticky="ew", padx=5
+        )
+        ctk.CTkLabel(self, text="-" * len(encabezado), font=self.font, anchor="w").grid(
+            row=1, column=0, sticky="ew", padx=5
+        )
+
+        self.cuerpo = ctk.CTkFrame(self, fg_color="transparent")
+        self.cuerpo.grid(row=2, column=0, sticky="nsew", padx=5)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._comando_scroll)
+        self.scrollbar.grid(row=2, column=1, sticky="ns")
+
+        self.grid_rowconfigure(2, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.cuerpo.bind("<Configure>", lambda e: self._ajustar_filas())
+        self._vincular_rueda(self.cuerpo)
+
+    def establecer_fuente(self, fuente: Sequence):
+        """Cambiar los registros mostrados y volver al principio"""
+        self.fuente = fuente
+        self.primera = 0
+        self._refrescar()
+
+    def formatear_fila(self, dato) -> str:
+        partes = []
+        for _, ancho, extraer in self.columnas:
+            try:
+                texto = str(extraer(dato))
+            except Exception:
+                texto = ""
+            partes.append(texto[:ancho - 2].ljust(ancho))
+        return "".join(partes)
+
+    def _vincular_rueda(self, widget):
+        widget.bind("<MouseWheel>", self._rueda)
+        widget.bind("<Button-4>", lambda e: self.desplazar(-3))
+        widget.bind("<Button-5>", lambda e: self.desplazar(3))
+
+    def _rueda(self, event):
+        paso = -1 if event.delta > 0 else 1
+        self.desplazar(paso * 3)
+
+    def _ajustar_filas(self):
+        """Crear o destruir etiquetas para que cubran el alto disponible"""
+        visibles = max(1, self.cuerpo.winfo_height() // self.alto_fila)
+        while len(self.filas) < visibles:
+            fila = ctk.CTkLabel(self.cuerpo, text="", font=self.font, anchor="w",
+                                height=self.alto_fila)
+            fila.pack(fill="x")
+            self._vincular_rueda(fila)
+            self.filas.append(fila)
+        while len(self.filas) > visibles:
+            self.filas.pop().destroy()
+        self._refrescar()
+
+    def desplazar(self, filas: int):
+        self._ir_a(self.primera + filas)
+
+    def _ir_a(self, primera: int):
+        maximo = max(0, len(self.fuente) - len(self.filas))
+        primera = min(max(0, primera), maximo)
+        if primera != self.primera:
+            self.primera = primera
+            self._refrescar()
+
+    def _comando_scroll(self, accion, cantidad, unidad=None):
+        if accion == "moveto":
+            self._ir_a(int(float(cantidad) * len(self.fuente)))
+        elif accion == "scroll":
+            paso = len(self.filas) if unidad == "pages" else 1
+            self.desplazar(int(cantidad) * paso)
+
+    def _refrescar(self):
+        total = len(self.fuente)
+        for k, fila in enumerate(self.filas):
+            indice = self.primera + k
+            texto = self.formatear_fila(self.fuente[indice]) if indice < total else ""
+            # Evitar redibujar etiquetas cuyo texto no cambia
+            if fila.cget("text") != texto:
+                fila.configure(text=texto)
+        if total:
+            self.scrollbar.set(self.primera / total,
+                               min(1.0, (self.primera + len(self.filas)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
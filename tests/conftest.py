@@ -0,0 +1,18 @@
+import pytest
+
+import contrasenas
+from backends_usuarios import BACKENDS, crear_backend
+
+
+@pytest.fixture(autouse=True)
+def hasher_rapido(monkeypatch):
+    """Hash de coste mínimo: los tests comprueban comportamiento, no el KDF"""
+    monkeypatch.setattr(contrasenas, "HASHER_POR_DEFECTO", contrasenas.HasherPBKDF2(iteraciones=1))
+
+
+@pytest.fixture(params=BACKENDS)
+def abrir(request, tmp_path):
+    """Abre el backend del parámetro sobre el mismo almacenamiento (vacío al empezar)"""
+    backend = request.param
+    ruta = str(tmp_path / ("usuarios.db" if backend == "sqlite" else "usuarios.json"))
+    return lambda: crear_backend(backend, ruta)
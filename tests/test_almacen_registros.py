@@ -0,0 +1,58 @@
+"""Lectura tolerante de los registros del formulario (`almacen_registros`)"""
+import json
+
+from almacen_registros import RegistrosColumnares, cargar_columnares, escribir_registros, leer_registros
+
+
+def registro(nombre):
+    return {"nombre": nombre, "email": f"{nombre}@demo.com", "edad": "30", "genero": "Otro",
+            "intereses": ["Arte"], "fecha_registro": "2024-01-01 10:00:00"}
+
+
+def escribir(ruta, contenido):
+    ruta.write_bytes(contenido.encode("utf-8") if isinstance(contenido, str) else contenido)
+    return str(ruta)
+
+
+def test_registros_danados_se_saltan_de_uno_en_uno(tmp_path):
+    lineas = [json.dumps(registro("ana")), json.dumps(registro("bea"))[:25], "basura",
+              json.dumps({"nombre": "incompleto"}), json.dumps(registro("eva"))]
+    ruta = escribir(tmp_path / "datos.json", "\n".join(lineas) + "\n")
+    omitidos = []
+    assert [d["nombre"] for d in leer_registros(ruta, omitidos=omitidos)] == ["ana", "eva"]
+    assert len(omitidos) == 3
+
+
+def test_bytes_no_utf8_no_cortan_la_lectura(tmp_path):
+    contenido = (json.dumps(registro("ana")) + "\n").encode() + b"\xff\xfe{roto\n" \
+        + (json.dumps(registro("eva")) + "\n").encode()
+    ruta = escribir(tmp_path / "datos.json", contenido)
+    omitidos = []
+    assert [d["nombre"] for d in leer_registros(ruta, omitidos=omitidos)] == ["ana", "eva"]
+    assert len(omitidos) == 1
+
+
+def test_array_json_con_sangria(tmp_path):
+    ruta = escribir(tmp_path / "datos.json",
+                    json.dumps([registro("ana"), registro("bea")], indent=2, ensure_ascii=False))
+    assert [d["nombre"] for d in leer_registros(ruta)] == ["ana", "bea"]
+
+
+def test_registros_columnares_vuelven_como_se_guardaron(tmp_path):
+    sin_edad = registro("ana")
+    del sin_edad["edad"]
+    datos = [
+        sin_edad,
+        {**registro("bea"), "edad": ""},
+        {**registro("eva"), "edad": 41, "intereses": ["Música", "Arte", "Música"]},
+        {**registro("iris"), "genero": ["raro"], "intereses": [["anidado"]]},
+        {**registro("luz"), "fecha_registro": "2024-03-31 02:30:00", "extra": {"a": 1}},
+    ]
+    registros = RegistrosColumnares(datos)
+    assert list(registros) == datos
+    assert "edad" not in registros[0] and registros[1]["edad"] == ""
+
+    ruta = str(tmp_path / "datos.json")
+    escribir_registros(datos, ruta)
+    assert list(cargar_columnares(ruta)) == datos
+    assert list(cargar_columnares(ruta)) == datos  # desde la caché binaria
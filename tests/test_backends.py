@@ -0,0 +1,144 @@
+"""Comportamiento común a todos los backends de `backends_usuarios`"""
+import io
+import json
+
+
+def test_registro(abrir):
+    sistema = abrir()
+    try:
+        assert sistema.registrar_usuario("ana", "password123", "ana@demo.com")[0]
+        assert not sistema.registrar_usuario("ana", "password123", "otra@demo.com")[0], "duplicado"
+        assert not sistema.registrar_usuario("bea", "corta", "bea@demo.com")[0], "contraseña corta"
+        assert not sistema.registrar_usuario("bea", "password123", "no-es-email")[0], "email inválido"
+        assert not sistema.registrar_usuario("bea", "password123", "Ana@Demo.com")[0], "email repetido"
+        assert sistema.email_registrado("ANA@demo.com") and not sistema.email_registrado("bea@demo.com")
+        assert sistema.emails_duplicados() == {}
+        assert sistema.validar_email("bea@demo.com") and not sistema.validar_email("bea@")
+        user = sistema.obtener_usuario("ana")
+        assert user.username == "ana" and user.role == "user" and user.last_login is None
+        assert sistema.obtener_usuario("nadie") is None
+    finally:
+        sistema.cerrar()
+
+
+def test_login_y_sesiones(abrir):
+    sistema = abrir()
+    try:
+        sistema.registrar_usuario("ana", "password123", "ana@demo.com")
+        assert not sistema.login("ana", "incorrecta")[0]
+        assert not sistema.login("nadie", "password123")[0]
+        ok, _, sesion = sistema.login("ana", "password123")
+        assert ok and sesion.token
+        assert sistema.usuario_de(sesion).username == "ana"
+        assert sistema.usuario_de(sesion.token).username == "ana", "acceso por token"
+        assert sistema.obtener_usuario("ana").last_login is not None
+        assert sistema.obtener_usuarios(sesion) == [], "listado solo para admin"
+        ok, _, admin = sistema.login("admin", "admin123")
+        assert {user.username for user in sistema.obtener_usuarios(admin)} == {"admin", "ana"}
+        assert sistema.logout(sesion) and sistema.usuario_de(sesion) is None
+        assert not sistema.logout(sesion)
+    finally:
+        sistema.cerrar()
+
+
+def test_cambio_password(abrir):
+    sistema = abrir()
+    try:
+        sistema.registrar_usuario("ana", "password123", "ana@demo.com")
+        sesion = sistema.login("ana", "password123")[2]
+        assert not sistema.cambiar_password(sesion, "incorrecta", "password456")[0]
+        assert not sistema.cambiar_password(sesion, "password123", "corta")[0]
+        assert sistema.cambiar_password(sesion, "password123", "password456")[0]
+        assert not sistema.cambiar_password(None, "password456", "password789")[0]
+    finally:
+        sistema.cerrar()
+    sistema = abrir()
+    try:
+        assert not sistema.login("ana", "password123")[0]
+        assert sistema.login("ana", "password456")[0], "el cambio no se guardó"
+    finally:
+        sistema.cerrar()
+
+
+def test_persistencia(abrir):
+    sistema = abrir()
+    try:
+        sistema.registrar_usuario("ana", "password123", "ana@demo.com")
+        sistema.login("ana", "password123")
+        user = sistema.obtener_usuario("ana")
+        user.email = "ana@ejemplo.com"
+        user.profile_data = {"nombre_completo": "Ana", "edad": "30", "ciudad": "Lima",
+                             "intereses": ["Arte"]}
+        sistema.guardar_usuario(user)
+    finally:
+        sistema.cerrar()
+    sistema = abrir()
+    try:
+        user = sistema.obtener_usuario("ana")
+        assert user.email == "ana@ejemplo.com" and user.last_login is not None
+        assert user.profile_data["ciudad"] == "Lima"
+        assert user.profile_data["intereses"] == ["Arte"]
+    finally:
+        sistema.cerrar()
+
+
+def test_estadisticas(abrir):
+    sistema = abrir()
+    try:
+        for i in range(3):
+            sistema.registrar_usuario(f"user{i}", "password123", f"user{i}@demo.com")
+        sistema.login("user0", "password123")
+        stats = sistema.obtener_estadisticas()
+        assert stats["total"] == 4 and stats["por_rol"] == {"admin": 1, "user": 3}
+        assert stats["con_login"] == 1 and stats["registrados_hoy"] == 4
+        serie = sistema.serie_diaria(7)
+        assert len(serie) == 7 and serie[-1][1] == 4 and serie[-1][2] == 1
+    finally:
+        sistema.cerrar()
+
+
+def test_importacion_exportacion(abrir):
+    sistema = abrir()
+    try:
+        filas = [{"username": "imp1", "password": "password123", "email": "imp1@demo.com"},
+                 {"username": "imp2", "password": "password123", "email": "mal"},
+                 {"username": "admin", "password": "password123", "email": "a@demo.com"},
+                 {"username": "imp3", "password": "password123", "email": "IMP1@demo.com"}]
+        resultado = sistema.importar_usuarios(filas)
+        assert resultado.importados == 1 and resultado.total_errores == 3
+        destino = io.StringIO()
+        assert sistema.exportar_usuarios(destino, "ndjson") == 2
+        exportados = {json.loads(linea)["username"] for linea in destino.getvalue().splitlines()}
+        assert exportados == {"admin", "imp1"}
+        assert sistema.login("imp1", "password123")[0]
+    finally:
+        sistema.cerrar()
+
+
+def test_limitador(abrir):
+    sistema = abrir()
+    try:
+        for _ in range(sistema.limitador.capacidad_usuario):
+            sistema.login("admin", "incorrecta")
+        ok, mensaje, _ = sistema.login("admin", "admin123")
+        assert not ok and "Demasiados" in mensaje
+    finally:
+        sistema.cerrar()
+
+
+def test_importacion_con_campos_que_no_son_texto(abrir):
+    sistema = abrir()
+    try:
+        filas = [{"username": 42, "password": "password123", "email": "n@demo.com"},
+                 {"username": "lista", "password": "password123", "email": ["l@demo.com"]},
+                 {"username": "rol", "password": "password123", "email": "r@demo.com", "role": True},
+                 {"username": "clave", "password": 12345678, "email": "c@demo.com"},
+                 {"username": "fecha", "password": "password123", "email": "f@demo.com",
+                  "created_at": 20240101},
+                 {"username": "bien", "password": "password123", "email": "b@demo.com"}]
+        resultado = sistema.importar_usuarios(filas)
+        assert resultado.importados == 1 and resultado.total_errores == 5
+        assert [numero for numero, _ in resultado.errores] == [1, 2, 3, 4, 5]
+        assert sistema.obtener_usuario("bien") is not None
+    finally:
+        sistema.cerrar()
@@ -0,0 +1,69 @@
+"""Caché binaria `<origen>.bin` (`cache_binaria.CacheBinaria`)"""
+import json
+import os
+
+from cache_binaria import CacheBinaria
+from sistema_usuarios import SistemaUsuarios
+
+
+def escribir(ruta, contenido, mtime_ns=None):
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(contenido)
+    if mtime_ns is not None:
+        os.utime(ruta, ns=(mtime_ns, mtime_ns))
+
+
+def guardar_cache(ruta, datos, crecimiento=False):
+    cache = CacheBinaria(ruta, crecimiento=crecimiento)
+    assert cache.cargar() == (None, 0)
+    cache.guardar(datos)
+
+
+def test_origen_sin_cambios_o_solo_tocado(tmp_path):
+    ruta = str(tmp_path / "datos.json")
+    escribir(ruta, "[1, 2, 3]", mtime_ns=1_000_000_000)
+    guardar_cache(ruta, [1, 2, 3])
+    assert CacheBinaria(ruta).cargar() == ([1, 2, 3], 9)
+    # Mismo contenido con otro mtime (copia, touch): vale tras comprobar el hash
+    os.utime(ruta, ns=(2_000_000_000, 2_000_000_000))
+    assert CacheBinaria(ruta).cargar() == ([1, 2, 3], 9)
+
+
+def test_origen_modificado_invalida_la_cache(tmp_path):
+    ruta = str(tmp_path / "datos.json")
+    escribir(ruta, "[1, 2, 3]", mtime_ns=1_000_000_000)
+    guardar_cache(ruta, [1, 2, 3])
+    # Mismo tamaño, contenido distinto
+    escribir(ruta, "[1, 2, 4]", mtime_ns=2_000_000_000)
+    assert CacheBinaria(ruta).cargar() == (None, 0)
+    # Otro tamaño
+    escribir(ruta, "[1, 2, 3, 4]")
+    assert CacheBinaria(ruta).cargar() == (None, 0)
+
+
+def test_crecimiento_solo_si_el_principio_no_cambia(tmp_path):
+    ruta = str(tmp_path / "datos.ndjson")
+    escribir(ruta, '{"a": 1}\n')
+    guardar_cache(ruta, [{"a": 1}], crecimiento=True)
+    escribir(ruta, '{"a": 1}\n{"a": 2}\n')
+    assert CacheBinaria(ruta, crecimiento=True).cargar() == ([{"a": 1}], 9)
+    escribir(ruta, '{"b": 1}\n{"a": 2}\n')
+    assert CacheBinaria(ruta, crecimiento=True).cargar() == (None, 0)
+
+
+def test_sistema_usuarios_no_usa_una_cache_desfasada(tmp_path):
+    archivo = str(tmp_path / "usuarios.json")
+    sistema = SistemaUsuarios(archivo)
+    sistema.registrar_usuario("ana", "password123", "ana@demo.com")
+    sistema.cerrar()
+    SistemaUsuarios(archivo).cerrar()  # crea usuarios.json.bin
+    assert os.path.exists(f"{archivo}.bin")
+
+    # Otro proceso reescribe el snapshot: la caché ya no corresponde
+    with open(archivo, encoding="utf-8") as f:
+        datos = json.load(f)
+    for dato in datos:
+        dato["email"] = dato["email"].replace("demo.com", "otro.com")
+    with open(archivo, "w", encoding="utf-8") as f:
+        json.dump(datos, f)
+    assert SistemaUsuarios(archivo).obtener_usuario("ana").email == "ana@otro.com"
@@ -0,0 +1,66 @@
+"""Modo diario de SistemaUsuarios: reproducción tras una caída y compactación"""
+import json
+import os
+
+import pytest
+
+from sistema_usuarios import SistemaUsuarios
+
+
+@pytest.fixture
+def archivo(tmp_path):
+    return str(tmp_path / "usuarios.json")
+
+
+def estado(sistema):
+    return {username: user.to_dict() for username, user in sistema.usuarios.items()}
+
+
+def test_reproduce_el_diario_tras_una_caida(archivo):
+    sistema = SistemaUsuarios(archivo, usar_diario=True)
+    sistema.registrar_usuario("ana", "password123", "ana@demo.com")
+    user = sistema.obtener_usuario("ana")
+    user.email = "ana@ejemplo.com"
+    sistema.guardar_usuario(user)
+    esperado = estado(sistema)
+    # Caída a mitad de escribir el siguiente registro: sin cerrar y con la línea cortada
+    with open(f"{archivo}.diario", "ab") as diario:
+        diario.write(b'{"username":"bea","password_hash":"$pbk')
+
+    sistema = SistemaUsuarios(archivo, usar_diario=True)
+    assert estado(sistema) == esperado
+    assert sistema.email_registrado("ana@ejemplo.com") and not sistema.email_registrado("ana@demo.com")
+    # El primer registro tras la caída no se pega a la línea cortada
+    assert sistema.registrar_usuario("bea", "password123", "bea@demo.com")[0]
+    sistema.cerrar()
+    assert set(SistemaUsuarios(archivo, usar_diario=True).usuarios) == {"admin", "ana", "bea"}
+
+
+def test_compactar_conserva_los_datos(archivo):
+    sistema = SistemaUsuarios(archivo, usar_diario=True)
+    for i in range(5):
+        sistema.registrar_usuario(f"user{i}", "password123", f"user{i}@demo.com")
+    user = sistema.obtener_usuario("user2")
+    user.profile_data = {"nombre_completo": "Dos", "edad": "30", "ciudad": "Lima",
+                         "intereses": ["Arte", "Música"]}
+    sistema.guardar_usuario(user)
+    esperado = estado(sistema)
+    assert os.path.getsize(f"{archivo}.diario") > 0
+
+    sistema._escribir_snapshot()
+    assert os.path.getsize(f"{archivo}.diario") == 0
+    with open(archivo, encoding="utf-8") as f:
+        assert {dato["username"]: dato for dato in json.load(f)} == esperado
+    sistema.cerrar()
+    assert estado(SistemaUsuarios(archivo, usar_diario=True)) == esperado
+
+
+def test_estadisticas_en_disco_tras_cada_cambio(archivo):
+    sistema = SistemaUsuarios(archivo, usar_diario=True)
+    sistema.registrar_usuario("ana", "password123", "ana@demo.com")
+    sistema.login("ana", "password123")
+    # Sin cerrar (como tras una caída): los contadores ya están en disco
+    with open(f"{archivo}.estadisticas", encoding="utf-8") as f:
+        guardadas = json.load(f)
+    assert guardadas["total"] == 2 and guardadas["con_login"] == 1
+    sistema.cerrar()
@@ -0,0 +1,18 @@
+"""Los módulos de backend se pueden importar sin cargar la interfaz gráfica"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("modulo", ["sistema_usuarios", "sistema_usuarios_sqlite",
+                                    "backends_usuarios", "servicio_usuarios"])
+def test_backend_no_importa_tkinter(modulo):
+    codigo = (f"import sys, {modulo}; "
+              "print(','.join(m for m in ('tkinter', 'customtkinter') if m in sys.modules))")
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, check=True,
+                            capture_output=True, text=True).stdout
+    assert salida.strip() == ""
@@ -0,0 +1,29 @@
+"""Índices de búsqueda sobre los registros del formulario (`indice_registros`)"""
+from almacen_registros import RegistrosColumnares, validar_registro
+from indice_registros import IndiceRegistros
+
+
+def registro(nombre, intereses, genero="Otro"):
+    return {"nombre": nombre, "email": f"{nombre.split()[0].lower()}@demo.com", "edad": "30",
+            "genero": genero, "intereses": intereses, "fecha_registro": "2024-01-01 10:00:00"}
+
+
+def test_intereses_no_hashables_no_rompen_el_indice():
+    registros = [
+        registro("Ana Pérez", ["Arte", ["anidado"], {"clave": "valor"}, "Arte"]),
+        registro("Bea Ruiz", [7, None, ("Música",)], genero=["raro"]),
+        registro("Eva Gil", ["Música", "Arte"]),
+    ]
+    assert all(validar_registro(dato) for dato in registros)
+    indice = IndiceRegistros.construir(registros)
+    assert indice.filtrar(intereses=["Arte"]) == [0, 2]
+    assert indice.filtrar(intereses=[7]) == [1]
+    assert indice.filtrar(genero="Otro") == [0, 2]
+    assert indice.filtrar("pérez") == [0]
+    assert indice.filtrar("bea@demo.com") == [1]
+
+
+def test_indice_sobre_registros_columnares():
+    registros = RegistrosColumnares([registro("Ana Pérez", [["anidado"], "Arte"]),
+                                     registro("Eva Gil", ["Arte"])])
+    assert IndiceRegistros.construir(registros).filtrar(intereses=["Arte"]) == [0, 1]
@@ -0,0 +1,101 @@
+"""Snapshot indexado con carga perezosa (`indice_usuarios.UsuariosPerezosos`)"""
+import os
+
+import pytest
+
+from estadisticas_usuarios import EstadisticasUsuarios
+from indice_usuarios import IndiceUsuarios, VistaUsuariosIndexados
+from sistema_usuarios import SistemaUsuarios
+
+
+@pytest.fixture
+def abrir(tmp_path):
+    archivo = str(tmp_path / "usuarios.json")
+    return lambda: SistemaUsuarios(archivo, usar_diario=True, carga_perezosa=True)
+
+
+def cambiar_email(sistema, username, email):
+    user = sistema.obtener_usuario(username)
+    user.email = email
+    sistema.guardar_usuario(user)
+
+
+def comprobar_email_cambiado(sistema):
+    assert sistema.obtener_usuario("user3").email == "nuevo3@demo.com"
+    assert sistema.email_registrado("NUEVO3@demo.com")
+    assert not sistema.email_registrado("user3@demo.com")
+    assert sistema.usuarios.username_por_email("user4@demo.com") == "user4"
+    assert [user.username for user in sistema.usuarios.values()] == \
+        ["admin"] + [f"user{i}" for i in range(10)]
+
+
+def test_cambio_de_email_tras_reabrir_y_compactar(abrir):
+    sistema = abrir()
+    for i in range(10):
+        sistema.registrar_usuario(f"user{i}", "password123", f"user{i}@demo.com")
+    sistema._escribir_snapshot()
+    sistema.cerrar()
+
+    # El usuario sale del snapshot indexado y el cambio va al diario
+    sistema = abrir()
+    cambiar_email(sistema, "user3", "nuevo3@demo.com")
+    comprobar_email_cambiado(sistema)
+    sistema.cerrar()
+
+    sistema = abrir()
+    comprobar_email_cambiado(sistema)
+    vista = VistaUsuariosIndexados(sistema.usuarios)
+    anterior = sistema.usuarios.indice
+    sistema._escribir_snapshot()
+    # Los mapas del snapshot reemplazado se cierran antes del rename
+    assert anterior.snapshot.closed and anterior.indice.closed
+    assert [user.username for user in vista][1:4] == ["user0", "user1", "user2"]
+    comprobar_email_cambiado(sistema)
+    sistema.cerrar()
+
+    comprobar_email_cambiado(abrir())
+
+
+def test_carga_perezosa_sin_diario(tmp_path):
+    with pytest.raises(ValueError):
+        SistemaUsuarios(str(tmp_path / "usuarios.json"), carga_perezosa=True)
+
+
+def test_estadisticas_desde_el_resumen_del_indice(abrir, monkeypatch):
+    sistema = abrir()
+    for i in range(10):
+        sistema.registrar_usuario(f"user{i}", "password123", f"user{i}@demo.com")
+    sistema.login("user1", "password123")
+    sistema._escribir_snapshot()
+    sistema.cerrar()
+
+    # Cambios solo en el diario: un rol, un login y un alta
+    sistema = abrir()
+    user = sistema.obtener_usuario("user2")
+    user.role = "admin"
+    sistema.guardar_usuario(user)
+    sistema.login("user5", "password123")
+    sistema.registrar_usuario("nuevo", "password123", "nuevo@demo.com")
+    esperadas = EstadisticasUsuarios()
+    esperadas.reconstruir(sistema.usuarios.values())
+    archivo_estadisticas = sistema.archivo_estadisticas
+    sistema.cerrar()
+
+    os.remove(archivo_estadisticas)
+    leidos = set()
+    registro = IndiceUsuarios.registro
+
+    def registro_contado(self, numero):
+        datos = registro(self, numero)
+        leidos.add(datos["username"])
+        return datos
+
+    monkeypatch.setattr(IndiceUsuarios, "registro", registro_contado)
+    sistema = abrir()
+    stats = sistema.estadisticas
+    assert stats.total == 12 and stats.por_rol == {"admin": 2, "user": 10}
+    assert stats.con_login == 2
+    assert stats.registros_por_dia == esperadas.registros_por_dia
+    # Del snapshot solo se leen los modificados (y el admin al comprobar que existe)
+    assert leidos <= {"admin", "user2", "user5"}
+    sistema.cerrar()
@@ -0,0 +1,90 @@
+"""Migración reanudable de usuarios.json a SQLite (`migracion_usuarios`)"""
+import json
+
+import pytest
+
+import migracion_usuarios
+from migracion_usuarios import MigradorUsuarios
+
+
+def usuario(i, email=None, ciudad=None):
+    return {"username": f"user{i}", "password_hash": f"hash{i}",
+            "email": email or f"user{i}@demo.com", "role": "user",
+            "created_at": "2024-01-01 10:00:00", "last_login": None,
+            "profile_data": {"ciudad": ciudad} if ciudad else {}}
+
+
+@pytest.fixture
+def rutas(tmp_path):
+    ruta_json = tmp_path / "usuarios.json"
+    ruta_json.write_text(json.dumps([usuario(i, ciudad="Lima" if i % 3 == 0 else None)
+                                     for i in range(25)]), encoding="utf-8")
+    return str(ruta_json), str(tmp_path / "usuarios.db")
+
+
+def migrar(ruta_json, ruta_db, **opciones):
+    migrador = MigradorUsuarios(ruta_json, ruta_db, tamano_lote=10)
+    try:
+        return migrador.migrar(**opciones), migrador.verificar()
+    finally:
+        migrador.cerrar()
+
+
+def test_reanuda_tras_un_lote_interrumpido(rutas):
+    def interrumpir(estado):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        migrar(*rutas, progreso=interrumpir)
+    migrador = MigradorUsuarios(*rutas)
+    assert migrador.punto_control()["procesados"] == 10
+    migrador.cerrar()
+
+    resultado, (ok, mensaje) = migrar(*rutas)
+    assert resultado.importados == 15 and resultado.total_errores == 0
+    assert ok, mensaje
+
+
+def test_nueva_ejecucion_migra_solo_el_diario_nuevo(rutas):
+    ruta_json, ruta_db = rutas
+    resultado, (ok, _) = migrar(*rutas)
+    assert resultado.importados == 25 and ok
+
+    with open(f"{ruta_json}.diario", "a", encoding="utf-8") as diario:
+        for dato in (usuario(3, email="nuevo3@demo.com"), usuario(30),
+                     usuario(31, email="user4@demo.com")):
+            diario.write(json.dumps(dato) + "\n")
+    resultado, (ok, mensaje) = migrar(*rutas)
+    # user3 cambia de email, user30 es nuevo y user31 usa el email de user4
+    assert resultado.importados == 1 and resultado.total_errores == 1
+    assert ok, mensaje
+    migrador = MigradorUsuarios(*rutas)
+    emails = dict(migrador.conn.execute("SELECT username, email FROM usuarios"))
+    migrador.cerrar()
+    assert emails["user3"] == "nuevo3@demo.com" and "user31" not in emails
+    assert migrar(*rutas)[0].importados == 0
+
+
+def test_verificar_detecta_cambios_en_sqlite(rutas):
+    migrar(*rutas)
+    migrador = MigradorUsuarios(*rutas)
+    migrador.conn.execute("UPDATE usuarios SET role = 'admin' WHERE username = 'user7'")
+    ok, mensaje = migrador.verificar()
+    migrador.cerrar()
+    assert not ok and "punto de control" in mensaje
+
+
+def test_verificar_detecta_una_conversion_erronea(rutas, monkeypatch):
+    convertir = migracion_usuarios.convertir_usuario
+
+    def convertir_mal(dato):
+        fila, perfil = convertir(dato)
+        return fila, None  # pierde el perfil
+
+    monkeypatch.setattr(migracion_usuarios, "convertir_usuario", convertir_mal)
+    migrador = MigradorUsuarios(*rutas)
+    migrador.migrar()
+    monkeypatch.setattr(migracion_usuarios, "convertir_usuario", convertir)
+    ok, mensaje = migrador.verificar()
+    migrador.cerrar()
+    assert not ok and "JSON" in mensaje
@@ -0,0 +1,55 @@
+"""Número de sentencias SQL por operación del backend SQLite (`contador_consultas`)"""
+import pytest
+
+from sistema_usuarios_sqlite import SistemaUsuariosSQLite
+
+
+@pytest.fixture
+def sistema():
+    sistema = SistemaUsuariosSQLite(":memory:")
+    sistema.registrar_usuario("ana", "password123", "ana@demo.com")
+    yield sistema
+    sistema.cerrar()
+
+
+def sentencias(sistema, operacion):
+    antes = sistema.contador_consultas
+    resultado = operacion()
+    return sistema.contador_consultas - antes, resultado
+
+
+def test_guardar_perfil_es_un_upsert(sistema):
+    for ciudad in ("Lima", "Quito"):
+        numero, _ = sentencias(sistema, lambda: sistema.guardar_perfil(
+            "ana", "Ana", "30", ciudad, ["Arte"], {"web": "ana.dev"}))
+        assert numero == 1
+    assert sistema.obtener_perfil("ana")["ciudad"] == "Quito"
+
+
+def test_obtener_perfil_usa_la_cache(sistema):
+    sistema.guardar_perfil("ana", "Ana", "30", "Lima", ["Arte"])
+    assert sentencias(sistema, lambda: sistema.obtener_perfil("ana"))[0] == 1
+    numero, perfil = sentencias(sistema, lambda: sistema.obtener_perfil("ana"))
+    assert numero == 0 and perfil["intereses"] == ["Arte"]
+    # La copia devuelta no modifica la caché
+    perfil["intereses"].append("Música")
+    assert sistema.obtener_perfil("ana")["intereses"] == ["Arte"]
+
+
+def test_obtener_usuario_con_perfil_en_una_consulta(sistema):
+    sistema.guardar_perfil("ana", "Ana", "30", "Lima", ["Música", "Arte"], {"web": "ana.dev"})
+    for _ in range(2):  # sin el perfil en caché (JOIN) y con él
+        numero, user = sentencias(sistema, lambda: sistema.obtener_usuario("ana"))
+        assert numero == 1
+        assert user.profile_data == {"nombre_completo": "Ana", "edad": "30", "ciudad": "Lima",
+                                     "intereses": ["Música", "Arte"], "web": "ana.dev"}
+    numero, user = sentencias(sistema, lambda: sistema.obtener_usuario("nadie"))
+    assert numero == 1 and user is None
+
+
+def test_usuario_de_con_login_pendiente(sistema):
+    sistema.intervalo_grupo_ms = 60_000
+    sesion = sistema.login("ana", "password123")[2]
+    numero, user = sentencias(sistema, lambda: sistema.usuario_de(sesion))
+    # El last_login aún no se ha escrito, pero el usuario ya lo muestra
+    assert numero == 1 and user.last_login is not None